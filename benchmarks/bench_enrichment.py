@@ -0,0 +1,131 @@
+"""
+Benchmark: enriquecimiento de artistas y audio features con los endpoints de varios IDs.
+
+Sincroniza una biblioteca sintética con ``SyncPipeline`` y después completa sus
+artistas y tracks con ``LibraryEnrichmentService`` contra los stand-ins, con
+latencia en Spotify. Compara dos variantes:
+
+- ``batched``: 50 artistas por ``GET /artists`` y 100 tracks por ``GET /audio-features``.
+- ``per-id``: un ID por petición, como si cada fila se pidiera por separado.
+
+Informa de peticiones a Spotify, round trips a la base de datos y tiempo; una segunda
+ejecución de ``batched`` muestra que las filas ya enriquecidas no se vuelven a pedir.
+
+Uso: ``python -m benchmarks.bench_enrichment [--tracks 10000] [--latency 0.02]``
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.common import configure_environment, serve_in_thread
+
+SPOTIFY_PORT = 54339
+POSTGREST_PORT = 54340
+
+configure_environment(
+    SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}",
+    SPOTIFY_RATE_LIMIT_PER_SECOND="100000",
+    SPOTIFY_RATE_LIMIT_BURST="100000",
+    SPOTIFY_MAX_CONCURRENT_REQUESTS="16",
+    HTTP_MAX_CONNECTIONS="16",
+    HTTP_MAX_KEEPALIVE_CONNECTIONS="16",
+)
+
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify import auth  # noqa: E402
+from src.adapters.spotify.client import close_http_clients  # noqa: E402
+from src.adapters.spotify.mapper import SpotifyRecordMapper  # noqa: E402
+from src.adapters.spotify.repository import SpotifyAPIRepository  # noqa: E402
+from src.adapters.supabase.client import close_async_supabase_client, get_async_supabase_client  # noqa: E402
+from src.core.services import library_enrichment  # noqa: E402
+from src.core.services.library_enrichment import LibraryEnrichmentService  # noqa: E402
+from src.core.services.sync_pipeline import SyncPipeline  # noqa: E402
+from src.core.services.sync_service import SyncService  # noqa: E402
+from src.presentation.api.v1 import deps  # noqa: E402
+
+VARIANTS = {"batched": (50, 100), "per-id": (1, 1)}
+ENRICHMENT_ENDPOINTS = ("/artists", "/audio-features")
+
+
+async def sync_library() -> int:
+    supabase_sync_service = await deps.get_async_supabase_sync_service(
+        await deps.get_async_supabase_artist_repository(),
+        await deps.get_async_supabase_album_repository(),
+        await deps.get_async_supabase_track_repository(auth.DEFAULT_USER),
+    )
+    pipeline = SyncPipeline(
+        SyncService(SpotifyAPIRepository()), supabase_sync_service, SpotifyRecordMapper().saved_track
+    )
+    summary = await pipeline.run("benchmark-token")
+    return summary.tracks_processed
+
+
+def _clear_enrichment(store: fake_postgrest.FakePostgrest) -> None:
+    for row in store.tables["spotify_artists"]:
+        row["enriched_at"] = None
+    for row in store.tables["spotify_tracks"]:
+        row["audio_features_at"] = None
+
+
+async def enrich(
+    variant: str,
+    library: fake_spotify.FakeSpotifyLibrary,
+    store: fake_postgrest.FakePostgrest,
+) -> None:
+    library_enrichment.ARTIST_IDS_PER_REQUEST, library_enrichment.AUDIO_FEATURE_IDS_PER_REQUEST = VARIANTS[variant]
+    service = LibraryEnrichmentService(SpotifyAPIRepository(), await get_async_supabase_client())
+    spotify_before = sum(library.requests[endpoint] for endpoint in ENRICHMENT_ENDPOINTS)
+    db_before = store.total_round_trips
+    started = time.perf_counter()
+    summary = await service.run("benchmark-token")
+    elapsed = time.perf_counter() - started
+    spotify = sum(library.requests[endpoint] for endpoint in ENRICHMENT_ENDPOINTS) - spotify_before
+    print(
+        f"  {variant:<18} {summary.artists_enriched:6d} artistas {summary.tracks_enriched:6d} tracks  "
+        f"{spotify:6d} peticiones a Spotify  {store.total_round_trips - db_before:4d} round trips  "
+        f"{elapsed:7.2f} s"
+    )
+
+
+async def run(args: argparse.Namespace, library: fake_spotify.FakeSpotifyLibrary, store) -> None:
+    try:
+        library.latency = 0.0
+        tracks = await sync_library()
+        library.latency = args.latency
+        print(
+            f"Enriquecimiento de {tracks} tracks y {len(store.tables['spotify_artists'])} artistas "
+            f"(latencia de Spotify {args.latency * 1000:.0f} ms)"
+        )
+        for variant in ("per-id", "batched"):
+            _clear_enrichment(store)
+            await enrich(variant, library, store)
+        library_enrichment.ARTIST_IDS_PER_REQUEST, library_enrichment.AUDIO_FEATURE_IDS_PER_REQUEST = VARIANTS["batched"]
+        spotify_before = sum(library.requests[endpoint] for endpoint in ENRICHMENT_ENDPOINTS)
+        service = LibraryEnrichmentService(SpotifyAPIRepository(), await get_async_supabase_client())
+        await service.run("benchmark-token")
+        spotify = sum(library.requests[endpoint] for endpoint in ENRICHMENT_ENDPOINTS) - spotify_before
+        print(f"  {'batched (de nuevo)':<18} {spotify:6d} peticiones a Spotify: nada pendiente")
+    finally:
+        await close_http_clients()
+        await close_async_supabase_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=10_000)
+    parser.add_argument("--artists", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02, help="Latencia de Spotify en segundos")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    library = fake_spotify.FakeSpotifyLibrary(library_size=args.tracks, artist_pool=args.artists)
+    store = fake_postgrest.FakePostgrest()
+    with serve_in_thread(fake_spotify.create_app(library), SPOTIFY_PORT) as spotify_url, \
+            serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+        SpotifyAPIRepository.BASE_URL = f"{spotify_url}/v1"
+        asyncio.run(run(args, library, store))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: cliente HTTP por petición frente a cliente compartido con pool.
+
+Simula una sincronización de varias páginas contra el stand-in local de
+Spotify y compara la latencia por petición de abrir un ``httpx.AsyncClient``
+nuevo en cada llamada (comportamiento anterior) con la de reutilizar el
+cliente compartido de ``src.adapters.spotify.client``.
+
+Uso: ``python -m benchmarks.bench_http_pool [--pages 200] [--latency 0.0]``
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import configure_environment, describe_latencies, serve_in_thread
+
+configure_environment()
+
+import httpx  # noqa: E402
+
+from benchmarks.stand_ins.fake_spotify import FakeSpotifyLibrary, create_app  # noqa: E402
+from src.adapters.spotify.client import close_http_clients, get_spotify_api_client  # noqa: E402
+from src.adapters.spotify.repository import SpotifyAPIRepository  # noqa: E402
+
+PORT = 54330
+
+
+async def _per_request_client(base_url: str, pages: int) -> list:
+    samples = []
+    for page in range(pages):
+        started = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.get(
+                f"{base_url}/v1/me/tracks", params={"offset": page * 50 % 1000, "limit": 50}
+            )
+            response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def _pooled_client(base_url: str, pages: int) -> list:
+    SpotifyAPIRepository.BASE_URL = f"{base_url}/v1"
+    repository = SpotifyAPIRepository(get_spotify_api_client())
+    samples = []
+    for page in range(pages):
+        started = time.perf_counter()
+        await repository.get_saved_tracks_page(page * 50 % 1000, 50, "benchmark-token")
+        samples.append(time.perf_counter() - started)
+    await close_http_clients()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia del servidor (s)")
+    args = parser.parse_args()
+
+    library = FakeSpotifyLibrary(library_size=1000, latency=args.latency)
+    with serve_in_thread(create_app(library), PORT) as base_url:
+        fresh = asyncio.run(_per_request_client(base_url, args.pages))
+        pooled = asyncio.run(_pooled_client(base_url, args.pages))
+
+    saved = statistics.fmean(fresh) - statistics.fmean(pooled)
+    print(f"Páginas por modo: {args.pages}")
+    print(f"Cliente por petición: {describe_latencies(fresh)}  total={sum(fresh):.2f}s")
+    print(f"Cliente compartido:   {describe_latencies(pooled)}  total={sum(pooled):.2f}s")
+    print(f"Ahorro por petición:  {saved * 1000:.2f}ms ({saved / statistics.fmean(fresh):.0%})")
+
+
+if __name__ == "__main__":
+    main()
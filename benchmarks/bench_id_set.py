@@ -0,0 +1,82 @@
+"""
+Benchmark: conjuntos de IDs de la reconciliación de canciones eliminadas.
+
+Compara dos ``set`` de ``str`` con dos ``PackedIdSet`` para una biblioteca de
+Spotify y la copia guardada en Supabase, de la que se han quitado
+``--removed`` tracks en Spotify. Los IDs llegan por bloques, como las páginas
+de Spotify y las consultas a Supabase, para que solo vivan los de un bloque a
+la vez.
+
+Mide el tiempo de construir ambos conjuntos y calcular la diferencia, y la
+memoria con ``tracemalloc``: lo que queda retenido por los conjuntos y el pico
+durante la construcción.
+
+Uso: ``python -m benchmarks.bench_id_set [--tracks 100000] [--removed 1000]``
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Iterator, List
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from benchmarks.stand_ins.fake_spotify import spotify_id  # noqa: E402
+from src.infrastructure.id_set import PackedIdSetBuilder  # noqa: E402
+
+CHUNK_SIZE = 1000
+
+
+def _chunks(indexes: range) -> Iterator[List[str]]:
+    for start in range(indexes.start, indexes.stop, CHUNK_SIZE):
+        yield [spotify_id("track", index) for index in range(start, min(start + CHUNK_SIZE, indexes.stop))]
+
+
+def with_sets(spotify: range, stored: range) -> tuple:
+    spotify_ids, stored_ids = set(), set()
+    for chunk in _chunks(spotify):
+        spotify_ids.update(chunk)
+    for chunk in _chunks(stored):
+        stored_ids.update(chunk)
+    return (spotify_ids, stored_ids), len(stored_ids - spotify_ids)
+
+
+def with_packed(spotify: range, stored: range) -> tuple:
+    spotify_builder, stored_builder = PackedIdSetBuilder(), PackedIdSetBuilder()
+    for chunk in _chunks(spotify):
+        spotify_builder.update(chunk)
+    for chunk in _chunks(stored):
+        stored_builder.update(chunk)
+    spotify_ids, stored_ids = spotify_builder.build(), stored_builder.build()
+    return (spotify_ids, stored_ids), sum(1 for _ in stored_ids.difference(spotify_ids))
+
+
+def measure(name: str, reconcile: Callable[[range, range], tuple], spotify: range, stored: range) -> None:
+    started = time.perf_counter()
+    reconcile(spotify, stored)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    retained, stale = reconcile(spotify, stored)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    print(f"{name:<8} {elapsed:8.2f} s  {current / 2**20:8.1f} MiB retenidos  {peak / 2**20:8.1f} MiB pico  {stale} obsoletos")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=100_000, help="Tracks guardados en Supabase")
+    parser.add_argument("--removed", type=int, default=1000, help="Tracks eliminados después en Spotify")
+    args = parser.parse_args()
+
+    stored = range(args.tracks)
+    spotify = range(args.removed, args.tracks)
+    print(f"Tracks guardados: {args.tracks}, eliminados en Spotify: {args.removed}")
+    measure("set[str]", with_sets, spotify, stored)
+    measure("packed", with_packed, spotify, stored)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: importación de ``YourLibrary.json`` con ``LibraryImportService``.
+
+Genera el archivo de datos de cuenta de una biblioteca sintética en disco, lo
+lee en streaming, completa los tracks contra el stand-in de Spotify
+(``GET /tracks?ids=``) y los guarda en el stand-in de PostgREST. Informa de
+tracks/s, peticiones a Spotify, round trips a la base de datos y memoria pico
+medida con ``tracemalloc`` en una segunda pasada. La memoria pico incluye los
+stand-ins, que se ejecutan en el mismo proceso y guardan la biblioteca entera;
+como referencia se mide también lo que ocupa solo recorrer el archivo.
+
+Uso: ``python -m benchmarks.bench_import [--tracks 50000] [--batch-size 1000]``
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import configure_environment, serve_in_thread
+
+SPOTIFY_PORT = 54332
+POSTGREST_PORT = 54333
+
+configure_environment(
+    SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}",
+    SPOTIFY_RATE_LIMIT_PER_SECOND="100000",
+    SPOTIFY_RATE_LIMIT_BURST="100000",
+)
+
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify import auth  # noqa: E402
+from src.adapters.spotify.client import close_http_clients  # noqa: E402
+from src.adapters.spotify.privacy_export import (  # noqa: E402
+    READ_CHUNK_SIZE,
+    JsonArrayStream,
+    aiter_library_tracks,
+)
+from src.adapters.spotify.repository import SpotifyAPIRepository  # noqa: E402
+from src.adapters.supabase.client import close_async_supabase_client  # noqa: E402
+from src.adapters.supabase.identity_cache import album_identity_cache, artist_identity_cache  # noqa: E402
+from src.core.services.library_import import LibraryImportService  # noqa: E402
+from src.presentation.api.v1 import deps  # noqa: E402
+
+
+async def read_file(path: str):
+    """Trozos del archivo, como llegarían en el cuerpo de una petición."""
+    with open(path, "rb") as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def run_import(path: str, batch_size: int):
+    service = LibraryImportService(
+        SpotifyAPIRepository(),
+        await deps.get_async_supabase_sync_service(
+            await deps.get_async_supabase_artist_repository(),
+            await deps.get_async_supabase_album_repository(),
+            await deps.get_async_supabase_track_repository(auth.DEFAULT_USER),
+        ),
+        batch_size,
+    )
+    try:
+        return await service.run(aiter_library_tracks(read_file(path)), "benchmark-token")
+    finally:
+        # Los clientes compartidos pertenecen a este event loop: se cierran antes de la siguiente pasada
+        await close_http_clients()
+        await close_async_supabase_client()
+
+
+def _reset(store: fake_postgrest.FakePostgrest) -> None:
+    store.reset()
+    artist_identity_cache.clear()
+    album_identity_cache.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=50_000)
+    parser.add_argument("--artists", type=int, default=2000)
+    parser.add_argument("--albums", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    library = fake_spotify.FakeSpotifyLibrary(
+        library_size=args.tracks, artist_pool=args.artists, album_pool=args.albums
+    )
+    store = fake_postgrest.FakePostgrest()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "YourLibrary.json")
+        with open(path, "wb") as file:
+            for chunk in library.your_library():
+                file.write(chunk)
+        size = os.path.getsize(path)
+
+        with serve_in_thread(fake_spotify.create_app(library), SPOTIFY_PORT) as spotify_url, \
+                serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+            SpotifyAPIRepository.BASE_URL = f"{spotify_url}/v1"
+            started = time.perf_counter()
+            result = asyncio.run(run_import(path, args.batch_size))
+            elapsed = time.perf_counter() - started
+            round_trips = store.total_round_trips
+
+            _reset(store)
+            tracemalloc.start()
+            asyncio.run(run_import(path, args.batch_size))
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        # Referencia: lo que ocupa solo recorrer el archivo, sin importar nada
+        tracemalloc.start()
+        stream = JsonArrayStream("tracks")
+        with open(path, "rb") as file:
+            while chunk := file.read(READ_CHUNK_SIZE):
+                stream.feed(chunk)
+        _current, parse_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    processed = result.summary.tracks_processed
+    print(f"Archivo: {size / 2**20:.1f} MiB, {result.records_read} registros, lotes de {args.batch_size}")
+    print(f"Importados: {processed} tracks en {elapsed:.2f}s ({processed / elapsed:,.0f} tracks/s)")
+    print(f"Peticiones a Spotify: {result.spotify_requests}; round trips a Supabase: {round_trips}")
+    print(f"Memoria pico (con los stand-ins): {peak / 2**20:.1f} MiB; "
+          f"recorrer solo el archivo: {parse_peak / 2**20:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: conversión de items de ``/me/tracks`` a entidades y respuestas.
+
+Compara la conversión anterior de ``tracks.py``, que construía cada artista y
+álbum dos veces (entidad y schema de respuesta) validando todas las URLs, con
+``SpotifyTrackMapper``, que hace una sola pasada, interna artistas y álbumes
+por ID y deriva las respuestas de las entidades.
+
+Mide µs por track, bloques de memoria asignados por track con ``tracemalloc``
+y cuántos objetos ``Artist``/``Album`` distintos quedan vivos.
+
+Uso: ``python -m benchmarks.bench_mapper [--tracks 5000]``
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from benchmarks.stand_ins.fake_spotify import FakeSpotifyLibrary  # noqa: E402
+from src.adapters.spotify.mapper import SpotifyTrackMapper  # noqa: E402
+from src.core.entities.track import Album, Artist, SavedTrack  # noqa: E402
+from src.presentation.schemas.track import AlbumResponse, ArtistResponse, SavedTrackResponse  # noqa: E402
+
+
+def _legacy_response(item: dict) -> SavedTrackResponse:
+    track = item['track']
+    return SavedTrackResponse(
+        added_at=item['added_at'],
+        spotify_track_id=track['id'],
+        track_name=track['name'],
+        artists=[
+            ArtistResponse(name=a['name'], spotify_id=a['id'], spotify_url=a['external_urls']['spotify'])
+            for a in track['artists']
+        ],
+        album=AlbumResponse(
+            name=track['album']['name'],
+            spotify_id=track['album']['id'],
+            spotify_url=track['album']['external_urls']['spotify'],
+            release_date=track['album']['release_date'],
+        ),
+        spotify_url=track['external_urls']['spotify'],
+    )
+
+
+def _legacy_entity(item: dict) -> SavedTrack:
+    track = item['track']
+    return SavedTrack(
+        spotify_track_id=track['id'],
+        track_name=track['name'],
+        artists=[
+            Artist(spotify_id=a['id'], name=a['name'], spotify_url=a['external_urls']['spotify'])
+            for a in track['artists']
+        ],
+        album=Album(
+            spotify_id=track['album']['id'],
+            name=track['album']['name'],
+            release_date=track['album']['release_date'],
+            spotify_url=track['album']['external_urls']['spotify'],
+            album_type=track['album']['album_type'],
+            artists=[
+                Artist(spotify_id=a['id'], name=a['name'], spotify_url=a['external_urls']['spotify'])
+                for a in track['album'].get('artists', [])
+            ],
+        ),
+        spotify_url=track['external_urls']['spotify'],
+        added_at=datetime.fromisoformat(item['added_at'].replace('Z', '+00:00')),
+    )
+
+
+def legacy(items: list) -> tuple:
+    return [_legacy_entity(item) for item in items], [_legacy_response(item) for item in items]
+
+
+def mapper(items: list) -> tuple:
+    entities = SpotifyTrackMapper().saved_tracks(items)
+    return entities, [SavedTrackResponse.from_entity(entity) for entity in entities]
+
+
+def _distinct(entities: list) -> tuple:
+    artists = {id(a) for track in entities for a in track.artists}
+    artists |= {id(a) for track in entities for a in track.album.artists}
+    albums = {id(track.album) for track in entities}
+    return len(artists), len(albums)
+
+
+def measure(name: str, convert, items: list) -> None:
+    convert(items[:100])  # calentamiento
+    gc.collect()
+    started = time.perf_counter()
+    convert(items)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    entities, _responses = convert(items)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    size = sum(stat.size for stat in snapshot.statistics("filename"))
+    artists, albums = _distinct(entities)
+    print(
+        f"{name:<8} {elapsed / len(items) * 1e6:8.1f} µs/track  "
+        f"{blocks / len(items):7.1f} bloques/track  {size / len(items) / 1024:6.2f} KiB/track  "
+        f"artistas={artists} álbumes={albums}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--artists", type=int, default=200, help="Artistas distintos en la biblioteca")
+    parser.add_argument("--albums", type=int, default=400, help="Álbumes distintos en la biblioteca")
+    args = parser.parse_args()
+
+    library = FakeSpotifyLibrary(library_size=args.tracks, artist_pool=args.artists, album_pool=args.albums)
+    items = [library.item(position) for position in range(args.tracks)]
+    print(f"Tracks: {args.tracks}, artistas: {args.artists}, álbumes: {args.albums}")
+    measure("antes", legacy, items)
+    measure("mapper", mapper, items)
+
+
+if __name__ == "__main__":
+    main()
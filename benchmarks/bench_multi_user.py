@@ -0,0 +1,144 @@
+"""
+Benchmark: sincronizaciones de varios usuarios en un mismo proceso.
+
+Dos mediciones contra los stand-ins, con latencia en Spotify:
+
+- Rendimiento agregado: 1, 2, 4 y 8 usuarios lanzan a la vez una sincronización
+  completa con ``SyncJobManager`` (un trabajo en curso por usuario), compartiendo
+  el cliente HTTP, el planificador y el cliente de Supabase. Informa de tracks/s
+  en total; crece con los usuarios hasta el límite de ritmo configurado o hasta
+  saturar la CPU (los stand-ins se ejecutan en el mismo proceso).
+- Reparto del ritmo: con un límite de ritmo bajo, un usuario "pesado" pide muchas
+  páginas en paralelo y, poco después, uno "ligero" pide unas pocas. Compara cuánto
+  tarda el ligero con ``TokenBucket`` (orden de llegada) y con ``FairTokenBucket``.
+
+Uso: ``python -m benchmarks.bench_multi_user [--tracks 2000] [--latency 0.2]``
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.common import configure_environment, serve_in_thread
+
+SPOTIFY_PORT = 54336
+POSTGREST_PORT = 54337
+USER_COUNTS = (1, 2, 4, 8)
+
+configure_environment(
+    SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}",
+    SPOTIFY_RATE_LIMIT_PER_SECOND="400",
+    SPOTIFY_RATE_LIMIT_BURST="20",
+    SPOTIFY_MAX_CONCURRENT_REQUESTS="64",
+    HTTP_MAX_CONNECTIONS="64",
+    HTTP_MAX_KEEPALIVE_CONNECTIONS="64",
+)
+
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify.client import close_http_clients, get_spotify_api_client  # noqa: E402
+from src.adapters.spotify.mapper import SpotifyRecordMapper  # noqa: E402
+from src.adapters.spotify.page_cache import page_cache  # noqa: E402
+from src.adapters.spotify.repository import SpotifyAPIRepository  # noqa: E402
+from src.adapters.spotify.scheduler import FairTokenBucket, TokenBucket, get_spotify_scheduler  # noqa: E402
+from src.adapters.supabase.client import close_async_supabase_client  # noqa: E402
+from src.adapters.supabase.identity_cache import album_identity_cache, artist_identity_cache  # noqa: E402
+from src.core.services.sync_jobs import SyncJobManager  # noqa: E402
+from src.core.services.sync_pipeline import SyncPipeline  # noqa: E402
+from src.core.services.sync_service import MAX_PAGE_SIZE, SyncService  # noqa: E402
+from src.presentation.api.v1 import deps  # noqa: E402
+
+FETCH_CONCURRENCY = 4
+
+
+def _reset(store: fake_postgrest.FakePostgrest) -> None:
+    store.reset()
+    artist_identity_cache.clear()
+    album_identity_cache.clear()
+    page_cache.clear()
+
+
+async def _pipeline(user: str) -> SyncPipeline:
+    supabase_sync_service = await deps.get_async_supabase_sync_service(
+        await deps.get_async_supabase_artist_repository(),
+        await deps.get_async_supabase_album_repository(),
+        await deps.get_async_supabase_track_repository(user),
+    )
+    spotify = SpotifyAPIRepository(page_cache=page_cache, user=user)
+    return SyncPipeline(
+        SyncService(spotify), supabase_sync_service, SpotifyRecordMapper().saved_track,
+        fetch_concurrency=FETCH_CONCURRENCY,
+    )
+
+
+async def aggregate_throughput(users: int) -> tuple:
+    jobs = SyncJobManager(max_running=max(USER_COUNTS), max_active=max(USER_COUNTS), history_size=0)
+    started = time.perf_counter()
+    started_jobs = [
+        jobs.start(await _pipeline(f"user-{index}"), f"token-{index}", MAX_PAGE_SIZE, f"user-{index}")
+        for index in range(users)
+    ]
+    await asyncio.gather(*(job.task for job in started_jobs))
+    elapsed = time.perf_counter() - started
+    tracks = sum(job.pipeline.summary.tracks_processed for job in started_jobs)
+    return tracks, elapsed
+
+
+async def light_user_wait(bucket_class, heavy_pages: int, light_pages: int, rate: float) -> tuple:
+    scheduler = get_spotify_scheduler()
+    scheduler._bucket = bucket_class(rate, 1)
+    client = get_spotify_api_client()
+    heavy = SpotifyAPIRepository(client, scheduler, user="heavy")
+    light = SpotifyAPIRepository(client, scheduler, user="light")
+
+    async def fetch(repo: SpotifyAPIRepository, pages: int) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(repo.get_saved_tracks_page(page * 10, 10, "token") for page in range(pages)))
+        return time.perf_counter() - started
+
+    heavy_task = asyncio.create_task(fetch(heavy, heavy_pages))
+    await asyncio.sleep(0.1)
+    light_elapsed = await fetch(light, light_pages)
+    heavy_elapsed = await heavy_task
+    return light_elapsed, heavy_elapsed
+
+
+async def run(args: argparse.Namespace, store: fake_postgrest.FakePostgrest) -> None:
+    try:
+        print(f"Rendimiento agregado ({args.tracks} tracks por usuario, latencia {args.latency * 1000:.0f} ms)")
+        for users in USER_COUNTS:
+            _reset(store)
+            tracks, elapsed = await aggregate_throughput(users)
+            print(f"  {users} usuario(s): {tracks:6d} tracks en {elapsed:6.2f} s  {tracks / elapsed:8.0f} tracks/s")
+
+        print(
+            f"Reparto del ritmo ({args.rate:.0f} peticiones/s; pesado {args.heavy_pages} páginas, "
+            f"ligero {args.light_pages})"
+        )
+        for name, bucket_class in (("fifo", TokenBucket), ("fair", FairTokenBucket)):
+            light, heavy = await light_user_wait(bucket_class, args.heavy_pages, args.light_pages, args.rate)
+            print(f"  {name:<5} ligero {light:6.2f} s  pesado {heavy:6.2f} s")
+    finally:
+        await close_http_clients()
+        await close_async_supabase_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latencia de Spotify en segundos")
+    parser.add_argument("--rate", type=float, default=50.0, help="Peticiones/s en la medición del reparto")
+    parser.add_argument("--heavy-pages", type=int, default=150)
+    parser.add_argument("--light-pages", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    library = fake_spotify.FakeSpotifyLibrary(library_size=args.tracks, latency=args.latency)
+    store = fake_postgrest.FakePostgrest()
+    with serve_in_thread(fake_spotify.create_app(library), SPOTIFY_PORT) as spotify_url, \
+            serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+        SpotifyAPIRepository.BASE_URL = f"{spotify_url}/v1"
+        asyncio.run(run(args, store))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: memoria de las entidades Pydantic frente a los registros con ``__slots__``.
+
+Compara ``SpotifyTrackMapper`` (entidades ``SavedTrack``/``Album``/``Artist``)
+con ``SpotifyRecordMapper`` (``TrackRecord``/``AlbumRecord``/``ArtistRecord``)
+en dos mediciones:
+
+- Bytes por track retenidos con ``tracemalloc`` al convertir toda la biblioteca
+  y mantenerla en memoria, con artistas y álbumes internados.
+- RSS pico (``VmHWM``) de una sincronización completa con ``SyncPipeline`` contra los
+  stand-ins. Cada variante se ejecuta en un proceso hijo (los stand-ins siguen
+  en este proceso), así que el pico no incluye la base de datos en memoria; se
+  informa también del RSS del hijo justo antes de sincronizar.
+
+Uso: ``python -m benchmarks.bench_records [--tracks 20000]``
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import tracemalloc
+from typing import Callable
+
+from benchmarks.common import configure_environment, serve_in_thread
+
+SPOTIFY_PORT = 54334
+POSTGREST_PORT = 54335
+
+configure_environment(
+    SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}",
+    SPOTIFY_RATE_LIMIT_PER_SECOND="100000",
+    SPOTIFY_RATE_LIMIT_BURST="100000",
+)
+
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify import auth  # noqa: E402
+from src.adapters.spotify.mapper import SpotifyRecordMapper, SpotifyTrackMapper  # noqa: E402
+
+MAPPERS = {"pydantic": SpotifyTrackMapper, "slots": SpotifyRecordMapper}
+
+
+def _status_kib(field: str) -> int:
+    # VmHWM es el pico de RSS de este proceso; `ru_maxrss` conserva el del padre tras fork/exec
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    return 0
+
+
+def retained_bytes(mapper_class: Callable, library: fake_spotify.FakeSpotifyLibrary) -> int:
+    items = [library.item(position) for position in range(library.library_size)]
+    tracemalloc.start()
+    tracks = mapper_class().saved_tracks(items)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tracks
+    return current
+
+
+def _sync_child(variant: str, spotify_url: str, results) -> None:
+    from src.adapters.spotify.client import close_http_clients
+    from src.adapters.spotify.repository import SpotifyAPIRepository
+    from src.adapters.supabase.client import close_async_supabase_client
+    from src.core.services.sync_pipeline import SyncPipeline
+    from src.core.services.sync_service import SyncService
+    from src.presentation.api.v1 import deps
+
+    logging.disable(logging.INFO)
+    SpotifyAPIRepository.BASE_URL = f"{spotify_url}/v1"
+
+    async def sync() -> int:
+        supabase_sync_service = await deps.get_async_supabase_sync_service(
+            await deps.get_async_supabase_artist_repository(),
+            await deps.get_async_supabase_album_repository(),
+            await deps.get_async_supabase_track_repository(auth.DEFAULT_USER),
+        )
+        pipeline = SyncPipeline(
+            SyncService(SpotifyAPIRepository()), supabase_sync_service, MAPPERS[variant]().saved_track
+        )
+        try:
+            summary = await pipeline.run("benchmark-token")
+        finally:
+            await close_http_clients()
+            await close_async_supabase_client()
+        return summary.tracks_processed
+
+    before = _status_kib("VmRSS")
+    tracks = asyncio.run(sync())
+    results.put((tracks, before, _status_kib("VmHWM")))
+
+
+def sync_rss(variant: str, spotify_url: str) -> tuple:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_sync_child, args=(variant, spotify_url, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=20_000)
+    parser.add_argument("--artists", type=int, default=2000)
+    parser.add_argument("--albums", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    library = fake_spotify.FakeSpotifyLibrary(
+        library_size=args.tracks, artist_pool=args.artists, album_pool=args.albums
+    )
+    print(f"Tracks: {args.tracks}, artistas: {args.artists}, álbumes: {args.albums}")
+    for variant, mapper_class in MAPPERS.items():
+        print(f"{variant:<9} {retained_bytes(mapper_class, library) / args.tracks:8.0f} bytes/track retenidos")
+
+    store = fake_postgrest.FakePostgrest()
+    with serve_in_thread(fake_spotify.create_app(library), SPOTIFY_PORT) as spotify_url, \
+            serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+        for variant in MAPPERS:
+            store.reset()
+            tracks, before, peak = sync_rss(variant, spotify_url)
+            print(
+                f"{variant:<9} sincronización de {tracks} tracks: RSS pico {peak / 1024:7.1f} MiB "
+                f"(antes de sincronizar {before / 1024:7.1f} MiB, +{(peak - before) / 1024:.1f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark: estado compartido en SQLite para despliegues con varios workers.
+
+Tres mediciones:
+
+- Coste de resolver los UUID de una página (50 IDs de artistas): acierto en la LRU
+  del proceso, fallo local resuelto por SQLite (``SharedIdentityCache``) y, como
+  referencia, la consulta ``in_`` a Supabase que haría un worker con la caché fría
+  (contra ``fake_postgrest``, sin latencia de red añadida).
+- ``--workers`` procesos escribiendo y leyendo correspondencias a la vez: operaciones
+  por segundo y comprobación de que todos ven las de los demás.
+- ``--workers`` procesos refrescando a la vez el mismo token caducado: refrescos
+  pedidos a Spotify con estado compartido (bloqueo entre procesos) y sin él.
+
+Uso: ``python -m benchmarks.bench_shared_state [--workers 4] [--rounds 2000]``
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from uuid import NAMESPACE_URL, uuid5
+
+from benchmarks.common import configure_environment, serve_in_thread
+
+POSTGREST_PORT = 54338
+PAGE = 50
+REFRESH_SECONDS = 0.2
+
+configure_environment(SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}")
+
+
+def _uuid(spotify_id: str):
+    return uuid5(NAMESPACE_URL, spotify_id)
+
+
+def _configure_child(state_path: str) -> None:
+    configure_environment(SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}")
+    if state_path:
+        os.environ["SHARED_STATE_BACKEND"] = "sqlite"
+        os.environ["SHARED_STATE_PATH"] = state_path
+    logging.disable(logging.INFO)
+
+
+def _timed(operation, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def lookup_costs(state_path: str, rounds: int) -> None:
+    from benchmarks.stand_ins import fake_postgrest
+    from src.adapters.supabase.client import get_supabase_client
+    from src.adapters.supabase.identity_cache import SharedIdentityCache
+    from src.infrastructure.shared_state import SQLiteSharedState
+
+    ids = [f"artist{index:05d}" for index in range(5000)]
+    page = ids[:PAGE]
+    state = SQLiteSharedState(state_path)
+    cache = SharedIdentityCache(len(ids), state, "artists")
+    cache.put_many({spotify_id: _uuid(spotify_id) for spotify_id in ids})
+
+    store = fake_postgrest.FakePostgrest()
+    store.insert(
+        "spotify_artists",
+        [{"id": str(_uuid(spotify_id)), "spotify_id": spotify_id, "name": spotify_id} for spotify_id in ids],
+        None, None, None,
+    )
+    with serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+        client = get_supabase_client()
+
+        def local_miss() -> None:
+            # Como en otro worker: la caché del proceso está vacía
+            SharedIdentityCache(PAGE, state, "artists").get_many(page)
+
+        print(f"Resolver {PAGE} IDs (mediana de {rounds}):")
+        print(f"  LRU del proceso        {_timed(lambda: cache.get_many(page), rounds):9.1f} µs")
+        print(f"  estado compartido      {_timed(local_miss, rounds):9.1f} µs")
+        supabase = _timed(
+            lambda: client.table("spotify_artists").select("id,spotify_id").in_("spotify_id", page).execute(),
+            max(1, rounds // 10),
+        )
+        print(f"  consulta a Supabase    {supabase:9.1f} µs")
+
+
+def _mapping_worker(state_path: str, index: int, workers: int, rounds: int, results) -> None:
+    _configure_child(state_path)
+    from src.infrastructure.shared_state import SQLiteSharedState
+
+    state = SQLiteSharedState(state_path)
+    started = time.perf_counter()
+    for round_ in range(rounds):
+        page = [f"w{index}-{round_}-{position}" for position in range(PAGE)]
+        state.put_ids("artists", {spotify_id: _uuid(spotify_id) for spotify_id in page})
+        # Lee una página escrita por otro worker en la misma vuelta (o una anterior)
+        other = (index + 1) % workers
+        state.get_ids("artists", [f"w{other}-{round_}-{position}" for position in range(PAGE)])
+    results.put(time.perf_counter() - started)
+
+
+def concurrent_mappings(state_path: str, workers: int, rounds: int) -> None:
+    from src.infrastructure.shared_state import SQLiteSharedState
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_mapping_worker, args=(state_path, index, workers, rounds, results))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    elapsed = max(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    state = SQLiteSharedState(state_path)
+    expected = [f"w{index}-{round_}-0" for index in range(workers) for round_ in range(rounds)]
+    visible = len(state.get_ids("artists", expected))
+    operations = workers * rounds * 2
+    print(
+        f"{workers} workers, {rounds} escrituras + {rounds} lecturas de {PAGE} IDs cada uno: "
+        f"{operations / elapsed:8.0f} operaciones/s, {visible}/{len(expected)} páginas visibles para todos"
+    )
+
+
+def _refresh_worker(state_path: str, token_dir: str, counter_path: str, start_at: float, results) -> None:
+    _configure_child(state_path)
+    os.chdir(token_dir)
+    from src.adapters.spotify import auth
+
+    def request_refresh(refresh_token: str) -> dict:
+        with open(counter_path, "a") as counter:
+            counter.write(".")
+        time.sleep(REFRESH_SECONDS)
+        return {"access_token": f"fresh-{os.getpid()}", "expires_in": 3600}
+
+    auth._request_refresh = request_refresh
+    stale = auth.get_access_token()
+    time.sleep(max(0.0, start_at - time.time()))
+    results.put(asyncio.run(auth.refresh_access_token(stale_token=stale)))
+
+
+def concurrent_refreshes(state_path: str, workers: int) -> None:
+    from src.adapters.spotify import auth
+
+    for label, path in (("sin estado compartido", ""), ("con estado compartido", state_path)):
+        with tempfile.TemporaryDirectory() as token_dir:
+            stale = {"access_token": "stale", "refresh_token": "refresh", "expires_at": time.time() - 1}
+            if path:
+                from src.infrastructure.shared_state import SQLiteSharedState
+                SQLiteSharedState(path).put_token(auth.DEFAULT_USER, stale)
+            else:
+                cwd = os.getcwd()
+                os.chdir(token_dir)
+                auth._save_token_to_file(stale)
+                os.chdir(cwd)
+            counter_path = os.path.join(token_dir, "refreshes")
+            context = multiprocessing.get_context("spawn")
+            results = context.Queue()
+            start_at = time.time() + 2
+            processes = [
+                context.Process(target=_refresh_worker, args=(path, token_dir, counter_path, start_at, results))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            tokens = {results.get() for _ in processes}
+            for process in processes:
+                process.join()
+            with open(counter_path) as counter:
+                refreshes = len(counter.read())
+            print(f"  {label:<22} {refreshes} refrescos pedidos a Spotify, {len(tokens)} tokens distintos en uso")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        lookup_costs(os.path.join(directory, "lookups.db"), args.rounds)
+        concurrent_mappings(os.path.join(directory, "mappings.db"), args.workers, args.rounds)
+        print(f"{args.workers} workers refrescando a la vez el mismo token caducado:")
+        concurrent_refreshes(os.path.join(directory, "tokens.db"), args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: peticiones simultáneas e iguales a ``GET /api/v1/tracks/sync``.
+
+Para cada página de la biblioteca, ``--clients`` clientes piden a la vez la misma
+página (como un cliente que reintenta tras un timeout o varias pestañas abiertas)
+contra los stand-ins, con latencia en Spotify y en la base de datos. Compara el
+endpoint sin agrupar las llamadas (cada una descarga y guarda la página) con
+``SingleFlight`` (una descarga y un guardado por página, compartidos).
+
+Informa de peticiones a ``/me/tracks``, round trips a la base de datos, latencia
+p50/p99 por petición y tiempo total.
+
+Uso: ``python -m benchmarks.bench_single_flight [--pages 20] [--clients 8]``
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.common import configure_environment, percentile, serve_in_thread
+
+SPOTIFY_PORT = 54341
+POSTGREST_PORT = 54342
+
+configure_environment(
+    SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}",
+    SPOTIFY_RATE_LIMIT_PER_SECOND="100000",
+    SPOTIFY_RATE_LIMIT_BURST="100000",
+    SPOTIFY_MAX_CONCURRENT_REQUESTS="64",
+    HTTP_MAX_CONNECTIONS="64",
+    HTTP_MAX_KEEPALIVE_CONNECTIONS="64",
+)
+
+import httpx  # noqa: E402
+
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify.client import close_http_clients  # noqa: E402
+from src.adapters.spotify.page_cache import page_cache  # noqa: E402
+from src.adapters.spotify.repository import SpotifyAPIRepository  # noqa: E402
+from src.adapters.supabase.client import close_async_supabase_client  # noqa: E402
+from src.adapters.supabase.identity_cache import album_identity_cache, artist_identity_cache  # noqa: E402
+from src.core.services.sync_service import MAX_PAGE_SIZE  # noqa: E402
+from src.infrastructure.single_flight import SingleFlight  # noqa: E402
+from src.presentation.api.v1 import deps  # noqa: E402
+
+
+class _Uncoalesced:
+    """Referencia: cada llamada ejecuta la operación, como antes de SingleFlight."""
+
+    def __len__(self) -> int:
+        return 0
+
+    async def do(self, key, fn):
+        return await fn()
+
+
+def _reset(store: fake_postgrest.FakePostgrest) -> None:
+    store.reset()
+    artist_identity_cache.clear()
+    album_identity_cache.clear()
+    page_cache.clear()
+
+
+async def burst(pages: int, clients: int) -> list:
+    import main
+
+    samples = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+
+        async def call(offset: int) -> None:
+            started = time.perf_counter()
+            response = await client.get("/api/v1/tracks/sync", params={"offset": offset, "limit": MAX_PAGE_SIZE})
+            response.raise_for_status()
+            samples.append(time.perf_counter() - started)
+
+        for page in range(pages):
+            await asyncio.gather(*(call(page * MAX_PAGE_SIZE) for _ in range(clients)))
+    await close_http_clients()
+    await close_async_supabase_client()
+    return samples
+
+
+def measure(name: str, flights, args, library, store) -> None:
+    import main
+
+    main.app.dependency_overrides[deps.get_sync_flights] = lambda: flights
+    _reset(store)
+    spotify_before = library.requests["/me/tracks"]
+    started = time.perf_counter()
+    samples = asyncio.run(burst(args.pages, args.clients))
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {name:<12} {library.requests['/me/tracks'] - spotify_before:5d} peticiones a /me/tracks  "
+        f"{store.total_round_trips:5d} round trips  p50 {percentile(samples, 50) * 1000:7.1f} ms  "
+        f"p99 {percentile(samples, 99) * 1000:7.1f} ms  total {elapsed:6.2f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1, help="Latencia de Spotify en segundos")
+    parser.add_argument("--db-latency", type=float, default=0.005)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    import main as app_main
+
+    app_main.app.dependency_overrides[deps.get_spotify_token] = lambda: "benchmark-token"
+    library = fake_spotify.FakeSpotifyLibrary(library_size=args.pages * MAX_PAGE_SIZE, latency=args.latency)
+    store = fake_postgrest.FakePostgrest(latency=args.db_latency)
+    with serve_in_thread(fake_spotify.create_app(library), SPOTIFY_PORT) as spotify_url, \
+            serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+        SpotifyAPIRepository.BASE_URL = f"{spotify_url}/v1"
+        print(f"{args.clients} peticiones simultáneas e iguales por página, {args.pages} páginas")
+        measure("sin agrupar", _Uncoalesced(), args, library, store)
+        measure("SingleFlight", SingleFlight("benchmark_sync_page"), args, library, store)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Suite de benchmarks de la sincronización, sin Spotify ni Supabase reales.
+
+Levanta los dos stand-ins locales (``fake_spotify`` y ``fake_postgrest``) y
+ejecuta cada escenario sobre una base de datos vacía:
+
+- ``fetch``: ``SyncService.get_saved_tracks`` página a página.
+- ``save_legacy``: ``SupabaseSyncService.save_saved_tracks`` (fila a fila).
+- ``save_batch``: ``SupabaseSyncService.save_saved_tracks_batch`` por página.
+- ``sync_endpoint``: ``GET /api/v1/tracks/sync`` recorriendo la biblioteca.
+
+Para cada escenario informa de tracks/s, round trips a la base de datos por
+track, latencia p50/p99 por operación (página o petición) y memoria pico
+medida con ``tracemalloc`` en una segunda pasada. La memoria pico incluye los
+stand-ins, que se ejecutan en el mismo proceso.
+
+El limitador de peticiones a Spotify se desactiva en la práctica (ritmo muy
+alto) para medir el código y no el límite configurado.
+
+Uso: ``python -m benchmarks.bench_sync_suite [--tracks 2000] [--db-latency 0.002]``
+"""
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.common import configure_environment, percentile, serve_in_thread
+
+SPOTIFY_PORT = 54330
+POSTGREST_PORT = 54331
+
+configure_environment(
+    SUPABASE_URL=f"http://127.0.0.1:{POSTGREST_PORT}",
+    SPOTIFY_RATE_LIMIT_PER_SECOND="100000",
+    SPOTIFY_RATE_LIMIT_BURST="100000",
+)
+
+import httpx  # noqa: E402
+
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify import auth  # noqa: E402
+from src.adapters.spotify.client import close_http_clients  # noqa: E402
+from src.adapters.spotify.mapper import SpotifyTrackMapper  # noqa: E402
+from src.adapters.spotify.page_cache import page_cache  # noqa: E402
+from src.adapters.spotify.repository import SpotifyAPIRepository  # noqa: E402
+from src.adapters.supabase.client import close_async_supabase_client  # noqa: E402
+from src.adapters.supabase.identity_cache import album_identity_cache, artist_identity_cache  # noqa: E402
+from src.core.services.sync_service import MAX_PAGE_SIZE, SyncService  # noqa: E402
+from src.presentation.api.v1 import deps  # noqa: E402
+
+PAGE_SIZE = MAX_PAGE_SIZE
+
+
+class Scenario:
+    """Escenario medible: `run` devuelve el número de tracks y las latencias por operación."""
+
+    def __init__(self, name: str, run: Callable[[], tuple]):
+        self.name = name
+        self.run = run
+
+
+def _reset(store: fake_postgrest.FakePostgrest) -> None:
+    store.reset()
+    artist_identity_cache.clear()
+    album_identity_cache.clear()
+    # Con la base de datos vacía, un 304 no debe saltarse el guardado de la página
+    page_cache.clear()
+
+
+def _pages(library: fake_spotify.FakeSpotifyLibrary, tracks: int) -> List[list]:
+    return [
+        [library.item(position) for position in range(offset, min(offset + PAGE_SIZE, tracks))]
+        for offset in range(0, tracks, PAGE_SIZE)
+    ]
+
+
+def fetch_scenario(tracks: int) -> Scenario:
+    async def fetch() -> tuple:
+        async with httpx.AsyncClient() as client:
+            service = SyncService(SpotifyAPIRepository(client))
+            samples = []
+            fetched = 0
+            for offset in range(0, tracks, PAGE_SIZE):
+                started = time.perf_counter()
+                fetched += len(await service.get_saved_tracks(offset, PAGE_SIZE, "benchmark-token"))
+                samples.append(time.perf_counter() - started)
+            return fetched, samples
+
+    return Scenario("fetch", lambda: asyncio.run(fetch()))
+
+
+def save_scenario(name: str, library, tracks: int, method: str) -> Scenario:
+    pages = _pages(library, tracks)
+
+    def save() -> tuple:
+        service = deps.get_supabase_sync_service(
+            deps.get_supabase_artist_repository(),
+            deps.get_supabase_album_repository(),
+            deps.get_supabase_track_repository(auth.DEFAULT_USER),
+        )
+        save_page = getattr(service, method)
+        samples = []
+        for items in pages:
+            entities = SpotifyTrackMapper().saved_tracks(items)
+            started = time.perf_counter()
+            save_page(entities)
+            samples.append(time.perf_counter() - started)
+        return tracks, samples
+
+    return Scenario(name, save)
+
+
+def endpoint_scenario(tracks: int) -> Scenario:
+    import main
+
+    main.app.dependency_overrides[deps.get_spotify_token] = lambda: "benchmark-token"
+
+    async def sync() -> tuple:
+        transport = httpx.ASGITransport(app=main.app)
+        samples = []
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for offset in range(0, tracks, PAGE_SIZE):
+                started = time.perf_counter()
+                response = await client.get(
+                    "/api/v1/tracks/sync", params={"offset": offset, "limit": PAGE_SIZE}
+                )
+                response.raise_for_status()
+                samples.append(time.perf_counter() - started)
+        # Los clientes compartidos pertenecen a este event loop: se cierran antes de la siguiente pasada
+        await close_http_clients()
+        await close_async_supabase_client()
+        return tracks, samples
+
+    return Scenario("sync_endpoint", lambda: asyncio.run(sync()))
+
+
+def measure(scenario: Scenario, store: fake_postgrest.FakePostgrest) -> None:
+    _reset(store)
+    started = time.perf_counter()
+    tracks, samples = scenario.run()
+    elapsed = time.perf_counter() - started
+    round_trips = store.total_round_trips
+
+    _reset(store)
+    tracemalloc.start()
+    scenario.run()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{scenario.name:<14} {tracks / elapsed:10.1f} {round_trips / tracks:10.2f} "
+        f"{percentile(samples, 50) * 1000:9.2f} {percentile(samples, 99) * 1000:9.2f} "
+        f"{peak / 2**20:9.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=2000, help="Tamaño de la biblioteca")
+    parser.add_argument("--artists", type=int, default=200, help="Artistas distintos")
+    parser.add_argument("--albums", type=int, default=400, help="Álbumes distintos")
+    parser.add_argument("--legacy-tracks", type=int, default=200, help="Tracks para save_legacy (es lento)")
+    parser.add_argument("--spotify-latency", type=float, default=0.0, help="Latencia de Spotify (s)")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Latencia de Supabase por petición (s)")
+    parser.add_argument(
+        "--only", nargs="*", default=None,
+        help="Escenarios a ejecutar (fetch, save_legacy, save_batch, sync_endpoint)",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    library = fake_spotify.FakeSpotifyLibrary(
+        library_size=args.tracks,
+        artist_pool=args.artists,
+        album_pool=args.albums,
+        latency=args.spotify_latency,
+    )
+    store = fake_postgrest.FakePostgrest(latency=args.db_latency)
+    with serve_in_thread(fake_spotify.create_app(library), SPOTIFY_PORT) as spotify_url, \
+            serve_in_thread(fake_postgrest.create_app(store), POSTGREST_PORT):
+        SpotifyAPIRepository.BASE_URL = f"{spotify_url}/v1"
+        scenarios = [
+            fetch_scenario(args.tracks),
+            save_scenario("save_legacy", library, min(args.legacy_tracks, args.tracks), "save_saved_tracks"),
+            save_scenario("save_batch", library, args.tracks, "save_saved_tracks_batch"),
+            endpoint_scenario(args.tracks),
+        ]
+        print(
+            f"Biblioteca: {args.tracks} tracks, {args.artists} artistas, {args.albums} álbumes; "
+            f"latencia Spotify={args.spotify_latency * 1000:.0f}ms, Supabase={args.db_latency * 1000:.0f}ms"
+        )
+        print(f"{'escenario':<14} {'tracks/s':>10} {'rt/track':>10} {'p50 ms':>9} {'p99 ms':>9} {'pico MiB':>9}")
+        for scenario in scenarios:
+            if args.only is None or scenario.name in args.only:
+                measure(scenario, store)
+
+
+if __name__ == "__main__":
+    main()
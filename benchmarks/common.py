@@ -0,0 +1,65 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Los benchmarks se ejecutan desde la raíz del repositorio como módulos, por
+ejemplo ``python -m benchmarks.bench_http_pool``. No necesitan credenciales
+reales: ``configure_environment`` rellena la configuración mínima y los
+stand-ins de ``benchmarks/stand_ins`` sustituyen a Spotify y Supabase.
+"""
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+
+def configure_environment(**overrides: str) -> None:
+    """Define variables de entorno ficticias antes de importar ``src``."""
+    defaults = {
+        "SPOTIFY_CLIENT_ID": "benchmark-client-id",
+        "SPOTIFY_CLIENT_SECRET": "benchmark-client-secret",
+        "SPOTIFY_REDIRECT_URI": "http://127.0.0.1:8000/api/v1/auth/callback",
+        "SUPABASE_URL": "http://127.0.0.1:54321",
+        "SUPABASE_SERVICE_KEY": "benchmark-service-key",
+    }
+    defaults.update(overrides)
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+@contextmanager
+def serve_in_thread(app, port: int) -> Iterator[str]:
+    """Sirve una aplicación ASGI con uvicorn en un hilo y devuelve su URL base."""
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Percentil por el método del rango más cercano."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def describe_latencies(samples: List[float]) -> str:
+    """Resumen de latencias en milisegundos."""
+    return (
+        f"media={statistics.fmean(samples) * 1000:.2f}ms "
+        f"p50={percentile(samples, 50) * 1000:.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:.2f}ms"
+    )
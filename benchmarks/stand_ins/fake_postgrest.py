@@ -0,0 +1,547 @@
+"""
+Stand-in en memoria compatible con PostgREST para las tablas ``spotify_*``.
+
+Implementa el subconjunto de la API REST que usa ``supabase-py`` en este
+proyecto: ``select`` con columnas, filtros (``eq``, ``neq``, ``gt``, ``gte``,
+``lt``, ``lte``, ``in``, ``is``, ``or``/``and``), ``order``, ``limit``/``offset``,
+recursos embebidos (``alias:tabla(*)``) por clave foránea o tabla de unión, inserciones
+individuales y masivas, upserts con ``on_conflict`` y ``resolution``, ``PATCH``
+y ``DELETE`` con filtros, y las funciones de ``RPC_UPDATES`` por ``/rpc``. Cada
+petición puede retrasarse con una latencia configurable para simular la red hacia
+Supabase y cuenta como un round trip, y ``fail_next`` hace que las siguientes
+peticiones de un método a una tabla respondan con un error 500.
+
+Las claves únicas de cada tabla se indexan en memoria para que los conflictos
+y los filtros ``eq``/``in`` sobre ellas no recorran toda la tabla: así el coste
+del stand-in no crece con el tamaño de la biblioteca y no distorsiona las
+medidas de los benchmarks.
+"""
+import asyncio
+import json
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Claves únicas por tabla; la primera es la que usa ``on_conflict`` por defecto.
+TABLE_KEYS: Dict[str, List[Tuple[str, ...]]] = {
+    "spotify_artists": [("id",), ("spotify_id",)],
+    "spotify_albums": [("id",), ("spotify_id",)],
+    "spotify_tracks": [("id",), ("owner", "spotify_track_id")],
+    "spotify_track_artists": [("track_id", "artist_id")],
+    "spotify_album_artists": [("album_id", "artist_id")],
+}
+
+# Tablas con ``id`` UUID generado por la base de datos.
+GENERATED_ID_TABLES = {"spotify_artists", "spotify_albums", "spotify_tracks"}
+
+# Valores por defecto de las columnas que no llegan en la fila (o llegan nulas).
+COLUMN_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "spotify_tracks": {"owner": "me"},
+}
+
+# Borrados en cascada: tabla padre -> [(tabla hija, columna FK, acción)].
+CASCADES: Dict[str, List[Tuple[str, str, str]]] = {
+    "spotify_tracks": [("spotify_track_artists", "track_id", "cascade")],
+    "spotify_artists": [
+        ("spotify_track_artists", "artist_id", "cascade"),
+        ("spotify_album_artists", "artist_id", "cascade"),
+    ],
+    "spotify_albums": [
+        ("spotify_album_artists", "album_id", "cascade"),
+        ("spotify_tracks", "album_id", "set_null"),
+    ],
+}
+
+# Recursos embebidos en ``select``: (tabla, tabla embebida) -> columna FK de la tabla.
+FOREIGN_KEYS: Dict[Tuple[str, str], str] = {
+    ("spotify_tracks", "spotify_albums"): "album_id",
+}
+
+# Relaciones muchos a muchos: (tabla, tabla embebida) -> (unión, FK a la tabla, FK a la embebida).
+JUNCTIONS: Dict[Tuple[str, str], Tuple[str, str, str]] = {
+    ("spotify_tracks", "spotify_artists"): ("spotify_track_artists", "track_id", "artist_id"),
+    ("spotify_albums", "spotify_artists"): ("spotify_album_artists", "album_id", "artist_id"),
+}
+
+
+# Funciones RPC de actualización masiva (``UPDATE ... FROM jsonb_to_recordset``):
+# función -> (tabla, columna clave). Actualizan con las demás claves de cada objeto
+# de ``rows`` las filas existentes con esa clave y devuelven cuántas actualizaron.
+RPC_UPDATES: Dict[str, Tuple[str, str]] = {
+    "apply_artist_enrichment": ("spotify_artists", "spotify_id"),
+    "apply_audio_features": ("spotify_tracks", "spotify_track_id"),
+}
+
+
+class FakePostgrest:
+    """Almacén en memoria más contadores de round trips por método y tabla."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[dict]] = {name: [] for name in TABLE_KEYS}
+        self.round_trips: Counter = Counter()
+        # (método, tabla) -> número de peticiones que aún deben fallar
+        self.failures: Counter = Counter()
+        # tabla -> clave única -> valores de la clave -> fila
+        self._indexes: Dict[str, Dict[Tuple[str, ...], Dict[tuple, dict]]] = {
+            name: {key: {} for key in keys} for name, keys in TABLE_KEYS.items()
+        }
+
+    def reset(self) -> None:
+        for rows in self.tables.values():
+            rows.clear()
+        for name in self._indexes:
+            self._reindex(name)
+        self.round_trips.clear()
+        self.failures.clear()
+
+    def fail_next(self, method: str, table: str, times: int = 1) -> None:
+        """Las siguientes ``times`` peticiones ``method`` a ``table`` fallan sin tocar los datos."""
+        self.failures[(method, table)] += times
+
+    # -- Índices -----------------------------------------------------------
+
+    def _index_row(self, table: str, row: dict) -> None:
+        for key, index in self._indexes[table].items():
+            values = tuple(row.get(c) for c in key)
+            if None not in values:
+                index[values] = row
+
+    def _reindex(self, table: str) -> None:
+        for index in self._indexes[table].values():
+            index.clear()
+        for row in self.tables[table]:
+            self._index_row(table, row)
+
+    def _lookup(self, table: str, key: Tuple[str, ...], values: tuple) -> Optional[dict]:
+        index = self._indexes[table].get(key)
+        if index is not None:
+            return index.get(values)
+        for existing in self.tables[table]:
+            if all(existing.get(c) == v for c, v in zip(key, values)):
+                return existing
+        return None
+
+    def _indexed_candidates(self, table: str, column: str, expression: str) -> Optional[List[dict]]:
+        """Filas candidatas para ``eq``/``in`` sobre una clave única de una columna, o None."""
+        index = self._indexes[table].get((column,))
+        if index is None:
+            return None
+        operator, _, raw = expression.partition(".")
+        if operator == "eq":
+            values = [raw]
+        elif operator == "in":
+            values = self._split_list(raw)
+        else:
+            return None
+        return [index[(v,)] for v in dict.fromkeys(values) if (v,) in index]
+
+    @property
+    def total_round_trips(self) -> int:
+        return sum(self.round_trips.values())
+
+    # -- Filtros -----------------------------------------------------------
+
+    @staticmethod
+    def _coerce(value: str) -> Any:
+        if value == "null":
+            return None
+        if value == "true":
+            return True
+        if value == "false":
+            return False
+        return value
+
+    @staticmethod
+    def _split_list(raw: str) -> List[str]:
+        raw = raw.strip()
+        if raw.startswith("(") and raw.endswith(")"):
+            raw = raw[1:-1]
+        items, current, quoted = [], "", False
+        for char in raw:
+            if char == '"':
+                quoted = not quoted
+                continue
+            if char == "," and not quoted:
+                items.append(current)
+                current = ""
+                continue
+            current += char
+        if current or items:
+            items.append(current)
+        return items
+
+    @staticmethod
+    def _compare(left: Any, right: Any) -> Tuple[Any, Any]:
+        # Compara timestamps ISO como datetimes para respetar zonas horarias.
+        if isinstance(left, str) and isinstance(right, str):
+            try:
+                return (
+                    datetime.fromisoformat(left.replace("Z", "+00:00")),
+                    datetime.fromisoformat(right.replace("Z", "+00:00")),
+                )
+            except ValueError:
+                return left, right
+        return left, right
+
+    def _matches(self, row: dict, column: str, expression: str) -> bool:
+        negate = False
+        if expression.startswith("not."):
+            negate = True
+            expression = expression[4:]
+        operator, _, raw = expression.partition(".")
+        if operator != "in" and len(raw) > 1 and raw.startswith('"') and raw.endswith('"'):
+            raw = raw[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+        value = row.get(column)
+        if operator == "in":
+            result = value in [self._coerce(v) for v in self._split_list(raw)]
+        elif operator == "is":
+            result = value is self._coerce(raw)
+        elif operator in ("eq", "neq"):
+            target = self._coerce(raw)
+            if value is not None and target is not None:
+                value, target = self._compare(str(value), str(target))
+            result = (value == target) == (operator == "eq")
+        elif operator in ("gt", "gte", "lt", "lte"):
+            if value is None:
+                result = False
+            else:
+                left, right = self._compare(str(value), raw)
+                result = {
+                    "gt": left > right,
+                    "gte": left >= right,
+                    "lt": left < right,
+                    "lte": left <= right,
+                }[operator]
+        else:
+            raise ValueError(f"Operador no soportado: {operator}")
+        return not result if negate else result
+
+    def _matches_or(self, row: dict, raw: str) -> bool:
+        return any(self._matches_condition(row, c) for c in self._split_conditions(raw))
+
+    def _matches_and(self, row: dict, raw: str) -> bool:
+        return all(self._matches_condition(row, c) for c in self._split_conditions(raw))
+
+    @staticmethod
+    def _split_conditions(raw: str) -> List[str]:
+        raw = raw.strip()
+        if raw.startswith("(") and raw.endswith(")"):
+            raw = raw[1:-1]
+        parts, depth, current = [], 0, ""
+        for char in raw:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            if char == "," and depth == 0:
+                parts.append(current)
+                current = ""
+                continue
+            current += char
+        if current:
+            parts.append(current)
+        return parts
+
+    def _matches_condition(self, row: dict, condition: str) -> bool:
+        if condition.startswith("or("):
+            return self._matches_or(row, condition[2:])
+        if condition.startswith("and("):
+            return self._matches_and(row, condition[3:])
+        column, _, expression = condition.partition(".")
+        return self._matches(row, column, expression)
+
+    def _filter(self, table: str, params: List[Tuple[str, str]]) -> List[dict]:
+        rows = self.tables[table]
+        for key, raw in params:
+            if key in ("select", "order", "limit", "offset", "columns", "on_conflict"):
+                continue
+            if rows is self.tables[table]:
+                candidates = self._indexed_candidates(table, key, raw)
+                if candidates is not None:
+                    # Sin `order`, PostgREST tampoco garantiza el orden de las filas
+                    rows = candidates
+                    continue
+            if key == "or":
+                rows = [row for row in rows if self._matches_or(row, raw)]
+            elif key == "and":
+                rows = [row for row in rows if self._matches_and(row, raw)]
+            else:
+                rows = [row for row in rows if self._matches(row, key, raw)]
+        return rows
+
+    # -- Proyección y orden ------------------------------------------------
+
+    @staticmethod
+    def _order(rows: List[dict], raw: Optional[str]) -> List[dict]:
+        if not raw:
+            return rows
+        for term in reversed(raw.split(",")):
+            column, *modifiers = term.split(".")
+            desc = "desc" in modifiers
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: str(r[column]), reverse=desc)
+            rows = present + missing
+        return rows
+
+    @staticmethod
+    def _split_select(select: str) -> List[str]:
+        items, depth, current = [], 0, ""
+        for char in select:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            if char == "," and depth == 0:
+                items.append(current.strip())
+                current = ""
+                continue
+            current += char
+        if current.strip():
+            items.append(current.strip())
+        return items
+
+    def _embed(self, table: str, rows: List[dict], item: str) -> Tuple[str, List[Any]]:
+        """Valores de ``alias:tabla(*)`` para cada fila, resueltos en una pasada por relación."""
+        name, _, inner = item.partition("(")
+        alias, _, target = name.partition(":")
+        target = target or alias
+        columns = inner.rstrip(")")
+        if (table, target) in FOREIGN_KEYS:
+            fk = FOREIGN_KEYS[(table, target)]
+            values = []
+            for row in rows:
+                found = self._lookup(target, ("id",), (row.get(fk),)) if row.get(fk) else None
+                values.append(self._project([found], columns)[0] if found else None)
+            return alias, values
+        if (table, target) in JUNCTIONS:
+            junction, own_fk, target_fk = JUNCTIONS[(table, target)]
+            wanted = {row.get("id") for row in rows}
+            related: Dict[Any, List[dict]] = {}
+            for link in self.tables[junction]:
+                if link.get(own_fk) in wanted:
+                    found = self._lookup(target, ("id",), (link.get(target_fk),))
+                    if found:
+                        related.setdefault(link[own_fk], []).append(found)
+            return alias, [self._project(related.get(row.get("id"), []), columns) for row in rows]
+        raise ValueError(f"No hay relación entre {table} y {target}")
+
+    def _project(self, rows: List[dict], select: Optional[str], table: Optional[str] = None) -> List[dict]:
+        if not select or select == "*":
+            return [dict(row) for row in rows]
+        items = self._split_select(select)
+        columns = [c for c in items if "(" not in c]
+        embeds = [self._embed(table, rows, c) for c in items if "(" in c]
+        if "*" in columns:
+            projected = [dict(row) for row in rows]
+        else:
+            projected = [{c: row.get(c) for c in columns} for row in rows]
+        for alias, values in embeds:
+            for row, value in zip(projected, values):
+                row[alias] = value
+        return projected
+
+    # -- Escrituras --------------------------------------------------------
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def _find_conflict(
+        self, table: str, row: dict, keys: List[Tuple[str, ...]]
+    ) -> Optional[dict]:
+        for key in keys:
+            values = tuple(row.get(column) for column in key)
+            if None in values:
+                continue
+            existing = self._lookup(table, key, values)
+            if existing is not None:
+                return existing
+        return None
+
+    def insert(
+        self,
+        table: str,
+        payload: List[dict],
+        columns: Optional[List[str]],
+        resolution: Optional[str],
+        on_conflict: Optional[str],
+    ) -> Tuple[int, Any]:
+        keys = TABLE_KEYS[table]
+        conflict_keys = [tuple(on_conflict.split(","))] if on_conflict else keys
+        staged: List[dict] = []
+        staged_keys = set()
+        seen_targets = set()
+        result: List[dict] = []
+        for raw in payload:
+            row = dict(raw)
+            if columns:
+                row = {c: raw.get(c) for c in columns}
+            for column, value in COLUMN_DEFAULTS.get(table, {}).items():
+                if row.get(column) is None:
+                    row[column] = value
+            if resolution:
+                target = tuple(row.get(c) for c in conflict_keys[0])
+                if target in seen_targets and resolution == "merge":
+                    return 500, {
+                        "code": "21000",
+                        "message": "ON CONFLICT DO UPDATE command cannot affect row a second time",
+                    }
+                seen_targets.add(target)
+                if resolution == "ignore" and (conflict_keys[0], target) in staged_keys:
+                    continue
+                existing = self._find_conflict(table, row, conflict_keys)
+                if existing is not None:
+                    if resolution == "ignore":
+                        continue
+                    for column, value in row.items():
+                        if column in ("id", "created_at") and value is None:
+                            continue
+                        existing[column] = value
+                    existing["updated_at"] = self._now()
+                    result.append(dict(existing))
+                    continue
+            elif self._find_conflict(table, row, keys) is not None or any(
+                (key, tuple(row.get(c) for c in key)) in staged_keys for key in keys
+            ):
+                return 409, {
+                    "code": "23505",
+                    "message": f"duplicate key value violates unique constraint on {table}",
+                }
+            if table in GENERATED_ID_TABLES and not row.get("id"):
+                row["id"] = str(uuid.uuid4())
+            row.setdefault("created_at", None)
+            if row["created_at"] is None:
+                row["created_at"] = self._now()
+            if "updated_at" not in row or row["updated_at"] is None:
+                row["updated_at"] = row["created_at"]
+            staged.append(row)
+            staged_keys.update((key, tuple(row.get(c) for c in key)) for key in conflict_keys + keys)
+            result.append(dict(row))
+        self.tables[table].extend(staged)
+        for row in staged:
+            self._index_row(table, row)
+        return 201, result
+
+    def update(self, table: str, params: List[Tuple[str, str]], payload: dict) -> List[dict]:
+        rows = self._filter(table, params)
+        for row in rows:
+            row.update(payload)
+            row["updated_at"] = self._now()
+        self._reindex(table)
+        return [dict(row) for row in rows]
+
+    def update_rows(self, table: str, key_column: str, rows: List[dict]) -> int:
+        """Actualiza las filas existentes con la clave de cada objeto; no inserta ninguna."""
+        by_key: Dict[Any, List[dict]] = {}
+        for row in self.tables[table]:
+            by_key.setdefault(row.get(key_column), []).append(row)
+        updated = 0
+        now = self._now()
+        for values in rows:
+            for row in by_key.get(values.get(key_column), []):
+                row.update({column: value for column, value in values.items() if column != key_column})
+                row["updated_at"] = now
+                updated += 1
+        return updated
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[dict]:
+        doomed = self._filter(table, params)
+        doomed_ids = {id(row) for row in doomed}
+        self.tables[table] = [r for r in self.tables[table] if id(r) not in doomed_ids]
+        for child, column, action in CASCADES.get(table, []):
+            parent_ids = {row.get("id") for row in doomed}
+            if action == "cascade":
+                self.tables[child] = [
+                    r for r in self.tables[child] if r.get(column) not in parent_ids
+                ]
+            else:
+                for r in self.tables[child]:
+                    if r.get(column) in parent_ids:
+                        r[column] = None
+            self._reindex(child)
+        self._reindex(table)
+        return [dict(row) for row in doomed]
+
+
+def create_app(store: FakePostgrest) -> FastAPI:
+    """Construye la aplicación ASGI que expone ``store`` bajo ``/rest/v1``."""
+    app = FastAPI()
+
+    def _prefer(request: Request) -> Dict[str, str]:
+        prefer = {}
+        for part in request.headers.get("prefer", "").split(","):
+            if "=" in part:
+                key, value = part.strip().split("=", 1)
+                prefer[key] = value
+        return prefer
+
+    def _respond(status: int, rows: Any, prefer: Dict[str, str]) -> Response:
+        if prefer.get("return") == "minimal" and status < 300:
+            return Response(status_code=status)
+        return JSONResponse(rows, status_code=status)
+
+    @app.post("/rest/v1/rpc/{function}")
+    async def rpc(function: str, request: Request) -> Response:
+        if function not in RPC_UPDATES:
+            return JSONResponse({"message": f"function {function} does not exist"}, 404)
+        store.round_trips[("RPC", function)] += 1
+        if store.latency:
+            await asyncio.sleep(store.latency)
+        table, key_column = RPC_UPDATES[function]
+        arguments = json.loads(await request.body() or b"{}")
+        return JSONResponse(store.update_rows(table, key_column, arguments.get("rows") or []))
+
+    @app.api_route("/rest/v1/{table}", methods=["GET", "POST", "PATCH", "DELETE"])
+    async def handle(table: str, request: Request) -> Response:
+        if table not in store.tables:
+            return JSONResponse({"message": f"relation {table} does not exist"}, 404)
+        store.round_trips[(request.method, table)] += 1
+        if store.latency:
+            await asyncio.sleep(store.latency)
+        if store.failures[(request.method, table)] > 0:
+            store.failures[(request.method, table)] -= 1
+            return JSONResponse({"code": "XX000", "message": f"fallo simulado en {table}"}, 500)
+        params = list(request.query_params.multi_items())
+        query = dict(params)
+        prefer = _prefer(request)
+
+        if request.method == "GET":
+            rows = store._filter(table, params)
+            rows = store._order(list(rows), query.get("order"))
+            offset = int(query.get("offset", 0))
+            if "limit" in query:
+                rows = rows[offset : offset + int(query["limit"])]
+            else:
+                rows = rows[offset:]
+            return JSONResponse(store._project(rows, query.get("select"), table))
+
+        body = await request.body()
+        payload = json.loads(body) if body else None
+
+        if request.method == "POST":
+            rows = payload if isinstance(payload, list) else [payload]
+            columns = (
+                [c.strip('"') for c in query["columns"].split(",")]
+                if query.get("columns")
+                else None
+            )
+            resolution = prefer.get("resolution", "").replace("-duplicates", "") or None
+            status, result = store.insert(
+                table, rows, columns, resolution, query.get("on_conflict")
+            )
+            if status >= 300:
+                return JSONResponse(result, status_code=status)
+            return _respond(status, store._project(result, query.get("select"), table), prefer)
+
+        if request.method == "PATCH":
+            return _respond(200, store.update(table, params, payload), prefer)
+
+        return _respond(200, store.delete(table, params), prefer)
+
+    return app
@@ -0,0 +1,264 @@
+"""
+Stand-in local de la Web API de Spotify para benchmarks.
+
+Sirve ``GET /v1/me/tracks``, ``GET /v1/tracks?ids=``, ``GET /v1/artists?ids=`` y
+``GET /v1/audio-features?ids=`` sobre una biblioteca sintética y determinista de
+``library_size`` canciones, ordenadas de la más reciente a la más antigua como
+en Spotify. ``artist_pool`` y ``album_pool`` controlan cuánto se repiten
+artistas y álbumes entre canciones. Cada respuesta puede retrasarse con una
+latencia configurable, y ``throttle_every``/``error_every`` inyectan respuestas
+429 (con ``Retry-After``) o 503 cada N peticiones.
+
+Cada página lleva un ``ETag`` que depende del tamaño de la biblioteca; con
+``If-None-Match`` igual se responde 304 sin cuerpo, como hace Spotify.
+"""
+import asyncio
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from fastapi import FastAPI, Header, Query
+from fastapi.responses import JSONResponse, Response
+
+OLDEST_ADDED_AT = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+
+def _base62(number: int, width: int = 22) -> str:
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    digits = []
+    while number:
+        number, remainder = divmod(number, 62)
+        digits.append(alphabet[remainder])
+    return "".join(reversed(digits)).rjust(width, "0")
+
+
+def _from_base62(value: str) -> int:
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    number = 0
+    for char in value:
+        index = alphabet.find(char)
+        if index < 0:
+            return -1
+        number = number * 62 + index
+    return number
+
+
+def spotify_id(kind: str, index: int) -> str:
+    """ID determinista con el formato de Spotify (22 caracteres base62)."""
+    prefix = {"track": 1, "artist": 2, "album": 3}[kind]
+    return _base62(prefix * 10**12 + index)
+
+
+class FakeSpotifyLibrary:
+    """Biblioteca sintética de canciones guardadas."""
+
+    def __init__(
+        self,
+        library_size: int = 1000,
+        artist_pool: int = 200,
+        album_pool: int = 400,
+        latency: float = 0.0,
+        throttle_every: int = 0,
+        error_every: int = 0,
+        retry_after: int = 1,
+    ):
+        self.library_size = library_size
+        self.artist_pool = max(1, artist_pool)
+        self.album_pool = max(1, album_pool)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.error_every = error_every
+        self.retry_after = retry_after
+        self.requests: Counter = Counter()
+
+    def _artist(self, index: int) -> dict:
+        artist_id = spotify_id("artist", index)
+        return {
+            "id": artist_id,
+            "name": f"Artist {index}",
+            "type": "artist",
+            "uri": f"spotify:artist:{artist_id}",
+            "href": f"https://api.spotify.com/v1/artists/{artist_id}",
+            "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+        }
+
+    def track(self, index: int) -> dict:
+        """Objeto de track completo, como en ``GET /tracks``."""
+        album_index = index % self.album_pool
+        album_id = spotify_id("album", album_index)
+        album_artist = self._artist(album_index % self.artist_pool)
+        artists = [self._artist(index % self.artist_pool)]
+        if index % 5 == 0:
+            artists.append(self._artist((index // 5) % self.artist_pool))
+        if artists[0]["id"] == artists[-1]["id"] and len(artists) > 1:
+            artists.pop()
+        track_id = spotify_id("track", index)
+        return {
+            "id": track_id,
+            "name": f"Track {index}",
+            "type": "track",
+            "uri": f"spotify:track:{track_id}",
+            "duration_ms": 180000 + index % 60000,
+            "explicit": False,
+            "popularity": index % 100,
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            "artists": artists,
+            "album": {
+                "id": album_id,
+                "name": f"Album {album_index}",
+                "album_type": "album" if album_index % 3 else "single",
+                "release_date": f"{1990 + album_index % 35}-01-01",
+                "release_date_precision": "day",
+                "total_tracks": 10,
+                "uri": f"spotify:album:{album_id}",
+                "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+                "artists": [album_artist],
+            },
+        }
+
+    def item(self, position: int) -> dict:
+        """Item de ``/me/tracks`` en la posición ``position`` (0 = el más reciente)."""
+        # La posición 0 es la canción más reciente, que tiene el índice más alto
+        index = self.library_size - 1 - position
+        # Las canciones añadidas después tienen índices mayores y fechas más recientes
+        added_at = OLDEST_ADDED_AT + timedelta(minutes=index)
+        return {"added_at": added_at.strftime("%Y-%m-%dT%H:%M:%SZ"), "track": self.track(index)}
+
+    def track_by_id(self, track_id: str) -> Optional[dict]:
+        """Track de la biblioteca con ese ID, o None si no existe."""
+        index = _from_base62(track_id) - 10**12
+        return self.track(index) if 0 <= index < self.library_size else None
+
+    def artist_by_id(self, artist_id: str) -> Optional[dict]:
+        """Artista completo, como en ``GET /artists``, o None si no existe."""
+        index = _from_base62(artist_id) - 2 * 10**12
+        if not 0 <= index < self.artist_pool:
+            return None
+        return {
+            **self._artist(index),
+            "genres": [f"genre {index % 20}", f"genre {index % 7 + 20}"],
+            "popularity": index % 100,
+            "followers": {"href": None, "total": index * 37},
+            "images": [{"url": f"https://i.scdn.co/image/{artist_id}", "height": 640, "width": 640}],
+        }
+
+    def audio_features_by_id(self, track_id: str) -> Optional[dict]:
+        """Audio features de un track, como en ``GET /audio-features``; None si no existe."""
+        index = _from_base62(track_id) - 10**12
+        if not 0 <= index < self.library_size:
+            return None
+        return {
+            "id": track_id,
+            "type": "audio_features",
+            "danceability": index % 101 / 100,
+            "energy": index % 89 / 88,
+            "key": index % 12,
+            "loudness": -(index % 30),
+            "mode": index % 2,
+            "tempo": 60 + index % 120,
+            "valence": index % 53 / 52,
+            "time_signature": 4,
+            "duration_ms": 180000 + index % 60000,
+        }
+
+    def your_library(self) -> Iterator[bytes]:
+        """``YourLibrary.json`` de los datos de cuenta con toda la biblioteca, por trozos."""
+        yield b'{"tracks": ['
+        for position in range(self.library_size):
+            track = self.track(self.library_size - 1 - position)
+            entry = {
+                "artist": track["artists"][0]["name"],
+                "album": track["album"]["name"],
+                "track": track["name"],
+                "uri": track["uri"],
+            }
+            yield (", " if position else "").encode() + json.dumps(entry).encode()
+        yield b'], "albums": [], "shows": [], "episodes": [], "bannedTracks": [], "artists": [], "other": []}'
+
+    def etag(self, offset: int, limit: int) -> str:
+        # Añadir canciones desplaza todas las páginas, así que cambian todos los ETag
+        return f'"{self.library_size}-{offset}-{limit}"'
+
+    def page(self, offset: int, limit: int) -> dict:
+        end = min(offset + limit, self.library_size)
+        return {
+            "href": f"https://api.spotify.com/v1/me/tracks?offset={offset}&limit={limit}",
+            "items": [self.item(position) for position in range(offset, end)],
+            "limit": limit,
+            "offset": offset,
+            "total": self.library_size,
+            "next": None if end >= self.library_size else "next",
+            "previous": None if offset == 0 else "previous",
+        }
+
+
+def create_app(library: FakeSpotifyLibrary) -> FastAPI:
+    """Construye la aplicación ASGI que expone ``library`` bajo ``/v1``."""
+    app = FastAPI()
+
+    def _injected_failure():
+        count = sum(library.requests.values())
+        if library.throttle_every and count % library.throttle_every == 0:
+            library.requests["429"] += 1
+            return JSONResponse(
+                {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(library.retry_after)},
+            )
+        if library.error_every and count % library.error_every == 0:
+            library.requests["503"] += 1
+            return JSONResponse({"error": {"status": 503, "message": "Service unavailable"}}, 503)
+        return None
+
+    @app.get("/v1/me/tracks")
+    async def saved_tracks(
+        offset: int = Query(0, ge=0),
+        limit: int = Query(20, ge=1, le=50),
+        if_none_match: Optional[str] = Header(None),
+    ):
+        library.requests["/me/tracks"] += 1
+        if library.latency:
+            await asyncio.sleep(library.latency)
+        failure = _injected_failure()
+        if failure is not None:
+            return failure
+        etag = library.etag(offset, limit)
+        if if_none_match == etag:
+            library.requests["304"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(library.page(offset, limit), headers={"ETag": etag})
+
+    @app.get("/v1/tracks")
+    async def several_tracks(ids: str = Query(...)):
+        library.requests["/tracks"] += 1
+        if library.latency:
+            await asyncio.sleep(library.latency)
+        track_ids = ids.split(",")
+        if len(track_ids) > 50:
+            return JSONResponse({"error": {"status": 400, "message": "Too many ids requested"}}, 400)
+        return _injected_failure() or {"tracks": [library.track_by_id(track_id) for track_id in track_ids]}
+
+    @app.get("/v1/artists")
+    async def several_artists(ids: str = Query(...)):
+        library.requests["/artists"] += 1
+        if library.latency:
+            await asyncio.sleep(library.latency)
+        artist_ids = ids.split(",")
+        if len(artist_ids) > 50:
+            return JSONResponse({"error": {"status": 400, "message": "Too many ids requested"}}, 400)
+        return _injected_failure() or {"artists": [library.artist_by_id(artist_id) for artist_id in artist_ids]}
+
+    @app.get("/v1/audio-features")
+    async def several_audio_features(ids: str = Query(...)):
+        library.requests["/audio-features"] += 1
+        if library.latency:
+            await asyncio.sleep(library.latency)
+        track_ids = ids.split(",")
+        if len(track_ids) > 100:
+            return JSONResponse({"error": {"status": 400, "message": "Too many ids requested"}}, 400)
+        return _injected_failure() or {
+            "audio_features": [library.audio_features_by_id(track_id) for track_id in track_ids]
+        }
+
+    return app
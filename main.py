@@ -1,5 +1,15 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from src.presentation.api.v1 import auth, tracks
+from src.adapters.spotify.client import close_http_clients, open_http_clients
+from src.adapters.spotify.scheduler import SpotifyAPIError
+from src.adapters.supabase.client import close_async_supabase_client, get_async_supabase_client, get_supabase_client
+from src.adapters.supabase.identity_cache import warm_identity_caches
+from src.core.services.sync_jobs import get_sync_job_manager
+from src.infrastructure import metrics
+from src.infrastructure.config.settings import settings
 import logging
 
 # Configuración básica de logging
@@ -14,16 +24,48 @@ logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("supabase").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepara los recursos compartidos del proceso al arrancar y los libera al cerrar."""
+    open_http_clients()
+    await get_async_supabase_client()
+    if settings.IDENTITY_CACHE_WARMUP:
+        # El cliente de Supabase es síncrono: se precarga fuera del event loop
+        await asyncio.to_thread(warm_identity_caches, get_supabase_client())
+    yield
+    await get_sync_job_manager().shutdown()
+    await close_http_clients()
+    await close_async_supabase_client()
+
 app = FastAPI(
     title="Spotify to Supabase Sync",
     description="API para sincronizar datos de Spotify a Supabase.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+@app.exception_handler(SpotifyAPIError)
+async def spotify_api_error_handler(request: Request, exc: SpotifyAPIError):
+    """Convierte los fallos definitivos de Spotify en respuestas HTTP en lugar de datos vacíos."""
+    logging.error(f"Error de Spotify en {request.url.path}: {exc}")
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": "Token de Spotify inválido o expirado. Por favor, ve a /api/v1/auth/login"},
+        )
+    if exc.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": str(exc)})
+    return JSONResponse(status_code=status.HTTP_502_BAD_GATEWAY, content={"detail": str(exc)})
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(tracks.router, prefix="/api/v1/tracks", tags=["Tracks"])
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics() -> PlainTextResponse:
+    """Métricas del proceso en formato de texto de Prometheus."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def read_root():
     logging.info("Acceso a la ruta raíz.")
@@ -1,55 +1,241 @@
+import asyncio
 import httpx
 import base64
+import hashlib
 import json
 import os
+import re
+import secrets
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
 from urllib.parse import urlencode
+from src.adapters.spotify.client import get_spotify_accounts_client
 from src.infrastructure.config.settings import settings
+from src.infrastructure.shared_state import get_shared_state
 import logging
 
-# Definimos la ruta del archivo que usaremos para persistir el token.
+# Definimos la ruta del archivo que usaremos para persistir el token del usuario por defecto.
 TOKEN_FILE = "token.json"
 
-# Este diccionario actúa como nuestro caché en memoria para el token.
-# Se carga una vez desde el archivo al iniciar.
-_token_storage = {"access_token": None, "refresh_token": None}
+TOKEN_URL = "https://accounts.spotify.com/api/token"
 
-def _save_token_to_file(token_data: dict):
-    """Guarda el diccionario del token en un archivo JSON."""
-    with open(TOKEN_FILE, "w") as f:
+# Perfil del dueño del token: su `id` identifica la cuenta de Spotify
+ME_URL = "https://api.spotify.com/v1/me"
+
+# Usuario de las peticiones que no indican ninguno (despliegues de una sola cuenta)
+DEFAULT_USER = "me"
+
+# Los usuarios dan nombre a su archivo de token: solo caracteres seguros en una ruta
+_USER_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Caché en memoria de los tokens, por usuario. Cada uno se carga desde su archivo (o desde
+# el estado compartido entre workers, si está configurado) la primera vez que se pide.
+# `expires_at` es el instante (epoch, segundos) en que caduca el access token.
+_token_storage: Dict[str, dict] = {}
+
+# Logins OAuth en curso sin estado compartido: `state` -> (usuario, caducidad epoch)
+_oauth_states: Dict[str, Tuple[str, float]] = {}
+
+# Sesiones sin estado compartido: SHA-256 del token de sesión -> (usuario, caducidad epoch)
+_sessions: Dict[str, Tuple[str, float]] = {}
+
+# Un único refresco en curso por usuario: las peticiones concurrentes esperan al mismo.
+# Los locks pertenecen a un event loop y se recrean si cambia.
+_refresh_locks: Dict[str, asyncio.Lock] = {}
+_refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+
+class SpotifyAccountMismatchError(Exception):
+    """El login de un usuario se autorizó con una cuenta de Spotify distinta de la de su token."""
+
+def validate_user(user: str) -> str:
+    """Devuelve `user` si es un identificador de usuario válido; si no, lanza ValueError."""
+    if not _USER_PATTERN.match(user):
+        raise ValueError("El usuario solo puede contener letras, números, '_' y '-' (máximo 64 caracteres)")
+    return user
+
+def _token_file(user: str) -> str:
+    # El usuario por defecto conserva el archivo de los despliegues de una sola cuenta
+    if user == DEFAULT_USER:
+        return TOKEN_FILE
+    return os.path.join(settings.SPOTIFY_TOKEN_DIR, f"{user}.json")
+
+def _token_entry(user: str) -> dict:
+    entry = _token_storage.get(user)
+    if entry is None:
+        entry = _token_storage[user] = {
+            "access_token": None, "refresh_token": None, "expires_at": None, "spotify_user_id": None
+        }
+    return entry
+
+def _save_token_to_file(token_data: dict, user: str = DEFAULT_USER):
+    """Guarda el diccionario del token del usuario en su archivo JSON."""
+    path = _token_file(user)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
         json.dump(token_data, f)
-    logging.info(f"Token guardado exitosamente en {TOKEN_FILE}")
+    logging.info(f"Token guardado exitosamente en {path}")
 
-def _load_token_from_file() -> dict | None:
-    """Carga el token desde el archivo JSON si existe."""
-    if not os.path.exists(TOKEN_FILE):
+def _load_token_from_file(user: str = DEFAULT_USER) -> dict | None:
+    """Carga el token del usuario desde su archivo JSON si existe."""
+    path = _token_file(user)
+    if not os.path.exists(path):
         return None
     try:
-        with open(TOKEN_FILE, "r") as f:
+        with open(path, "r") as f:
             token_data = json.load(f)
-            logging.info(f"Token cargado exitosamente desde {TOKEN_FILE}")
+            logging.info(f"Token cargado exitosamente desde {path}")
             return token_data
     except (json.JSONDecodeError, FileNotFoundError):
         return None
 
-def get_auth_url() -> str:
-    """Construye la URL de autorización de Spotify."""
+def _load_token(user: str) -> dict | None:
+    """
+    Datos guardados del token del usuario: del estado compartido si está configurado y,
+    si no o si aún no está allí, de su archivo JSON.
+    """
+    state = get_shared_state()
+    if state is not None:
+        token_data = state.get_token(user)
+        if token_data is not None:
+            return token_data
+    token_data = _load_token_from_file(user)
+    if token_data and state is not None:
+        # Un archivo anterior al estado compartido se copia allí la primera vez
+        state.put_token(user, token_data)
+    return token_data
+
+def _persist_token(token_data: dict, user: str) -> None:
+    """Guarda el token en el estado compartido o, sin él, en el archivo del usuario."""
+    state = get_shared_state()
+    if state is not None:
+        state.put_token(user, token_data)
+    else:
+        _save_token_to_file(token_data, user)
+
+def create_oauth_state(user: str) -> str:
+    """
+    Genera un `state` aleatorio para un login del usuario y lo registra en el servidor
+    (en el estado compartido si está configurado, para que el callback pueda llegar
+    a otro worker). Caduca a los SPOTIFY_OAUTH_STATE_TTL_SECONDS.
+    """
+    state = secrets.token_urlsafe(32)
+    expires_at = time.time() + settings.SPOTIFY_OAUTH_STATE_TTL_SECONDS
+    shared = get_shared_state()
+    if shared is not None:
+        shared.put_oauth_state(state, user, expires_at)
+    else:
+        now = time.time()
+        for stale in [key for key, (_, expires) in _oauth_states.items() if expires < now]:
+            del _oauth_states[stale]
+        _oauth_states[state] = (user, expires_at)
+    return state
+
+def consume_oauth_state(state: str) -> Optional[str]:
+    """
+    Usuario del login que generó `state`, o None si no se generó aquí o ya caducó.
+    Cada `state` vale para un solo callback.
+    """
+    shared = get_shared_state()
+    if shared is not None:
+        return shared.pop_oauth_state(state)
+    entry = _oauth_states.pop(state, None)
+    if entry is None or entry[1] < time.time():
+        return None
+    return entry[0]
+
+def _session_key(session: str) -> str:
+    return hashlib.sha256(session.encode()).hexdigest()
+
+def create_session(user: str) -> str:
+    """
+    Emite un token de sesión aleatorio para el usuario, que las demás peticiones envían
+    en `Authorization: Bearer`. El servidor solo guarda su SHA-256 (en el estado
+    compartido si está configurado). Caduca a los SPOTIFY_SESSION_TTL_SECONDS.
+    """
+    session = secrets.token_urlsafe(32)
+    expires_at = time.time() + settings.SPOTIFY_SESSION_TTL_SECONDS
+    shared = get_shared_state()
+    if shared is not None:
+        shared.put_session(_session_key(session), user, expires_at)
+    else:
+        now = time.time()
+        for stale in [key for key, (_, expires) in _sessions.items() if expires < now]:
+            del _sessions[stale]
+        _sessions[_session_key(session)] = (user, expires_at)
+    return session
+
+def get_session_user(session: str) -> Optional[str]:
+    """Usuario de la sesión, o None si no la emitió este servidor o ya caducó."""
+    shared = get_shared_state()
+    if shared is not None:
+        return shared.get_session(_session_key(session))
+    entry = _sessions.get(_session_key(session))
+    if entry is None or entry[1] < time.time():
+        return None
+    return entry[0]
+
+def get_auth_url(user: str = DEFAULT_USER) -> str:
+    """
+    Construye la URL de autorización de Spotify con un `state` aleatorio asociado al
+    usuario (`create_oauth_state`); el callback lo canjea para saber bajo qué usuario
+    guardar el token y rechaza los que no emitió este servidor.
+    """
     scope = 'user-library-read'
     auth_params = {
         'client_id': settings.SPOTIFY_CLIENT_ID,
         'response_type': 'code',
         'redirect_uri': settings.SPOTIFY_REDIRECT_URI,
         'scope': scope,
+        'state': create_oauth_state(user),
     }
     return f"https://accounts.spotify.com/authorize?{urlencode(auth_params)}"
 
-def exchange_code_for_token(code: str) -> dict | None:
-    """Intercambia un código de autorización por un token de acceso y lo guarda."""
-    token_url = 'https://accounts.spotify.com/api/token'
+def _token_headers() -> dict:
     auth_header = base64.b64encode(f"{settings.SPOTIFY_CLIENT_ID}:{settings.SPOTIFY_CLIENT_SECRET}".encode()).decode()
-    headers = {
+    return {
         'Authorization': f'Basic {auth_header}',
         'Content-Type': 'application/x-www-form-urlencoded',
     }
+
+def _store_token(token_data: dict, user: str = DEFAULT_USER) -> dict:
+    """
+    Actualiza la caché en memoria del usuario con la respuesta de `/api/token` y devuelve
+    los datos a persistir, con `expires_at` calculado a partir de `expires_in`.
+    Spotify puede omitir `refresh_token` al refrescar: entonces se conserva el anterior,
+    igual que la cuenta de Spotify (`spotify_user_id`) a la que pertenece el token.
+    """
+    entry = _token_entry(user)
+    token_data = dict(token_data)
+    if "expires_in" in token_data:
+        token_data["expires_at"] = time.time() + float(token_data["expires_in"])
+    if not token_data.get("refresh_token"):
+        token_data["refresh_token"] = entry["refresh_token"]
+    if not token_data.get("spotify_user_id"):
+        token_data["spotify_user_id"] = entry["spotify_user_id"]
+    entry["access_token"] = token_data.get("access_token")
+    entry["refresh_token"] = token_data.get("refresh_token")
+    entry["expires_at"] = token_data.get("expires_at")
+    entry["spotify_user_id"] = token_data.get("spotify_user_id")
+    return token_data
+
+def _get_spotify_user_id(access_token: str) -> str:
+    """ID de la cuenta de Spotify dueña del token (`GET /me`)."""
+    response = get_spotify_accounts_client().get(ME_URL, headers={'Authorization': f'Bearer {access_token}'})
+    response.raise_for_status()
+    return response.json()["id"]
+
+def exchange_code_for_token(code: str, user: str = DEFAULT_USER) -> dict | None:
+    """
+    Intercambia un código de autorización por un token de acceso y lo guarda para el usuario.
+
+    El token queda ligado a la cuenta de Spotify que autorizó el login: si el usuario ya
+    tiene un token de otra cuenta, lanza SpotifyAccountMismatchError sin guardar nada,
+    para que nadie pueda quedarse con un usuario ajeno iniciando sesión con su nombre.
+    """
+    headers = _token_headers()
     data = {
         'grant_type': 'authorization_code',
         'code': code,
@@ -59,35 +245,177 @@ def exchange_code_for_token(code: str) -> dict | None:
     logging.debug(f"Enviando petición a Spotify para intercambiar el código. Datos: {data}")
 
     try:
-        with httpx.Client() as client:
-            response = client.post(token_url, headers=headers, data=data)
-            response.raise_for_status()
-            token_data = response.json()
-            
-            # Guardar el token en el archivo y en la caché en memoria.
-            _save_token_to_file(token_data)
-            _token_storage["access_token"] = token_data.get("access_token")
-            _token_storage["refresh_token"] = token_data.get("refresh_token")
-
-            logging.debug(f"Token almacenado en caché: {token_data.get('access_token')[:15]}...")
-            return token_data
+        response = get_spotify_accounts_client().post(TOKEN_URL, headers=headers, data=data)
+        response.raise_for_status()
+        token_data = response.json()
+
+        account = _get_spotify_user_id(token_data["access_token"])
+        stored = _load_token(user)
+        bound = stored.get("spotify_user_id") if stored else None
+        if bound is not None and bound != account:
+            logging.warning(f"Login de '{user}' con otra cuenta de Spotify; se rechaza")
+            raise SpotifyAccountMismatchError(
+                f"El usuario '{user}' pertenece a otra cuenta de Spotify. Inicia sesión con esa cuenta o usa otro usuario"
+            )
+        token_data["spotify_user_id"] = account
+
+        # Guardar el token en la caché en memoria y en el archivo (o el estado compartido).
+        token_data = _store_token(token_data, user)
+        _persist_token(token_data, user)
+
+        logging.debug(f"Token almacenado en caché: {token_data.get('access_token')[:15]}...")
+        return token_data
     except httpx.HTTPStatusError as e:
         logging.error(f"Error al intercambiar el código por el token: {e.response.text}")
         return None
 
-def get_access_token() -> str | None:
-    """Devuelve el token de acceso, cargándolo desde el archivo si es necesario."""
+def get_access_token(user: str = DEFAULT_USER) -> str | None:
+    """Devuelve el token de acceso del usuario, cargándolo desde su archivo si es necesario."""
     # Si el token ya está en la caché de memoria, lo usamos.
-    if _token_storage["access_token"]:
-        return _token_storage["access_token"]
+    entry = _token_entry(user)
+    if entry["access_token"]:
+        return entry["access_token"]
     
     # Si no, intentamos cargarlo desde el archivo.
-    token_data = _load_token_from_file()
+    token_data = _load_token(user)
     if token_data and "access_token" in token_data:
         # Guardamos en la caché para futuras peticiones.
-        _token_storage["access_token"] = token_data["access_token"]
-        _token_storage["refresh_token"] = token_data.get("refresh_token")
-        return _token_storage["access_token"]
+        _load_entry(entry, token_data)
+        return entry["access_token"]
 
     # Si no hay token en ningún lado, retornamos None.
     return None
+
+
+async def load_access_token(user: str = DEFAULT_USER) -> str | None:
+    """
+    Versión asíncrona de get_access_token: si el token no está en memoria, su archivo
+    (o el estado compartido en SQLite) se lee en un hilo para no bloquear el event loop.
+    """
+    entry = _token_entry(user)
+    if entry["access_token"]:
+        return entry["access_token"]
+    token_data = await asyncio.to_thread(_load_token, user)
+    if token_data and "access_token" in token_data:
+        _load_entry(entry, token_data)
+    return entry["access_token"]
+
+def _load_entry(entry: dict, token_data: dict) -> None:
+    entry["access_token"] = token_data["access_token"]
+    entry["refresh_token"] = token_data.get("refresh_token")
+    entry["expires_at"] = token_data.get("expires_at")
+    entry["spotify_user_id"] = token_data.get("spotify_user_id")
+
+def token_expires_soon(margin: Optional[float] = None, user: str = DEFAULT_USER) -> bool:
+    """
+    Indica si el access token del usuario caduca en menos de `margin` segundos.
+    Los tokens guardados sin `expires_at` (anteriores a este campo) no se consideran caducados:
+    si Spotify los rechaza, el 401 fuerza el refresco.
+    """
+    expires_at = _token_entry(user)["expires_at"]
+    if expires_at is None:
+        return False
+    if margin is None:
+        margin = settings.SPOTIFY_TOKEN_REFRESH_MARGIN
+    return time.time() >= float(expires_at) - margin
+
+def _request_refresh(refresh_token: str) -> dict:
+    """Pide a Spotify un nuevo access token (bloqueante: se ejecuta en un hilo)."""
+    data = {'grant_type': 'refresh_token', 'refresh_token': refresh_token}
+    response = get_spotify_accounts_client().post(TOKEN_URL, headers=_token_headers(), data=data)
+    response.raise_for_status()
+    return response.json()
+
+def _get_refresh_lock(user: str) -> asyncio.Lock:
+    global _refresh_loop
+    loop = asyncio.get_running_loop()
+    if _refresh_loop is not loop:
+        _refresh_locks.clear()
+        _refresh_loop = loop
+    lock = _refresh_locks.get(user)
+    if lock is None:
+        lock = _refresh_locks[user] = asyncio.Lock()
+    return lock
+
+@asynccontextmanager
+async def _shared_refresh_lock(user: str) -> AsyncIterator[None]:
+    """
+    Con estado compartido, serializa el refresco del usuario entre workers y recarga
+    antes el token guardado: si otro worker ya lo refrescó, se usa el suyo.
+    """
+    state = get_shared_state()
+    if state is None:
+        yield
+        return
+    lock = state.token_lock(user)
+    acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+    try:
+        await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        # El hilo puede obtener el bloqueo después de la cancelación: se libera en cuanto lo haga
+        acquiring.add_done_callback(lambda _: lock.release())
+        raise
+    try:
+        token_data = await asyncio.to_thread(state.get_token, user)
+        if token_data and token_data.get("access_token"):
+            _load_entry(_token_entry(user), token_data)
+        yield
+    finally:
+        lock.release()
+
+async def refresh_access_token(stale_token: Optional[str] = None, user: str = DEFAULT_USER) -> str | None:
+    """
+    Refresca el access token del usuario con su `refresh_token` guardado, una sola vez
+    aunque lo pidan varias peticiones a la vez: quien llega tarde espera al refresco en
+    curso y recibe su resultado. Los refrescos de usuarios distintos no se esperan entre sí.
+    Con estado compartido, lo mismo vale entre los workers del despliegue.
+
+    `stale_token` es el token que el llamador vio caducar (p. ej. tras un 401); si el
+    token actual ya es otro, otro llamador lo refrescó y no se vuelve a pedir.
+    """
+    async with _get_refresh_lock(user), _shared_refresh_lock(user):
+        current = await load_access_token(user)
+        if current and current != stale_token and not token_expires_soon(user=user):
+            return current
+        refresh_token = _token_entry(user)["refresh_token"]
+        if not refresh_token:
+            logging.warning(f"No hay refresh_token guardado para '{user}'; es necesario volver a iniciar sesión")
+            return current
+        try:
+            token_data = await asyncio.to_thread(_request_refresh, refresh_token)
+        except httpx.HTTPStatusError as e:
+            logging.error(f"❌ Error al refrescar el token de Spotify de '{user}': {e.response.text}")
+            return current if current and not token_expires_soon(margin=0, user=user) else None
+        except httpx.TransportError as e:
+            logging.error(f"❌ No se pudo contactar con Spotify para refrescar el token de '{user}': {e}")
+            return current if current and not token_expires_soon(margin=0, user=user) else None
+        token_data = _store_token(token_data, user)
+        # La escritura del archivo no debe bloquear el event loop
+        await asyncio.to_thread(_persist_token, token_data, user)
+        logging.info(f"🔄 Token de acceso de Spotify de '{user}' refrescado")
+        return _token_entry(user)["access_token"]
+
+async def get_valid_access_token(user: str = DEFAULT_USER) -> str | None:
+    """
+    Devuelve un access token del usuario que no caduca en los próximos
+    `SPOTIFY_TOKEN_REFRESH_MARGIN` segundos, refrescándolo antes si hace falta.
+    """
+    token = await load_access_token(user)
+    if token and token_expires_soon(user=user):
+        return await refresh_access_token(stale_token=token, user=user)
+    return token
+
+async def resolve_access_token(token: str, force: bool = False, user: str = DEFAULT_USER) -> str:
+    """
+    Token a usar en lugar de `token` en una petición a la Web API.
+
+    Las sincronizaciones largas reciben el token al empezar y lo reutilizan en cada
+    página; aquí se sustituye por el vigente, refrescado si está a punto de caducar
+    o, con `force`, porque Spotify acaba de rechazarlo (401). Si no hay token
+    guardado, `token` se devuelve sin cambios.
+    """
+    if await load_access_token(user) is None:
+        return token
+    if force:
+        return await refresh_access_token(stale_token=token, user=user) or token
+    return await get_valid_access_token(user) or token
@@ -0,0 +1,90 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from src.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Un cliente compartido por servicio de Spotify: reutiliza conexiones TCP/TLS (keep-alive)
+# en lugar de abrir una nueva en cada petición.
+_api_client: Optional[httpx.AsyncClient] = None
+_accounts_client: Optional[httpx.Client] = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 requiere el paquete opcional `h2` (httpx[http2])."""
+    if not settings.HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2_ENABLED está activo pero falta el paquete 'h2'; se usará HTTP/1.1")
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _create_api_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=_limits(),
+        timeout=settings.HTTP_TIMEOUT,
+        http2=_http2_enabled(),
+    )
+
+
+def _create_accounts_client() -> httpx.Client:
+    return httpx.Client(
+        limits=_limits(),
+        timeout=settings.HTTP_TIMEOUT,
+        http2=_http2_enabled(),
+    )
+
+
+def open_http_clients() -> None:
+    """Crea los clientes compartidos. Se llama al arrancar la aplicación."""
+    global _api_client, _accounts_client
+    if _api_client is None:
+        _api_client = _create_api_client()
+    if _accounts_client is None:
+        _accounts_client = _create_accounts_client()
+    logger.info("Clientes HTTP de Spotify inicializados")
+
+
+async def close_http_clients() -> None:
+    """Cierra los clientes compartidos y sus conexiones. Se llama al apagar la aplicación."""
+    global _api_client, _accounts_client
+    if _api_client is not None:
+        await _api_client.aclose()
+        _api_client = None
+    if _accounts_client is not None:
+        _accounts_client.close()
+        _accounts_client = None
+    logger.info("Clientes HTTP de Spotify cerrados")
+
+
+def get_spotify_api_client() -> httpx.AsyncClient:
+    """
+    Retorna el cliente asíncrono compartido para `api.spotify.com`.
+    Si la aplicación no lo creó al arrancar (p. ej. desde un notebook), se crea aquí.
+    """
+    global _api_client
+    if _api_client is None:
+        _api_client = _create_api_client()
+    return _api_client
+
+
+def get_spotify_accounts_client() -> httpx.Client:
+    """Retorna el cliente compartido para `accounts.spotify.com`."""
+    global _accounts_client
+    if _accounts_client is None:
+        _accounts_client = _create_accounts_client()
+    return _accounts_client
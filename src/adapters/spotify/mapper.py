@@ -0,0 +1,143 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from src.core.entities.records import AlbumRecord, ArtistRecord, TrackRecord
+from src.core.entities.track import Artist, Album, SavedTrack
+
+logger = logging.getLogger(__name__)
+
+# Máximo de artistas y álbumes internados antes de vaciar las tablas,
+# para que un trabajo sobre una biblioteca enorme no acumule memoria sin límite
+MAX_INTERNED_ENTITIES = 20_000
+
+class SpotifyTrackMapper:
+    """
+    Convierte items de `/me/tracks` en entidades `SavedTrack` en una sola pasada.
+
+    Los artistas y álbumes se internan por ID de Spotify: la primera aparición se
+    valida y construye, y las siguientes reutilizan el mismo objeto. Una instancia
+    debe vivir lo que dure un lote o un trabajo de sincronización.
+    """
+
+    def __init__(self, max_interned: int = MAX_INTERNED_ENTITIES):
+        self.max_interned = max_interned
+        self._artists: Dict[str, Artist] = {}
+        self._albums: Dict[str, Album] = {}
+
+    def artist(self, payload: dict) -> Artist:
+        artist = self._artists.get(payload['id'])
+        if artist is None:
+            artist = Artist(
+                spotify_id=payload['id'],
+                name=payload['name'],
+                spotify_url=payload['external_urls']['spotify'],
+            )
+            self._artists[artist.spotify_id] = artist
+        return artist
+
+    def album(self, payload: dict) -> Album:
+        album = self._albums.get(payload['id'])
+        if album is None:
+            album = Album(
+                spotify_id=payload['id'],
+                name=payload['name'],
+                release_date=payload['release_date'],
+                spotify_url=payload['external_urls']['spotify'],
+                album_type=payload['album_type'],
+                artists=[self.artist(artist) for artist in payload.get('artists', [])],
+            )
+            self._albums[album.spotify_id] = album
+        return album
+
+    def saved_track(self, item: dict) -> SavedTrack:
+        """Construye la entidad SavedTrack a guardar a partir de un item de `/me/tracks`."""
+        if len(self._artists) + len(self._albums) > self.max_interned:
+            self.clear()
+        track = item['track']
+        return SavedTrack(
+            spotify_track_id=track['id'],
+            track_name=track['name'],
+            artists=[self.artist(artist) for artist in track['artists']],
+            album=self.album(track['album']),
+            spotify_url=track['external_urls']['spotify'],
+            added_at=datetime.fromisoformat(item['added_at'].replace('Z', '+00:00')),
+        )
+
+    def saved_tracks(self, items: Iterable[dict]) -> List[SavedTrack]:
+        return [self.saved_track(item) for item in items]
+
+    def clear(self) -> None:
+        self._artists.clear()
+        self._albums.clear()
+
+class UnavailableTrackError(ValueError):
+    """
+    Item de `/me/tracks` que no se puede guardar: `"track": null` (p. ej. retirado del
+    catálogo) o un track, álbum o artista sin ID o nombre (p. ej. un archivo local).
+    """
+
+def _required(payload: Optional[dict], key: str, kind: str) -> Any:
+    """Valor de `key` en un objeto de Spotify, o UnavailableTrackError si falta o es nulo."""
+    value = payload.get(key) if payload else None
+    if value is None:
+        raise UnavailableTrackError(f"{kind} de Spotify sin '{key}': {payload!r}")
+    return value
+
+class SpotifyRecordMapper(SpotifyTrackMapper):
+    """
+    Variante de SpotifyTrackMapper para el camino de sincronización: construye
+    registros con `__slots__` (TrackRecord, AlbumRecord, ArtistRecord) en lugar de
+    entidades Pydantic, sin guardar las URLs, que se derivan de los IDs.
+    Los artistas y álbumes se internan igual que en el mapper de entidades.
+
+    Los registros no pasan por la validación de Pydantic: los campos que son NOT NULL
+    en Supabase (IDs, nombres y `added_at`) se comprueban aquí, y un item sin ellos
+    (p. ej. un archivo local, con IDs nulos) lanza UnavailableTrackError en lugar de
+    llegar al upsert. `saved_tracks` omite esos items, como hace la reconciliación.
+    """
+
+    def artist(self, payload: dict) -> ArtistRecord:
+        spotify_id = _required(payload, 'id', "Artista")
+        artist = self._artists.get(spotify_id)
+        if artist is None:
+            artist = ArtistRecord(spotify_id, _required(payload, 'name', "Artista"))
+            self._artists[spotify_id] = artist
+        return artist
+
+    def album(self, payload: dict) -> AlbumRecord:
+        spotify_id = _required(payload, 'id', "Álbum")
+        album = self._albums.get(spotify_id)
+        if album is None:
+            album = AlbumRecord(
+                spotify_id,
+                _required(payload, 'name', "Álbum"),
+                payload['release_date'],
+                payload['album_type'],
+                tuple(self.artist(artist) for artist in payload.get('artists', [])),
+            )
+            self._albums[spotify_id] = album
+        return album
+
+    def saved_track(self, item: dict) -> TrackRecord:
+        """Construye el TrackRecord a guardar a partir de un item de `/me/tracks`."""
+        if len(self._artists) + len(self._albums) > self.max_interned:
+            self.clear()
+        track = _required(item, 'track', "Item")
+        added_at = _required(item, 'added_at', "Item")
+        return TrackRecord(
+            _required(track, 'id', "Track"),
+            _required(track, 'name', "Track"),
+            tuple(self.artist(artist) for artist in track['artists']),
+            self.album(_required(track, 'album', "Track")),
+            datetime.fromisoformat(added_at.replace('Z', '+00:00')),
+        )
+
+    def saved_tracks(self, items: Iterable[dict]) -> List[TrackRecord]:
+        """Registros de los items que se pueden guardar; los demás se omiten (ver UnavailableTrackError)."""
+        records = []
+        for item in items:
+            try:
+                records.append(self.saved_track(item))
+            except UnavailableTrackError as e:
+                logger.debug(f"Item de Spotify omitido: {e}")
+        return records
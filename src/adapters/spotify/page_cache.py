@@ -0,0 +1,30 @@
+from typing import NamedTuple, Tuple
+
+from src.infrastructure import metrics
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.config.settings import settings
+
+# (usuario, offset, limit) de una página de `/me/tracks`
+PageKey = Tuple[str, int, int]
+
+
+class CachedPage(NamedTuple):
+    """Última respuesta 200 de una página: su ETag y el JSON ya parseado."""
+    etag: str
+    page: dict
+
+
+# Caché única por proceso: las páginas sobreviven entre sincronizaciones,
+# que es cuando Spotify puede responder 304 a `If-None-Match`.
+page_cache: LRUCache[PageKey, CachedPage] = LRUCache(settings.SPOTIFY_PAGE_CACHE_SIZE)
+
+metrics.registry.callback(
+    "spotify_page_cache_entries",
+    "Páginas de Spotify guardadas con su ETag.",
+    lambda: [({}, len(page_cache))],
+)
+
+
+def get_page_cache() -> LRUCache[PageKey, CachedPage]:
+    """Retorna la caché de páginas de Spotify del proceso."""
+    return page_cache
@@ -0,0 +1,154 @@
+"""
+Lectura en streaming de los datos de cuenta que Spotify permite descargar
+(«Descargar tus datos»), en concreto `YourLibrary.json`:
+
+    {"tracks": [{"artist": "...", "album": "...", "track": "...", "uri": "spotify:track:<id>"}, ...],
+     "albums": [...], "shows": [...], "episodes": [...], "bannedTracks": [...], "artists": [...], ...}
+
+El archivo puede ocupar decenas de MB; aquí se recorre por trozos y solo se
+mantiene en memoria el elemento que se está decodificando.
+"""
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, BinaryIO, Iterator, List, Optional
+
+# Bytes leídos del archivo o del cuerpo de la petición en cada paso
+READ_CHUNK_SIZE = 64 * 1024
+
+TRACK_URI_PREFIX = "spotify:track:"
+
+_WHITESPACE = " \t\n\r"
+
+class PrivacyExportError(ValueError):
+    """El archivo no tiene el formato esperado de `YourLibrary.json`."""
+
+class JsonArrayStream:
+    """
+    Parser incremental de un objeto JSON de primer nivel que entrega, uno a uno,
+    los elementos del array bajo `key` a medida que llegan los datos con `feed`.
+
+    El resto de valores del objeto se recorren y descartan elemento a elemento,
+    así que la memoria queda acotada por el elemento más grande y no por el archivo.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "start"
+        self._collect = False
+        self.found = False
+
+    def feed(self, data: bytes, final: bool = False) -> List[Any]:
+        """Añade datos y devuelve los elementos de `key` completados con ellos."""
+        self._buffer += self._utf8.decode(data, final)
+        items: List[Any] = []
+        pos = 0
+        buffer = self._buffer
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            state = self._state
+            if state == "start":
+                if char != "{":
+                    raise PrivacyExportError("Se esperaba un objeto JSON en el primer nivel")
+                self._state, pos = "key", pos + 1
+            elif state in ("key", "next_key"):
+                if char == "}":
+                    self._state, pos = "done", pos + 1
+                    continue
+                if state == "next_key":
+                    if char != ",":
+                        raise PrivacyExportError(f"Se esperaba ',' o '}}' en la posición {pos}")
+                    self._state, pos = "key", pos + 1
+                    continue
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                key, pos = decoded
+                if not isinstance(key, str):
+                    raise PrivacyExportError(f"Se esperaba una clave de texto en la posición {pos}")
+                self._collect = key == self.key
+                self.found = self.found or self._collect
+                self._state = "colon"
+            elif state == "colon":
+                if char != ":":
+                    raise PrivacyExportError(f"Se esperaba ':' en la posición {pos}")
+                self._state, pos = "value", pos + 1
+            elif state == "value":
+                if char == "[":
+                    self._state, pos = "first_item", pos + 1
+                    continue
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                _value, pos = decoded
+                self._state = "next_key"
+            elif state in ("first_item", "item", "next_item"):
+                if char == "]" and state != "item":
+                    self._state, pos = "next_key", pos + 1
+                    continue
+                if state == "next_item":
+                    if char != ",":
+                        raise PrivacyExportError(f"Se esperaba ',' o ']' en la posición {pos}")
+                    self._state, pos = "item", pos + 1
+                    continue
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                item, pos = decoded
+                if self._collect:
+                    items.append(item)
+                self._state = "next_item"
+            else:
+                raise PrivacyExportError(f"Contenido inesperado tras el objeto JSON en la posición {pos}")
+        # Solo se conserva lo que aún no se ha podido decodificar
+        self._buffer = buffer[pos:]
+        if final and self._state != "done":
+            raise PrivacyExportError("El archivo JSON está incompleto")
+        return items
+
+    def _decode(self, buffer: str, pos: int, final: bool) -> Optional[tuple]:
+        """(valor, posición siguiente), o None si el valor aún no ha llegado entero."""
+        try:
+            value, end = self._decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if final:
+                raise PrivacyExportError(f"JSON no válido: {e}") from e
+            return None
+        # Un número al final del buffer podría continuar en el siguiente trozo
+        if end == len(buffer) and not final and isinstance(value, (int, float)):
+            return None
+        return value, end
+
+def track_id_from_uri(uri: Optional[str]) -> Optional[str]:
+    """ID de Spotify de un URI `spotify:track:<id>`, o None si no es un track."""
+    if uri and uri.startswith(TRACK_URI_PREFIX):
+        return uri[len(TRACK_URI_PREFIX):] or None
+    return None
+
+def _check_found(stream: JsonArrayStream) -> None:
+    if not stream.found:
+        raise PrivacyExportError(f"El archivo no contiene la lista '{stream.key}'")
+
+def iter_library_tracks(file: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[dict]:
+    """Entradas de `tracks` de un `YourLibrary.json` abierto en modo binario."""
+    stream = JsonArrayStream("tracks")
+    while chunk := file.read(chunk_size):
+        yield from stream.feed(chunk)
+    yield from stream.feed(b"", final=True)
+    _check_found(stream)
+
+async def aiter_library_tracks(chunks: AsyncIterable[bytes]) -> AsyncIterator[dict]:
+    """Entradas de `tracks` de un `YourLibrary.json` recibido por trozos (p. ej. el cuerpo de una petición)."""
+    stream = JsonArrayStream("tracks")
+    async for chunk in chunks:
+        for item in stream.feed(chunk):
+            yield item
+    for item in stream.feed(b"", final=True):
+        yield item
+    _check_found(stream)
@@ -1,22 +1,160 @@
 import httpx
-from typing import List
-from src.core.repositories.spotify_repository import SpotifyRepository
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+from src.adapters.spotify.client import get_spotify_api_client
+from src.adapters.spotify.page_cache import CachedPage, PageKey
+from src.adapters.spotify.scheduler import SpotifyAPIError, SpotifyRequestScheduler, get_spotify_scheduler
+from src.core.repositories.spotify_repository import PAGE_ETAG, PAGE_NOT_MODIFIED, SpotifyRepository
+from src.infrastructure import metrics
+from src.infrastructure.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# (token, force) -> token vigente que debe usarse en su lugar
+TokenProvider = Callable[..., Awaitable[str]]
 
 class SpotifyAPIRepository(SpotifyRepository):
     """
     Implementación del repositorio de Spotify que interactúa con la API de Spotify.
     """
     BASE_URL = "https://api.spotify.com/v1"
+    # IDs por petición que aceptan `GET /tracks`, `GET /artists` y `GET /audio-features`
+    MAX_TRACK_IDS = 50
+    MAX_ARTIST_IDS = 50
+    MAX_AUDIO_FEATURE_IDS = 100
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        scheduler: Optional[SpotifyRequestScheduler] = None,
+        token_provider: Optional[TokenProvider] = None,
+        page_cache: Optional[LRUCache[PageKey, CachedPage]] = None,
+        user: str = "me",
+    ):
+        # Cliente HTTP y planificador compartidos; por defecto los del proceso
+        self._client = client or get_spotify_api_client()
+        self._scheduler = scheduler or get_spotify_scheduler()
+        # Renueva el token antes de cada petición y tras un 401 (ver `auth.resolve_access_token`)
+        self._token_provider = token_provider
+        # Páginas ya guardadas con su ETag, por (usuario, offset, limit), para pedirlas con `If-None-Match`
+        self._page_cache = page_cache
+        # Usuario dueño del token: separa sus páginas en caché y su turno en el planificador
+        self._user = user
+
+    async def _get(self, path: str, token: str, params: dict, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        GET autenticado a través del planificador. Con `token_provider`, usa el token
+        vigente y, si Spotify responde 401, reintenta una vez con un token refrescado.
+        """
+        if self._token_provider is not None:
+            token = await self._token_provider(token)
+        headers = headers or {}
+        try:
+            response = await self._scheduler.request(
+                self._client, "GET", f"{self.BASE_URL}{path}",
+                headers={**headers, "Authorization": f"Bearer {token}"}, params=params, user=self._user,
+            )
+        except SpotifyAPIError as e:
+            if e.status_code != 401 or self._token_provider is None:
+                raise
+            fresh = await self._token_provider(token, force=True)
+            if fresh == token:
+                raise
+            logger.info(f"Token rechazado por Spotify en {path}; reintentando con el token refrescado")
+            response = await self._scheduler.request(
+                self._client, "GET", f"{self.BASE_URL}{path}",
+                headers={**headers, "Authorization": f"Bearer {fresh}"}, params=params, user=self._user,
+            )
+        return response
 
     async def get_saved_tracks(self, offset: int, limit: int, token: str) -> List[dict]:
         """Obtiene las canciones guardadas del usuario desde la API de Spotify."""
-        headers = {"Authorization": f"Bearer {token}"}
+        page = await self.get_saved_tracks_page(offset, limit, token)
+        return page.get("items", [])
+
+    async def get_saved_tracks_page(self, offset: int, limit: int, token: str) -> dict:
+        """
+        Obtiene una página de `/me/tracks` con `items` y `total`.
+        Lanza SpotifyAPIError si la petición falla tras los reintentos del planificador,
+        en lugar de devolver una página vacía que se perdería en silencio.
+
+        Con `page_cache`, la página se pide con el ETag de la última versión guardada; si
+        Spotify responde 304 se devuelve la copia en caché marcada con `PAGE_NOT_MODIFIED`,
+        sin transferir ni parsear el cuerpo. Una página descargada lleva su ETag en
+        `PAGE_ETAG` y no entra en la caché hasta `remember_saved_tracks_page`.
+        """
         params = {"limit": limit, "offset": offset}
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.BASE_URL}/me/tracks", headers=headers, params=params)
-                response.raise_for_status()
-                return response.json().get("items", [])
-            except httpx.HTTPStatusError as e:
-                print(f"Error al obtener las canciones de Spotify: {e.response.text}")
-                return []
+        key = (self._user, offset, limit)
+        cached = self._page_cache.get(key) if self._page_cache is not None else None
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._get(
+                "/me/tracks", token, params, {"If-None-Match": cached.etag} if cached else None
+            )
+            status = str(response.status_code)
+            if response.status_code == 304 and cached is not None:
+                metrics.SPOTIFY_PAGE_CACHE.inc(result="hit")
+                return {**cached.page, PAGE_NOT_MODIFIED: True}
+            page = response.json()
+            if self._page_cache is not None:
+                metrics.SPOTIFY_PAGE_CACHE.inc(result="miss")
+                etag = response.headers.get("ETag")
+                if etag:
+                    page[PAGE_ETAG] = etag
+            return page
+        except SpotifyAPIError as e:
+            status = str(e.status_code or "error")
+            logger.error(f"Error al obtener las canciones de Spotify (offset={offset}): {e}")
+            raise
+        finally:
+            self._observe("/me/tracks", started, status)
+
+    async def get_tracks(self, track_ids: List[str], token: str) -> List[Optional[dict]]:
+        """
+        Obtiene los objetos completos de hasta MAX_TRACK_IDS tracks con `GET /tracks?ids=`.
+        El resultado sigue el orden de `track_ids`, con None en los IDs que Spotify no conoce.
+        """
+        return await self._get_several("/tracks", "tracks", track_ids, self.MAX_TRACK_IDS, token)
+
+    async def get_artists(self, artist_ids: List[str], token: str) -> List[Optional[dict]]:
+        """Obtiene hasta MAX_ARTIST_IDS artistas completos con `GET /artists?ids=`; ver get_tracks."""
+        return await self._get_several("/artists", "artists", artist_ids, self.MAX_ARTIST_IDS, token)
+
+    async def get_audio_features(self, track_ids: List[str], token: str) -> List[Optional[dict]]:
+        """Obtiene las audio features de hasta MAX_AUDIO_FEATURE_IDS tracks con `GET /audio-features?ids=`."""
+        return await self._get_several(
+            "/audio-features", "audio_features", track_ids, self.MAX_AUDIO_FEATURE_IDS, token
+        )
+
+    async def _get_several(
+        self, path: str, key: str, ids: List[str], max_ids: int, token: str
+    ) -> List[Optional[dict]]:
+        """GET a un endpoint de varios IDs (`?ids=a,b,c`), devolviendo la lista `key` de la respuesta."""
+        if len(ids) > max_ids:
+            raise ValueError(f"Spotify acepta como máximo {max_ids} IDs por petición a {path}")
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._get(path, token, {"ids": ",".join(ids)})
+            status = str(response.status_code)
+            return response.json().get(key, [])
+        except SpotifyAPIError as e:
+            status = str(e.status_code or "error")
+            logger.error(f"Error al obtener {len(ids)} IDs de {path} en Spotify: {e}")
+            raise
+        finally:
+            self._observe(path, started, status)
+
+    @staticmethod
+    def _observe(endpoint: str, started: float, status: str) -> None:
+        metrics.SPOTIFY_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        metrics.SPOTIFY_REQUESTS.inc(endpoint=endpoint, status=status)
+
+    def remember_saved_tracks_page(self, offset: int, limit: int, page: dict) -> None:
+        etag = page.get(PAGE_ETAG)
+        if self._page_cache is None or not etag:
+            return
+        cached = {name: value for name, value in page.items() if name != PAGE_ETAG}
+        self._page_cache.put((self._user, offset, limit), CachedPage(etag, cached))
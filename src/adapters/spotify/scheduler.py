@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Hashable, Optional
+
+import httpx
+
+from src.infrastructure import metrics
+from src.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SpotifyAPIError(Exception):
+    """Error de la API de Spotify que no se resolvió con reintentos."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """Limitador token bucket: `rate` peticiones por segundo con ráfagas de hasta `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, key: Optional[Hashable] = None) -> None:
+        # `key` solo lo usa FairTokenBucket: aquí todos los llamadores compiten por igual
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FairTokenBucket(TokenBucket):
+    """
+    Token bucket que reparte los tokens por turnos entre claves (usuarios).
+
+    Mientras sobren tokens, `acquire` responde al momento. Cuando hay espera, cada
+    clave tiene su propia cola y los tokens se entregan a una clave distinta cada vez,
+    así que un usuario con cien peticiones en cola no retrasa más de un turno a otro
+    que solo tiene una. Un usuario solo recibe todo el ritmo cuando nadie más espera.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        super().__init__(rate, capacity)
+        self._queues: Dict[Hashable, Deque[asyncio.Future]] = {}
+        self._order: Deque[Hashable] = deque()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def waiting(self) -> int:
+        """Peticiones esperando un token."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, key: Optional[Hashable] = None) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Las colas y el repartidor pertenecen a un event loop; se descartan si cambia
+            self._queues.clear()
+            self._order.clear()
+            self._dispatcher = None
+            self._loop = loop
+
+        self._refill()
+        if not self._order and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        future = loop.create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._order.append(key)
+        queue.append(future)
+        if self._dispatcher is None:
+            self._dispatcher = loop.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # El token llegó justo cuando se canceló la espera: se devuelve
+                self._tokens = min(self.capacity, self._tokens + 1)
+            raise
+
+    async def _dispatch(self) -> None:
+        try:
+            while self._order:
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    continue
+                key = self._order.popleft()
+                queue = self._queues[key]
+                while queue and queue[0].done():
+                    queue.popleft()  # esperas canceladas
+                if queue:
+                    self._tokens -= 1
+                    queue.popleft().set_result(None)
+                if queue:
+                    self._order.append(key)
+                else:
+                    del self._queues[key]
+        finally:
+            self._dispatcher = None
+
+
+class SpotifyRequestScheduler:
+    """
+    Planificador de todas las peticiones a la Web API de Spotify.
+
+    - Limita el ritmo con un token bucket compartido por todos los llamadores, que
+      reparte los tokens por turnos entre usuarios cuando no alcanzan para todos.
+    - Ante un 429 respeta `Retry-After`, pausa a todos los llamadores durante ese
+      tiempo y reduce a la mitad la concurrencia permitida.
+    - Ante errores 5xx o de red reintenta con backoff exponencial y jitter.
+    - Cuando las peticiones van bien, recupera la concurrencia de forma gradual.
+    - Los errores 4xx distintos de 429 no se reintentan.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        max_retry_after: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.counters: Counter = Counter()
+        self._bucket = FairTokenBucket(rate_per_second, burst)
+        self._concurrency = float(max_concurrency)
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(1, int(self._concurrency))
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Las primitivas de asyncio pertenecen a un event loop; se recrean si cambia
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._condition
+
+    async def _enter(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.concurrency_limit)
+            self._in_flight += 1
+
+    async def _exit(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    async def _wait_cooldown(self) -> None:
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _on_success(self) -> None:
+        # Aumento aditivo: unas `limit` peticiones correctas suben el límite en 1
+        if self._concurrency < self.max_concurrency:
+            self._concurrency = min(self.max_concurrency, self._concurrency + 1 / self._concurrency)
+
+    def _on_throttle(self, retry_after: float) -> None:
+        # Disminución multiplicativa y pausa global hasta que expire Retry-After
+        self._concurrency = max(1.0, self._concurrency / 2)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        logger.warning(
+            f"Spotify limitó las peticiones (429): pausa de {retry_after:.1f}s, "
+            f"concurrencia reducida a {self.concurrency_limit}"
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        # Backoff exponencial con jitter completo
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", 1)))
+        except ValueError:
+            return 1.0
+
+    async def request(
+        self, client: httpx.AsyncClient, method: str, url: str, user: Optional[str] = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Envía la petición respetando el límite de ritmo y reintentando cuando procede.
+        `user` identifica al dueño del token para repartir el ritmo entre usuarios.
+        """
+        last_error = ""
+        status_code = None
+        for attempt in range(self.max_retries + 1):
+            await self._wait_cooldown()
+            await self._bucket.acquire(user)
+            await self._enter()
+            response = None
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {e}"
+            finally:
+                await self._exit()
+            self.counters["requests"] += 1
+
+            if response is not None and response.status_code < 400:
+                self._on_success()
+                return response
+
+            if response is not None and response.status_code == 429:
+                self.counters["throttled"] += 1
+                status_code = 429
+                retry_after = self._retry_after(response)
+                if retry_after > self.max_retry_after:
+                    self.counters["failed"] += 1
+                    raise SpotifyAPIError(
+                        f"Spotify pidió esperar {retry_after:.0f}s antes de reintentar {url}", 429
+                    )
+                self._on_throttle(retry_after)
+                last_error = "429 Too Many Requests"
+                delay = 0.0  # la pausa global de Retry-After ya se aplica en _wait_cooldown
+            elif response is None or response.status_code >= 500:
+                if response is not None:
+                    self.counters["server_errors"] += 1
+                    status_code = response.status_code
+                    last_error = f"{response.status_code}: {response.text[:200]}"
+                else:
+                    self.counters["transport_errors"] += 1
+                delay = self._backoff(attempt)
+            else:
+                self.counters["failed"] += 1
+                raise SpotifyAPIError(
+                    f"Error {response.status_code} de Spotify en {url}: {response.text[:200]}",
+                    response.status_code,
+                )
+
+            if attempt == self.max_retries:
+                break
+            self.counters["retried"] += 1
+            logger.info(f"Reintentando {method} {url} (intento {attempt + 2}/{self.max_retries + 1}): {last_error}")
+            if delay:
+                await asyncio.sleep(delay)
+
+        self.counters["failed"] += 1
+        raise SpotifyAPIError(
+            f"Spotify no respondió correctamente tras {self.max_retries + 1} intentos en {url}: {last_error}",
+            status_code,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.counters["requests"],
+            "throttled": self.counters["throttled"],
+            "retried": self.counters["retried"],
+            "server_errors": self.counters["server_errors"],
+            "transport_errors": self.counters["transport_errors"],
+            "failed": self.counters["failed"],
+            "concurrency_limit": self.concurrency_limit,
+            "in_flight": self._in_flight,
+            "waiting_for_rate": self._bucket.waiting,
+        }
+
+
+_scheduler: Optional[SpotifyRequestScheduler] = None
+
+
+def get_spotify_scheduler() -> SpotifyRequestScheduler:
+    """Retorna el planificador único del proceso, compartido por todas las peticiones."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SpotifyRequestScheduler(
+            rate_per_second=settings.SPOTIFY_RATE_LIMIT_PER_SECOND,
+            burst=settings.SPOTIFY_RATE_LIMIT_BURST,
+            max_concurrency=settings.SPOTIFY_MAX_CONCURRENT_REQUESTS,
+            max_retries=settings.SPOTIFY_MAX_RETRIES,
+            backoff_base=settings.SPOTIFY_BACKOFF_BASE,
+            backoff_max=settings.SPOTIFY_BACKOFF_MAX,
+            max_retry_after=settings.SPOTIFY_MAX_RETRY_AFTER,
+        )
+    return _scheduler
+
+
+def _scheduler_events() -> list:
+    if _scheduler is None:
+        return []
+    events = ("requests", "throttled", "retried", "server_errors", "transport_errors", "failed")
+    return [({"event": event}, _scheduler.counters[event]) for event in events]
+
+
+metrics.registry.callback(
+    "spotify_scheduler_events_total",
+    "Peticiones del planificador de Spotify por evento (enviadas, limitadas, reintentadas, fallidas).",
+    _scheduler_events,
+    kind="counter",
+)
+metrics.registry.callback(
+    "spotify_scheduler_concurrency_limit",
+    "Límite de concurrencia actual del planificador de Spotify.",
+    lambda: [({}, _scheduler.concurrency_limit)] if _scheduler is not None else [],
+)
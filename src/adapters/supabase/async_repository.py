@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Generic, List, Optional, Tuple, Type
+from uuid import UUID
+from supabase import AsyncClient
+
+from src.adapters.supabase.pagination import encode_cursor
+from src.adapters.supabase.repository import EntityType, Overrides, Steps, SupabaseEntityMapper, T, Writable
+from src.core.repositories.async_base_repository import AsyncBaseRepository
+from src.infrastructure.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class AsyncSupabaseRepository(SupabaseEntityMapper[EntityType], AsyncBaseRepository[EntityType], Generic[EntityType]):
+    """
+    Implementación asíncrona y genérica de un repositorio para Supabase.
+    Usa el cliente asíncrono de PostgREST, de modo que las operaciones no bloquean
+    el event loop y varias escrituras independientes pueden estar en vuelo a la vez.
+
+    Con una caché de identidad respaldada por el estado compartido (SQLite), sus lecturas
+    y escrituras se hacen en un hilo: las escrituras de cada operación se acumulan y se
+    aplican juntas al terminarla.
+    """
+    def __init__(
+        self,
+        supabase_client: AsyncClient,
+        model: Type[EntityType],
+        table_name: str,
+        identity_cache: Optional[LRUCache[str, UUID]] = None,
+        owner: Optional[str] = None,
+    ):
+        super().__init__(supabase_client, model, table_name, identity_cache, owner)
+        self._blocking_cache = identity_cache is not None and identity_cache.blocking
+        self._cache_writes: List[Callable[[], None]] = []
+
+    def _cache_write(self, write: Callable[..., None], *args: Any) -> None:
+        if self._blocking_cache:
+            self._cache_writes.append(functools.partial(write, *args))
+        else:
+            write(*args)
+
+    async def _flush_cache_writes(self) -> None:
+        if not self._cache_writes:
+            return
+        writes, self._cache_writes = self._cache_writes, []
+        await asyncio.to_thread(lambda: [write() for write in writes])
+
+    async def _run(self, steps: Steps[T]) -> T:
+        """Ejecuta los pasos de una operación con el cliente asíncrono."""
+        try:
+            operation, query = next(steps)
+            while True:
+                try:
+                    with self._measure(operation):
+                        response = await query.execute()
+                except Exception as e:
+                    operation, query = steps.throw(e)
+                else:
+                    operation, query = steps.send(response)
+        except StopIteration as done:
+            return done.value
+        finally:
+            await self._flush_cache_writes()
+
+    async def get_cached_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        """Versión asíncrona de SupabaseRepository.get_cached_ids."""
+        if self._blocking_cache:
+            return await asyncio.to_thread(self._cached_ids, spotify_ids)
+        return self._cached_ids(spotify_ids)
+
+    async def create(self, entity: Writable) -> Writable:
+        return await self._run(self._create_steps(entity))
+
+    async def get_by_id(self, entity_id: UUID) -> Optional[EntityType]:
+        return await self._run(self._get_by_id_steps(entity_id))
+
+    async def get_by_spotify_id(self, spotify_id: str) -> Optional[EntityType]:
+        return await self._run(self._get_by_spotify_id_steps(spotify_id))
+
+    async def get_by_spotify_ids(self, spotify_ids: List[str]) -> List[EntityType]:
+        """Versión asíncrona de SupabaseRepository.get_by_spotify_ids."""
+        return await self._run(self._get_by_spotify_ids_steps(spotify_ids))
+
+    async def get_ids_by_spotify_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        """Versión asíncrona de SupabaseRepository.get_ids_by_spotify_ids."""
+        return await self._run(self._get_ids_by_spotify_ids_steps(spotify_ids))
+
+    async def get_all(self, limit: int = 100, offset: int = 0) -> List[EntityType]:
+        return await self._run(self._get_all_steps(limit, offset))
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_column: str = 'created_at',
+        descending: bool = True,
+        select: str = "*",
+    ) -> Tuple[List[EntityType], Optional[str]]:
+        """Versión asíncrona de SupabaseRepository.get_page."""
+        return await self._run(self._get_page_steps(limit, cursor, order_column, descending, select))
+
+    async def iter_rows(
+        self,
+        chunk_size: int = 1000,
+        order_column: str = 'created_at',
+        descending: bool = True,
+        select: str = "*",
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Recorre toda la tabla en bloques de `chunk_size` filas en el orden de `get_page`,
+        entregando las filas JSON tal cual, sin construir entidades ni validarlas.
+        Solo hay un bloque en memoria a la vez; `select` debe incluir `id` y `order_column`.
+        """
+        cursor = None
+        while True:
+            query = self._keyset_query(select, chunk_size, cursor, order_column, descending)
+            try:
+                with self._measure("select"):
+                    response = await query.execute()
+            except Exception as e:
+                logger.error(f"Error al recorrer '{self.table_name}' por '{order_column}': {e}")
+                raise
+            rows = response.data
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            cursor = encode_cursor(str(rows[-1][order_column]), str(rows[-1]['id']))
+
+    async def get_latest(self, order_column: str) -> Optional[EntityType]:
+        return await self._run(self._get_latest_steps(order_column))
+
+    async def update(self, entity_id: UUID, updated_data: dict) -> Optional[EntityType]:
+        return await self._run(self._update_steps(entity_id, updated_data))
+
+    async def delete(self, entity_id: UUID) -> bool:
+        return await self._run(self._delete_steps(entity_id))
+
+    async def delete_by_spotify_ids(self, spotify_ids: List[str]) -> int:
+        """Versión asíncrona de SupabaseRepository.delete_by_spotify_ids."""
+        return await self._run(self._delete_by_spotify_ids_steps(spotify_ids))
+
+    async def create_many(self, entities: List[Writable]) -> List[Writable]:
+        return await self._run(self._create_many_steps(entities))
+
+    async def upsert_many(
+        self,
+        entities: List[Writable],
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        overrides: Optional[Overrides] = None,
+    ) -> List[Writable]:
+        """Versión asíncrona de SupabaseRepository.upsert_many."""
+        return await self._run(self._upsert_many_steps(entities, on_conflict, ignore_duplicates, overrides))
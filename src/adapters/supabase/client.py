@@ -1,4 +1,5 @@
-from supabase import create_client, Client
+from typing import Optional
+from supabase import acreate_client, create_client, AsyncClient, Client
 from src.infrastructure.config.settings import settings
 
 # Crear una única instancia del cliente de Supabase
@@ -7,8 +8,33 @@ supabase_client: Client = create_client(
     settings.SUPABASE_SERVICE_KEY
 )
 
+# Instancia única del cliente asíncrono; se crea al arrancar la aplicación
+# porque su construcción es una corrutina.
+async_supabase_client: Optional[AsyncClient] = None
+
 def get_supabase_client() -> Client:
     """
     Retorna la instancia del cliente de Supabase.
     """
-    return supabase_client
\ No newline at end of file
+    return supabase_client
+
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    Retorna la instancia del cliente asíncrono de Supabase, creándola si aún no existe.
+    """
+    global async_supabase_client
+    if async_supabase_client is None:
+        async_supabase_client = await acreate_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_KEY
+        )
+    return async_supabase_client
+
+async def close_async_supabase_client() -> None:
+    """
+    Cierra las conexiones HTTP del cliente asíncrono de Supabase.
+    """
+    global async_supabase_client
+    if async_supabase_client is not None:
+        await async_supabase_client.postgrest.aclose()
+        async_supabase_client = None
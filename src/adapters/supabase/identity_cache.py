@@ -0,0 +1,169 @@
+import logging
+from typing import Dict, Iterable, Mapping, Optional
+from uuid import UUID
+
+from supabase import Client
+
+from src.infrastructure import metrics
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.config.settings import settings
+from src.infrastructure.shared_state import SharedState, get_shared_state
+
+logger = logging.getLogger(__name__)
+
+
+class SharedIdentityCache(LRUCache[str, UUID]):
+    """
+    Caché de identidad de un proceso respaldada por el estado compartido entre workers.
+
+    La LRU local responde primero; los IDs que no tiene se buscan en el estado compartido
+    en una sola consulta y se copian a la local. Las escrituras van a ambas, así que un
+    artista guardado por un worker no se vuelve a escribir desde otro. Como un ID de
+    Spotify no cambia de UUID salvo al borrarse la fila, la copia local no caduca.
+    """
+
+    blocking = True
+
+    def __init__(self, maxsize: int, state: SharedState, namespace: str):
+        super().__init__(maxsize)
+        self.state = state
+        self.namespace = namespace
+        self.shared_hits = 0
+
+    def get(self, key: str) -> Optional[UUID]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, UUID]:
+        keys = list(keys)
+        found: Dict[str, UUID] = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is None:
+                    missing.append(key)
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        if missing:
+            shared = self.state.get_ids(self.namespace, missing)
+            if shared:
+                super().put_many(shared)
+                found.update(shared)
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            self.shared_hits += len(found) - (len(keys) - len(missing))
+        return found
+
+    def put(self, key: str, value: UUID) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, items: Mapping[str, UUID]) -> None:
+        with self._lock:
+            # Solo se escriben en el estado compartido las correspondencias nuevas para este proceso
+            new = {key: value for key, value in items.items() if self._data.get(key) != value}
+            for key, value in items.items():
+                self._put(key, value)
+        if new:
+            self.state.put_ids(self.namespace, new)
+
+    def discard(self, key: str) -> None:
+        super().discard(key)
+        self.state.discard_ids(self.namespace, [key])
+
+    def discard_value(self, value: UUID) -> None:
+        super().discard_value(value)
+        self.state.discard_uuid(self.namespace, value)
+
+    def clear(self) -> None:
+        super().clear()
+        self.shared_hits = 0
+        self.state.clear_ids(self.namespace)
+
+
+def _identity_cache(maxsize: int, namespace: str) -> LRUCache[str, UUID]:
+    state = get_shared_state()
+    if state is None:
+        return LRUCache(maxsize)
+    return SharedIdentityCache(maxsize, state, namespace)
+
+
+# Cachés únicas por proceso: ID de Spotify -> UUID en Supabase.
+# Sobreviven entre peticiones, a diferencia de los repositorios creados en deps.py.
+# Con SHARED_STATE_BACKEND se comparten además entre los workers.
+artist_identity_cache: LRUCache[str, UUID] = _identity_cache(settings.IDENTITY_CACHE_MAX_ARTISTS, "artists")
+album_identity_cache: LRUCache[str, UUID] = _identity_cache(settings.IDENTITY_CACHE_MAX_ALBUMS, "albums")
+
+_CACHES = {"artists": artist_identity_cache, "albums": album_identity_cache}
+
+metrics.registry.callback(
+    "identity_cache_hits_total",
+    "Búsquedas resueltas por las cachés de identidad.",
+    lambda: [({"cache": name}, cache.hits) for name, cache in _CACHES.items()],
+    kind="counter",
+)
+metrics.registry.callback(
+    "identity_cache_misses_total",
+    "Búsquedas que no estaban en las cachés de identidad.",
+    lambda: [({"cache": name}, cache.misses) for name, cache in _CACHES.items()],
+    kind="counter",
+)
+metrics.registry.callback(
+    "identity_cache_shared_hits_total",
+    "Búsquedas que no estaban en la caché del proceso y resolvió el estado compartido entre workers.",
+    lambda: [
+        ({"cache": name}, cache.shared_hits)
+        for name, cache in _CACHES.items()
+        if isinstance(cache, SharedIdentityCache)
+    ],
+    kind="counter",
+)
+metrics.registry.callback(
+    "identity_cache_entries",
+    "Entradas en cada caché de identidad.",
+    lambda: [({"cache": name}, len(cache)) for name, cache in _CACHES.items()],
+)
+
+# Filas leídas por petición al precargar las cachés
+WARMUP_PAGE_SIZE = 1000
+
+
+def get_artist_identity_cache() -> LRUCache[str, UUID]:
+    """Retorna la caché de identidad de artistas del proceso."""
+    return artist_identity_cache
+
+
+def get_album_identity_cache() -> LRUCache[str, UUID]:
+    """Retorna la caché de identidad de álbumes del proceso."""
+    return album_identity_cache
+
+
+def warm_identity_cache(client: Client, table_name: str, cache: LRUCache[str, UUID]) -> int:
+    """
+    Precarga una caché leyendo solo las columnas `id` y `spotify_id` de la tabla,
+    en páginas ordenadas por `id`, hasta llenarla o agotar la tabla.
+    Retorna el número de entradas cargadas.
+    """
+    loaded = 0
+    last_id = None
+    while loaded < cache.maxsize:
+        query = client.table(table_name).select("id,spotify_id").order("id").limit(WARMUP_PAGE_SIZE)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.execute().data
+        if not rows:
+            break
+        cache.put_many({row["spotify_id"]: UUID(row["id"]) for row in rows})
+        loaded += len(rows)
+        last_id = rows[-1]["id"]
+        if len(rows) < WARMUP_PAGE_SIZE:
+            break
+    logger.info(f"Caché de identidad de '{table_name}' precargada con {min(loaded, cache.maxsize)} entradas")
+    return min(loaded, cache.maxsize)
+
+
+def warm_identity_caches(client: Client) -> None:
+    """Precarga las cachés de artistas y álbumes."""
+    warm_identity_cache(client, "spotify_artists", artist_identity_cache)
+    warm_identity_cache(client, "spotify_albums", album_identity_cache)
@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from typing import Tuple
+
+class InvalidCursorError(ValueError):
+    """El cursor de paginación no es válido (manipulado o de otra consulta)."""
+
+def encode_cursor(sort_value: str, row_id: str) -> str:
+    """
+    Cursor opaco que apunta justo después de la fila (`sort_value`, `row_id`).
+    Se guardan los valores tal como los devolvió PostgREST para no perder precisión.
+    """
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Devuelve (valor de orden, id) de un cursor creado con `encode_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Cursor de paginación no válido: {cursor!r}") from e
+    if not isinstance(sort_value, str) or not isinstance(row_id, str):
+        raise InvalidCursorError(f"Cursor de paginación no válido: {cursor!r}")
+    return sort_value, row_id
+
+def _quote(value: str) -> str:
+    # Los valores con ',', '.', ':' o paréntesis van entre comillas dentro de `or=(...)`
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def keyset_filter(order_column: str, cursor: str, descending: bool = True) -> str:
+    """
+    Condición de PostgREST (para `or_`) que selecciona las filas posteriores al cursor
+    en el orden (`order_column`, `id`). Con el índice compuesto de la tabla, la base de
+    datos salta directamente a esa posición en lugar de recorrer y descartar `offset` filas.
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    op = 'lt' if descending else 'gt'
+    return (
+        f"{order_column}.{op}.{_quote(sort_value)},"
+        f"and({order_column}.eq.{_quote(sort_value)},id.{op}.{_quote(row_id)})"
+    )
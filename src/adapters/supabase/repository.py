@@ -1,11 +1,17 @@
 import logging
-from typing import Type, TypeVar, List, Optional, Generic
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Iterator, Type, TypeVar, List, Optional, Generic, Tuple, Union
 from uuid import UUID
-from datetime import datetime
 from pydantic import BaseModel
 from supabase import Client
 
+from src.adapters.supabase.pagination import encode_cursor, keyset_filter
+from src.adapters.supabase.serialization import get_entity_plan
+from src.core.entities.records import EntityRecord
 from src.core.repositories.base_repository import BaseRepository
+from src.infrastructure import metrics
+from src.infrastructure.cache import LRUCache
 
 # Configuración del logger
 logger = logging.getLogger(__name__)
@@ -13,164 +19,484 @@ logger = logging.getLogger(__name__)
 # Marcador de tipo para las entidades Pydantic
 EntityType = TypeVar('EntityType', bound=BaseModel)
 
-class SupabaseRepository(BaseRepository[EntityType], Generic[EntityType]):
+# Lo que aceptan las escrituras: entidades Pydantic o registros con `__slots__`
+# (src/core/entities/records.py), que el plan de conversión codifica igual. Cada
+# escritura devuelve el mismo tipo que recibe
+Writable = TypeVar('Writable', bound=Union[BaseModel, EntityRecord])
+
+T = TypeVar('T')
+
+# Pasos de una operación: genera (operación, consulta) por cada petición, recibe su
+# respuesta y devuelve el resultado. Los repositorios solo deciden cómo ejecutarla.
+Steps = Generator[Tuple[str, Any], Any, T]
+
+# Valores por nombre de campo que sustituyen a los de cada entidad en la fila enviada
+Overrides = Callable[[Any], Dict[str, Any]]
+
+# Máximo de IDs por filtro `in_` para no exceder la longitud de URL de PostgREST
+IN_FILTER_CHUNK_SIZE = 100
+
+# `select` de spotify_tracks con su álbum y sus artistas embebidos en la misma consulta
+# (los artistas a través de la tabla de unión spotify_track_artists)
+SAVED_TRACK_WITH_RELATIONS = "*,album:spotify_albums(*),artists:spotify_artists(*)"
+
+@contextmanager
+def measure_request(table_name: str, operation: str) -> Iterator[None]:
+    """Registra la latencia y los errores de una petición a Supabase."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.SUPABASE_REQUEST_ERRORS.inc(table=table_name, operation=operation)
+        raise
+    finally:
+        metrics.SUPABASE_REQUEST_SECONDS.observe(time.perf_counter() - started, table=table_name, operation=operation)
+
+class SupabaseEntityMapper(Generic[EntityType]):
     """
-    Implementación concreta y genérica de un repositorio para Supabase.
-    Puede manejar operaciones CRUD para cualquier entidad Pydantic.
+    Conversión entre entidades Pydantic y filas de una tabla de Supabase, y consultas
+    de cada operación, compartidas por los repositorios síncrono y asíncrono.
+
+    Cada operación es un generador de pasos (`_*_steps`): construye las consultas,
+    recibe sus respuestas y arma el resultado. El repositorio síncrono las ejecuta
+    con `execute()` y el asíncrono con `await ... execute()`.
+
+    Si recibe una `identity_cache`, cada fila leída o escrita registra en ella
+    su ID de Spotify -> UUID, de modo que la caché puede compartirse entre
+    instancias y peticiones.
+
+    En las tablas con propietario (`OWNER_COLUMNS`), con `owner` las consultas solo
+    leen, actualizan y borran las filas de ese usuario, y las escritas le pertenecen.
+    Sin él se ven las de todos y las nuevas toman el propietario por defecto de la tabla.
     """
-    def __init__(self, supabase_client: Client, model: Type[EntityType], table_name: str):
+    def __init__(
+        self,
+        supabase_client: Any,
+        model: Type[EntityType],
+        table_name: str,
+        identity_cache: Optional[LRUCache[str, UUID]] = None,
+        owner: Optional[str] = None,
+    ):
         self.client = supabase_client
         self.model = model
         self.table_name = table_name
+        self.identity_cache = identity_cache
+        # Columnas, campos excluidos y conversores del modelo, calculados una vez por (modelo, tabla)
+        self.plan = get_entity_plan(model, table_name)
+        self.owner = owner if self.plan.owner_column else None
+
+    @property
+    def spotify_id_column(self) -> str:
+        """Nombre de la columna que guarda el ID de Spotify en la tabla."""
+        return self.plan.spotify_id_column
+
+    def _serialize_entity(self, entity: Writable) -> dict:
+        return self._owned(self.plan.encode(entity))
+
+    def _owned(self, row: dict) -> dict:
+        """Asigna la fila al propietario del repositorio, si tiene uno."""
+        if self.owner is not None:
+            row[self.plan.owner_column] = self.owner
+        return row
+
+    def _select(self, select: str = "*") -> Any:
+        return self._scoped(self.client.table(self.table_name).select(select))
+
+    def _scoped(self, query: Any) -> Any:
+        """Limita una consulta de lectura, actualización o borrado a las filas del propietario."""
+        if self.owner is not None:
+            return query.eq(self.plan.owner_column, self.owner)
+        return query
+
+    def _conflict_target(self, conflict_column: str) -> str:
+        """
+        Columnas de la restricción única de un upsert: en las tablas con propietario el ID
+        de Spotify es único por usuario (`UNIQUE (owner, spotify_track_id)`).
+        """
+        if self.plan.owner_column and conflict_column == self.spotify_id_column:
+            return f"{self.plan.owner_column},{conflict_column}"
+        return conflict_column
+
+    def _measure(self, operation: str):
+        return measure_request(self.table_name, operation)
+
+    def _count_written(self, operation: str, response: Any) -> None:
+        metrics.SUPABASE_ROWS_WRITTEN.inc(len(response.data or []), table=self.table_name, operation=operation)
+
+    def _cache_write(self, write: Callable[..., None], *args: Any) -> None:
+        """Escritura en la caché de identidad; el repositorio asíncrono la hace fuera del event loop."""
+        write(*args)
+
+    def _remember(self, data: dict) -> None:
+        """Registra el par ID de Spotify -> UUID de una fila en la caché de identidad."""
+        if self.identity_cache is not None and data.get('id') and data.get(self.spotify_id_column):
+            self._cache_write(self.identity_cache.put, data[self.spotify_id_column], UUID(data['id']))
+
+    def _remember_many(self, rows: List[dict]) -> None:
+        """Registra los pares de varias filas de una vez (una sola escritura en el estado compartido)."""
+        if self.identity_cache is None:
+            return
+        column = self.spotify_id_column
+        pairs = {row[column]: UUID(row['id']) for row in rows if row.get('id') and row.get(column)}
+        if pairs:
+            self._cache_write(self.identity_cache.put_many, pairs)
+
+    def _cached_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        if self.identity_cache is None:
+            return {}
+        return self.identity_cache.get_many(spotify_ids)
+
+    def _deserialize_row(self, data: dict) -> EntityType:
+        self._remember(data)
+        return self.plan.decode(data)
 
-    def _serialize_entity(self, entity: EntityType) -> dict:
-        entity_dict = entity.model_dump(exclude_unset=True)
-        for key, value in entity_dict.items():
-            # Convert HttpUrl to string to avoid serialization issues
-            if hasattr(value, '__class__') and 'HttpUrl' in str(type(value)):
-                entity_dict[key] = str(value)
-            # Convert UUID to string to avoid JSON serialization issues
-            if isinstance(value, UUID):
-                entity_dict[key] = str(value)
-            # Convert datetime to ISO string with 1 decimal second to avoid JSON serialization issues
-            if isinstance(value, datetime):
-                formatted = value.isoformat()
-                if '.' in formatted:
-                    parts = formatted.split('.')
-                    if len(parts) > 1:
-                        micro_tz = parts[1].split('+')
-                        micro = micro_tz[0]
-                        tz = '+' + micro_tz[1] if len(micro_tz) > 1 else ''
-                        formatted = parts[0] + '.' + micro[0] + tz
-                logger.debug(f"Formatted timestamp for {key}: {formatted}")
-                entity_dict[key] = formatted
-
-        # Special handling for SavedTrack
-        if self.model.__name__ == 'SavedTrack':
-            # Exclude nested objects not in table
-            entity_dict.pop('artists', None)
-            entity_dict.pop('album', None)
-            # Rename spotify_id to spotify_track_id for tracks table
-            if 'spotify_id' in entity_dict:
-                entity_dict['spotify_track_id'] = entity_dict.pop('spotify_id')
-            # Ensure album_id is included if present
-        # Special handling for Album
-        elif self.model.__name__ == 'Album':
-            # Exclude nested objects not in table
-            entity_dict.pop('artists', None)
-        return entity_dict
-
-    def create(self, entity: EntityType) -> EntityType:
+    def _deserialize_rows(self, rows: List[dict]) -> List[EntityType]:
+        self._remember_many(rows)
+        decode = self.plan.decode
+        return [decode(row) for row in rows]
+
+    def _build_persisted(self, entity: Writable, data: dict) -> Writable:
+        """Combina la entidad enviada con la fila devuelta por Supabase."""
+        self._remember(data)
+        return self.plan.merge_generated(entity, data)
+
+    def _build_persisted_many(self, entities: List[Writable], rows: List[dict]) -> List[Writable]:
+        """Combina cada entidad enviada con la fila devuelta en su misma posición."""
+        self._remember_many(rows)
+        merge = self.plan.merge_generated
+        return [merge(entity, row) for entity, row in zip(entities, rows)]
+
+    def _prepare_upsert(
+        self, entities: List[Writable], conflict_column: str, overrides: Optional[Overrides] = None
+    ) -> Tuple[Dict[Any, Writable], List[dict]]:
+        """Serializa el lote enviando una sola vez cada valor de la columna de conflicto."""
+        entity_by_key: Dict[Any, Writable] = {}
+        entity_dicts = []
+        for entity, entity_dict in zip(entities, self.plan.encode_many(entities, overrides)):
+            self._owned(entity_dict)
+            key = entity_dict.get(conflict_column)
+            if key in entity_by_key:
+                continue
+            entity_by_key[key] = entity
+            entity_dicts.append(entity_dict)
+        return entity_by_key, entity_dicts
+
+    def _keyset_query(
+        self, select: str, limit: int, cursor: Optional[str], order_column: str, descending: bool
+    ) -> Any:
+        """Consulta de hasta `limit` filas ordenadas por (`order_column`, `id`) a partir del cursor."""
+        query = self._select(select)
+        if cursor:
+            query = query.or_(keyset_filter(order_column, cursor, descending))
+        return query.order(order_column, desc=descending).order('id', desc=descending).limit(limit)
+
+    def _keyset_page(self, rows: List[dict], limit: int, order_column: str) -> Tuple[List[EntityType], Optional[str]]:
+        """
+        Entidades de la página y cursor de la siguiente (None si es la última). La consulta
+        pide `limit + 1` filas para saber si hay página siguiente sin contar la tabla.
+        """
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(str(last[order_column]), str(last['id']))
+        return self._deserialize_rows(rows), next_cursor
+
+    def _collect_upserted(
+        self, entity_by_key: Dict[Any, Writable], rows: List[dict], conflict_column: str
+    ) -> List[Writable]:
+        """Empareja las filas devueltas con las entidades enviadas, en el orden de entrada."""
+        rows_by_key = {str(item[conflict_column]): item for item in rows or []}
+        matched = [(entity, rows_by_key[str(key)]) for key, entity in entity_by_key.items() if str(key) in rows_by_key]
+        return self._build_persisted_many([entity for entity, _ in matched], [row for _, row in matched])
+
+    # --- Operaciones -----------------------------------------------------------
+
+    def _create_steps(self, entity: Writable) -> Steps[Optional[Writable]]:
         entity_dict = self._serialize_entity(entity)
         try:
-            response = self.client.table(self.table_name).insert(entity_dict).execute()
+            response = yield "insert", self.client.table(self.table_name).insert(entity_dict)
+            self._count_written("insert", response)
             if response.data:
-                # Special handling for SavedTrack due to nested objects not in table
-                if self.model.__name__ == 'SavedTrack':
-                    created_entity = entity.model_copy()
-                    created_entity.id = UUID(response.data[0]['id'])
-                    if 'created_at' in response.data[0]:
-                        created_entity.created_at = datetime.fromisoformat(response.data[0]['created_at'])
-                    if 'updated_at' in response.data[0]:
-                        created_entity.updated_at = datetime.fromisoformat(response.data[0]['updated_at'])
-                    return created_entity
-                else:
-                    return self.model.model_validate(response.data[0])
+                return self._build_persisted(entity, response.data[0])
             logger.warning(f"No se recibieron datos al crear la entidad en '{self.table_name}'.")
             return None
         except Exception as e:
             logger.error(f"Error al crear entidad en '{self.table_name}': {e}")
             raise
 
-    def get_by_id(self, entity_id: UUID) -> Optional[EntityType]:
+    def _get_by_id_steps(self, entity_id: UUID) -> Steps[Optional[EntityType]]:
         try:
-            response = self.client.table(self.table_name).select("*").eq('id', str(entity_id)).execute()
+            response = yield "select", self._select().eq('id', str(entity_id))
             if response.data:
-                return self.model.model_validate(response.data[0])
+                return self._deserialize_row(response.data[0])
             return None
         except Exception as e:
             logger.error(f"Error al obtener por ID '{entity_id}' de '{self.table_name}': {e}")
             raise
 
-    def get_by_spotify_id(self, spotify_id: str) -> Optional[EntityType]:
+    def _get_by_spotify_id_steps(self, spotify_id: str) -> Steps[Optional[EntityType]]:
         try:
-            # Use the correct column name based on the table
-            column_name = 'spotify_track_id' if self.table_name == 'spotify_tracks' else 'spotify_id'
-            response = self.client.table(self.table_name).select("*").eq(column_name, spotify_id).execute()
+            response = yield "select", self._select().eq(self.spotify_id_column, spotify_id)
             if response.data:
-                # Special handling for SavedTrack due to nested objects not in table
-                if self.model.__name__ == 'SavedTrack':
-                    # Create SavedTrack manually since DB doesn't have artists/album
-                    data = response.data[0]
-                    from src.core.entities.track import SavedTrack
-                    return SavedTrack(
-                        id=UUID(data['id']) if data.get('id') else None,
-                        spotify_track_id=data['spotify_track_id'],
-                        track_name=data['track_name'],
-                        artists=[],  # Not stored in DB
-                        album=None,  # Not stored in DB
-                        album_id=UUID(data['album_id']) if data.get('album_id') else None,
-                        spotify_url=data['spotify_url'],
-                        added_at=datetime.fromisoformat(data['added_at']),
-                        created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else None,
-                        updated_at=datetime.fromisoformat(data['updated_at']) if data.get('updated_at') else None,
-                    )
-                else:
-                    return self.model.model_validate(response.data[0])
+                return self._deserialize_row(response.data[0])
             return None
         except Exception as e:
             logger.error(f"Error al obtener por Spotify ID '{spotify_id}' de '{self.table_name}': {e}")
             raise
 
-    def get_all(self, limit: int = 100, offset: int = 0) -> List[EntityType]:
+    def _get_by_spotify_ids_steps(self, spotify_ids: List[str]) -> Steps[List[EntityType]]:
+        unique_ids = list(dict.fromkeys(spotify_ids))
+        entities = []
         try:
-            response = self.client.table(self.table_name).select("*").limit(limit).offset(offset).execute()
-            return [self.model.model_validate(item) for item in response.data]
+            for start in range(0, len(unique_ids), IN_FILTER_CHUNK_SIZE):
+                chunk = unique_ids[start:start + IN_FILTER_CHUNK_SIZE]
+                response = yield "select", self._select().in_(self.spotify_id_column, chunk)
+                entities.extend(self._deserialize_rows(response.data))
+            return entities
+        except Exception as e:
+            logger.error(f"Error al obtener {len(unique_ids)} Spotify IDs de '{self.table_name}': {e}")
+            raise
+
+    def _get_ids_by_spotify_ids_steps(self, spotify_ids: List[str]) -> Steps[Dict[str, UUID]]:
+        unique_ids = list(dict.fromkeys(spotify_ids))
+        column = self.spotify_id_column
+        ids: Dict[str, UUID] = {}
+        try:
+            for start in range(0, len(unique_ids), IN_FILTER_CHUNK_SIZE):
+                chunk = unique_ids[start:start + IN_FILTER_CHUNK_SIZE]
+                response = yield "select", self._select(f"id,{column}").in_(column, chunk)
+                self._remember_many(response.data)
+                ids.update((row[column], UUID(row['id'])) for row in response.data)
+            return ids
+        except Exception as e:
+            logger.error(f"Error al obtener los UUID de {len(unique_ids)} Spotify IDs de '{self.table_name}': {e}")
+            raise
+
+    def _get_all_steps(self, limit: int, offset: int) -> Steps[List[EntityType]]:
+        try:
+            response = yield "select", self._select().limit(limit).offset(offset)
+            return self._deserialize_rows(response.data)
         except Exception as e:
             logger.error(f"Error al obtener todos los registros de '{self.table_name}': {e}")
             raise
 
-    def update(self, entity_id: UUID, updated_data: dict) -> Optional[EntityType]:
+    def _get_page_steps(
+        self, limit: int, cursor: Optional[str], order_column: str, descending: bool, select: str
+    ) -> Steps[Tuple[List[EntityType], Optional[str]]]:
+        # Un cursor no válido lanza InvalidCursorError antes de consultar Supabase
+        query = self._keyset_query(select, limit + 1, cursor, order_column, descending)
         try:
-            response = self.client.table(self.table_name).update(updated_data).eq('id', str(entity_id)).execute()
+            response = yield "select", query
+            return self._keyset_page(response.data, limit, order_column)
+        except Exception as e:
+            logger.error(f"Error al obtener una página por '{order_column}' de '{self.table_name}': {e}")
+            raise
+
+    def _get_latest_steps(self, order_column: str) -> Steps[Optional[EntityType]]:
+        try:
+            response = yield "select", self._select().order(order_column, desc=True).limit(1)
+            if response.data:
+                return self._deserialize_row(response.data[0])
+            return None
+        except Exception as e:
+            logger.error(f"Error al obtener el registro más reciente por '{order_column}' de '{self.table_name}': {e}")
+            raise
+
+    def _update_steps(self, entity_id: UUID, updated_data: dict) -> Steps[Optional[EntityType]]:
+        try:
+            response = yield "update", self._scoped(
+                self.client.table(self.table_name).update(updated_data).eq('id', str(entity_id))
+            )
+            self._count_written("update", response)
             if response.data:
-                return self.model.model_validate(response.data[0])
+                return self._deserialize_row(response.data[0])
             return None
         except Exception as e:
             logger.error(f"Error al actualizar entidad con ID '{entity_id}' en '{self.table_name}': {e}")
             raise
 
-    def delete(self, entity_id: UUID) -> bool:
+    def _delete_steps(self, entity_id: UUID) -> Steps[bool]:
         try:
-            response = self.client.table(self.table_name).delete().eq('id', str(entity_id)).execute()
+            response = yield "delete", self._scoped(self.client.table(self.table_name).delete().eq('id', str(entity_id)))
+            self._count_written("delete", response)
+            if self.identity_cache is not None:
+                self._cache_write(self.identity_cache.discard_value, entity_id)
             return bool(response.data)
         except Exception as e:
             logger.error(f"Error al eliminar entidad con ID '{entity_id}' en '{self.table_name}': {e}")
             raise
 
-    def create_many(self, entities: List[EntityType]) -> List[EntityType]:
-        entity_dicts = [self._serialize_entity(e) for e in entities]
+    def _delete_by_spotify_ids_steps(self, spotify_ids: List[str]) -> Steps[int]:
+        deleted = 0
+        try:
+            for start in range(0, len(spotify_ids), IN_FILTER_CHUNK_SIZE):
+                chunk = spotify_ids[start:start + IN_FILTER_CHUNK_SIZE]
+                response = yield "delete", self._scoped(
+                    self.client.table(self.table_name).delete().in_(self.spotify_id_column, chunk)
+                )
+                self._count_written("delete", response)
+                deleted += len(response.data)
+                if self.identity_cache is not None:
+                    for spotify_id in chunk:
+                        self._cache_write(self.identity_cache.discard, spotify_id)
+            return deleted
+        except Exception as e:
+            logger.error(f"Error al eliminar {len(spotify_ids)} Spotify IDs de '{self.table_name}': {e}")
+            raise
+
+    def _create_many_steps(self, entities: List[Writable]) -> Steps[List[Writable]]:
+        entity_dicts = [self._owned(row) for row in self.plan.encode_many(entities)]
         if not entity_dicts:
             return []
         try:
-            response = self.client.table(self.table_name).insert(entity_dicts).execute()
+            response = yield "insert", self.client.table(self.table_name).insert(entity_dicts)
+            self._count_written("insert", response)
             if response.data:
-                # Special handling for SavedTrack due to nested objects not in table
-                if self.model.__name__ == 'SavedTrack':
-                    created_entities = []
-                    for i, item in enumerate(response.data):
-                        created_entity = entities[i].model_copy()
-                        created_entity.id = UUID(item['id'])
-                        if 'created_at' in item:
-                            created_entity.created_at = datetime.fromisoformat(item['created_at'])
-                        if 'updated_at' in item:
-                            created_entity.updated_at = datetime.fromisoformat(item['updated_at'])
-                        created_entities.append(created_entity)
-                    return created_entities
-                else:
-                    return [self.model.model_validate(item) for item in response.data]
+                return self._build_persisted_many(entities, response.data)
             logger.warning(f"No se recibieron datos al crear múltiples entidades en '{self.table_name}'.")
             return []
         except Exception as e:
             logger.error(f"Error al crear múltiples entidades en '{self.table_name}': {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _upsert_many_steps(
+        self,
+        entities: List[Writable],
+        on_conflict: Optional[str],
+        ignore_duplicates: bool,
+        overrides: Optional[Overrides],
+    ) -> Steps[List[Writable]]:
+        conflict_column = on_conflict or self.spotify_id_column
+        entity_by_key, entity_dicts = self._prepare_upsert(entities, conflict_column, overrides)
+        if not entity_dicts:
+            return []
+        try:
+            response = yield "upsert", self.client.table(self.table_name).upsert(
+                entity_dicts,
+                on_conflict=self._conflict_target(conflict_column),
+                ignore_duplicates=ignore_duplicates,
+            )
+            self._count_written("upsert", response)
+            return self._collect_upserted(entity_by_key, response.data, conflict_column)
+        except Exception as e:
+            logger.error(f"Error al hacer upsert de múltiples entidades en '{self.table_name}': {e}")
+            raise
+
+class SupabaseRepository(SupabaseEntityMapper[EntityType], BaseRepository[EntityType]):
+    """
+    Implementación concreta y genérica de un repositorio para Supabase.
+    Puede manejar operaciones CRUD para cualquier entidad Pydantic.
+    """
+    def __init__(
+        self,
+        supabase_client: Client,
+        model: Type[EntityType],
+        table_name: str,
+        identity_cache: Optional[LRUCache[str, UUID]] = None,
+        owner: Optional[str] = None,
+    ):
+        super().__init__(supabase_client, model, table_name, identity_cache, owner)
+
+    def _run(self, steps: Steps[T]) -> T:
+        """Ejecuta los pasos de una operación con el cliente síncrono."""
+        try:
+            operation, query = next(steps)
+            while True:
+                try:
+                    with self._measure(operation):
+                        response = query.execute()
+                except Exception as e:
+                    operation, query = steps.throw(e)
+                else:
+                    operation, query = steps.send(response)
+        except StopIteration as done:
+            return done.value
+
+    def get_cached_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        """
+        Devuelve los UUID conocidos por la caché de identidad, sin consultar Supabase.
+        Los IDs ausentes simplemente no aparecen en el resultado.
+        """
+        return self._cached_ids(spotify_ids)
+
+    def create(self, entity: Writable) -> Writable:
+        return self._run(self._create_steps(entity))
+
+    def get_by_id(self, entity_id: UUID) -> Optional[EntityType]:
+        return self._run(self._get_by_id_steps(entity_id))
+
+    def get_by_spotify_id(self, spotify_id: str) -> Optional[EntityType]:
+        return self._run(self._get_by_spotify_id_steps(spotify_id))
+
+    def get_by_spotify_ids(self, spotify_ids: List[str]) -> List[EntityType]:
+        """
+        Obtiene las entidades existentes para un conjunto de IDs de Spotify.
+        Hace una consulta `in_` por cada bloque de IN_FILTER_CHUNK_SIZE IDs.
+        """
+        return self._run(self._get_by_spotify_ids_steps(spotify_ids))
+
+    def get_ids_by_spotify_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        """
+        ID de Spotify -> UUID de las filas existentes, leyendo solo esas dos columnas
+        (un `in_` por cada bloque de IN_FILTER_CHUNK_SIZE IDs). Los ausentes no aparecen.
+        """
+        return self._run(self._get_ids_by_spotify_ids_steps(spotify_ids))
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[EntityType]:
+        return self._run(self._get_all_steps(limit, offset))
+
+    def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_column: str = 'created_at',
+        descending: bool = True,
+        select: str = "*",
+    ) -> Tuple[List[EntityType], Optional[str]]:
+        """
+        Paginación por cursor (keyset) sobre (`order_column`, `id`): el coste de cada
+        página no depende de su posición, a diferencia de `get_all` con `offset`.
+        `select` admite recursos embebidos de PostgREST (p. ej. `*,album:spotify_albums(*)`).
+        """
+        return self._run(self._get_page_steps(limit, cursor, order_column, descending, select))
+
+    def get_latest(self, order_column: str) -> Optional[EntityType]:
+        return self._run(self._get_latest_steps(order_column))
+
+    def update(self, entity_id: UUID, updated_data: dict) -> Optional[EntityType]:
+        return self._run(self._update_steps(entity_id, updated_data))
+
+    def delete(self, entity_id: UUID) -> bool:
+        return self._run(self._delete_steps(entity_id))
+
+    def delete_by_spotify_ids(self, spotify_ids: List[str]) -> int:
+        """
+        Elimina las filas con esos IDs de Spotify, con un `DELETE ... in_` por cada bloque
+        de IN_FILTER_CHUNK_SIZE IDs. Las filas de las tablas de unión se borran en cascada.
+        """
+        return self._run(self._delete_by_spotify_ids_steps(spotify_ids))
+
+    def create_many(self, entities: List[Writable]) -> List[Writable]:
+        return self._run(self._create_many_steps(entities))
+
+    def upsert_many(
+        self,
+        entities: List[Writable],
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        overrides: Optional[Overrides] = None,
+    ) -> List[Writable]:
+        """
+        Inserta o actualiza múltiples entidades en una sola petición.
+
+        `on_conflict` es la columna única que detecta duplicados (por defecto la
+        columna del ID de Spotify de la tabla, única por propietario si la tabla lo tiene). Con `ignore_duplicates=False` las
+        filas existentes se actualizan y se devuelven todas; con `True` se dejan
+        intactas y solo se devuelven las filas insertadas. El resultado conserva
+        el orden de entrada; las entidades repetidas en el lote se envían una vez.
+
+        `overrides` da, para cada entidad, campos que se envían con otro valor sin
+        modificarla (p. ej. el `album_id` resuelto en el mismo lote).
+        """
+        return self._run(self._upsert_many_steps(entities, on_conflict, ignore_duplicates, overrides))
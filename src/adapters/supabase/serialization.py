@@ -0,0 +1,182 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+from uuid import UUID
+from pydantic import BaseModel
+from src.core.entities.records import EntityRecord
+
+# Columna que guarda el ID de Spotify en cada tabla (por defecto `spotify_id`)
+SPOTIFY_ID_COLUMNS: Dict[str, str] = {
+    'spotify_tracks': 'spotify_track_id',
+}
+
+# Columna con el usuario propietario de cada fila, en las tablas que son de un usuario
+# (migración 10). Los demás datos de Spotify (artistas, álbumes) se comparten
+OWNER_COLUMNS: Dict[str, str] = {
+    'spotify_tracks': 'owner',
+}
+
+# Campos de la entidad que se guardan con otro nombre de columna, por tabla
+COLUMN_RENAMES: Dict[str, Dict[str, str]] = {
+    'spotify_tracks': {'spotify_id': 'spotify_track_id'},
+}
+
+# Columnas que genera Supabase y se copian a la entidad tras escribirla
+GENERATED_COLUMNS = ('id', 'created_at', 'updated_at')
+
+Converter = Callable[[Any], Any]
+
+Persisted = TypeVar('Persisted', bound=Union[BaseModel, EntityRecord])
+
+def format_datetime(value: datetime) -> str:
+    """ISO 8601 con como máximo un decimal de segundo, el formato que se guarda en Supabase."""
+    formatted = value.isoformat(timespec='seconds')
+    if not value.microsecond:
+        return formatted
+    # 'YYYY-MM-DDTHH:MM:SS' ocupa 19 caracteres; lo que sigue es la zona horaria
+    return f"{formatted[:19]}.{value.microsecond // 100000}{formatted[19:]}"
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def _parse_uuid(value: Any) -> Optional[UUID]:
+    return UUID(value) if value else None
+
+def _base_type(annotation: Any) -> Any:
+    """Quita `Optional[...]` y `Annotated[...]` de una anotación."""
+    if get_origin(annotation) is Annotated:
+        return _base_type(get_args(annotation)[0])
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return _base_type(args[0])
+    return annotation
+
+def _is_nested(annotation: Any) -> bool:
+    """Los modelos anidados y las listas de modelos no son columnas de la tabla."""
+    base = _base_type(annotation)
+    if get_origin(base) in (list, List):
+        base = get_args(base)[0] if get_args(base) else None
+    return isinstance(base, type) and issubclass(base, BaseModel)
+
+def _encoder(annotation: Any) -> Optional[Converter]:
+    base = _base_type(annotation)
+    if base is datetime:
+        return format_datetime
+    if base is UUID:
+        return str
+    if getattr(base, '__name__', '') in ('HttpUrl', 'AnyUrl', 'Url'):
+        return str
+    return None
+
+def _decoder(annotation: Any) -> Optional[Converter]:
+    base = _base_type(annotation)
+    if base is datetime:
+        return _parse_datetime
+    if base is UUID:
+        return _parse_uuid
+    return None
+
+class EntityPlan:
+    """
+    Plan de conversión entre un modelo Pydantic y las filas de una tabla,
+    calculado una sola vez a partir de las anotaciones del modelo.
+
+    - `columns`: por cada campo guardado, (campo, columna, conversor a JSON o None).
+    - `nested_fields`: campos con modelos anidados que no existen en la tabla.
+    - `generated`: columnas que rellena Supabase, con su conversor desde JSON.
+    - `owner_column`: columna del usuario propietario de cada fila, o None si la tabla es compartida.
+    """
+
+    def __init__(self, model: Type[BaseModel], table_name: str):
+        self.model = model
+        self.table_name = table_name
+        self.spotify_id_column = SPOTIFY_ID_COLUMNS.get(table_name, 'spotify_id')
+        self.owner_column = OWNER_COLUMNS.get(table_name)
+        renames = COLUMN_RENAMES.get(table_name, {})
+        self.columns: List[Tuple[str, str, Optional[Converter]]] = []
+        self.nested_fields: Dict[str, Any] = {}
+        self.generated: List[Tuple[str, Converter]] = []
+        for name, field in model.model_fields.items():
+            if _is_nested(field.annotation):
+                # Lista vacía o None para poder construir la entidad a partir de una fila
+                self.nested_fields[name] = [] if get_origin(_base_type(field.annotation)) in (list, List) else None
+                continue
+            self.columns.append((name, renames.get(name, name), _encoder(field.annotation)))
+            if name in GENERATED_COLUMNS:
+                self.generated.append((name, _decoder(field.annotation) or (lambda value: value)))
+        self._field_by_column = {column: name for name, column, _ in self.columns}
+        self._column_by_field = {name: (column, convert) for name, column, convert in self.columns}
+
+    def encode(self, entity: Union[BaseModel, EntityRecord]) -> dict:
+        """Fila a enviar a Supabase: solo los campos asignados explícitamente en la entidad."""
+        if not isinstance(entity, BaseModel):
+            return self._encode_record(entity)
+        fields_set = entity.model_fields_set
+        values = entity.__dict__
+        row = {}
+        for name, column, convert in self.columns:
+            if name in fields_set:
+                value = values[name]
+                row[column] = convert(value) if convert is not None and value is not None else value
+        return row
+
+    def _encode_record(self, record: EntityRecord) -> dict:
+        """
+        Fila de un registro con `__slots__` (ver `src/core/entities/records.py`): todas las
+        columnas menos las generadas que aún no tienen valor, para que las filas de un lote
+        tengan las mismas claves.
+        """
+        row = {}
+        for name, column, convert in self.columns:
+            value = getattr(record, name)
+            if value is None:
+                if name not in GENERATED_COLUMNS:
+                    row[column] = None
+            else:
+                row[column] = convert(value) if convert is not None else value
+        return row
+
+    def encode_many(
+        self, entities: Iterable[Union[BaseModel, EntityRecord]], overrides: Optional[Callable[[Any], dict]] = None
+    ) -> List[dict]:
+        """
+        Filas de varias entidades. `overrides` da, para cada entidad, valores por nombre de
+        campo que se envían en lugar de los suyos, sin modificar la entidad.
+        """
+        encode = self.encode
+        if overrides is None:
+            return [encode(entity) for entity in entities]
+        return [self._override(encode(entity), overrides(entity)) for entity in entities]
+
+    def _override(self, row: dict, values: dict) -> dict:
+        for name, value in values.items():
+            column, convert = self._column_by_field[name]
+            row[column] = convert(value) if convert is not None and value is not None else value
+        return row
+
+    def decode(self, row: dict) -> BaseModel:
+        """
+        Construye la entidad a partir de una fila leída de Supabase. Los recursos
+        embebidos con el nombre del campo (p. ej. `album:spotify_albums(*)`) se
+        validan como modelos anidados; el resto de campos anidados quedan vacíos.
+        """
+        data = {self._field_by_column[column]: value for column, value in row.items() if column in self._field_by_column}
+        for name, empty in self.nested_fields.items():
+            data[name] = row.get(name, empty)
+        return self.model.model_validate(data)
+
+    def merge_generated(self, entity: Persisted, row: dict) -> Persisted:
+        """Copia de la entidad enviada con las columnas generadas por Supabase (id, fechas)."""
+        update = {name: decode(row[name]) for name, decode in self.generated if name in row}
+        if not isinstance(entity, BaseModel):
+            # Los registros se completan en el sitio: un artista o álbum internado recibe su UUID una sola vez
+            for name, value in update.items():
+                setattr(entity, name, value)
+            return entity
+        return entity.model_copy(update=update)
+
+@lru_cache(maxsize=None)
+def get_entity_plan(model: Type[BaseModel], table_name: str) -> EntityPlan:
+    """Retorna el plan de conversión de (modelo, tabla), construido la primera vez que se pide."""
+    return EntityPlan(model, table_name)
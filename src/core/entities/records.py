@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from uuid import UUID
+from src.core.entities.track import Album, Artist, SavedTrack
+
+# Las URLs de Spotify de artistas, álbumes y tracks se derivan de su ID
+SPOTIFY_OPEN_URL = "https://open.spotify.com"
+
+class ArtistRecord:
+    """
+    Registro ligero de un artista para el camino de sincronización (Spotify -> Supabase).
+
+    Los registros usan `__slots__`, no validan y no guardan la URL, que se deriva del ID:
+    ocupan una fracción de la entidad Pydantic equivalente. Tienen los mismos nombres de
+    atributo que las entidades, así que los repositorios y servicios de guardado los
+    aceptan igual; `to_entity` los convierte al llegar a la API.
+    """
+    __slots__ = ('id', 'spotify_id', 'name')
+
+    def __init__(self, spotify_id: str, name: str, id: Optional[UUID] = None):
+        self.id = id
+        self.spotify_id = spotify_id
+        self.name = name
+
+    @property
+    def spotify_url(self) -> str:
+        return f"{SPOTIFY_OPEN_URL}/artist/{self.spotify_id}"
+
+    def to_entity(self) -> Artist:
+        return Artist(id=self.id, spotify_id=self.spotify_id, name=self.name, spotify_url=self.spotify_url)
+
+class AlbumRecord:
+    """Registro ligero de un álbum; ver ArtistRecord."""
+    __slots__ = ('id', 'spotify_id', 'name', 'release_date', 'album_type', 'artists')
+
+    def __init__(
+        self,
+        spotify_id: str,
+        name: str,
+        release_date: str,
+        album_type: Optional[str] = None,
+        artists: Tuple[ArtistRecord, ...] = (),
+        id: Optional[UUID] = None,
+    ):
+        self.id = id
+        self.spotify_id = spotify_id
+        self.name = name
+        self.release_date = release_date
+        self.album_type = album_type
+        self.artists = artists
+
+    @property
+    def spotify_url(self) -> str:
+        return f"{SPOTIFY_OPEN_URL}/album/{self.spotify_id}"
+
+    def to_entity(self) -> Album:
+        return Album(
+            id=self.id,
+            spotify_id=self.spotify_id,
+            name=self.name,
+            release_date=self.release_date,
+            spotify_url=self.spotify_url,
+            album_type=self.album_type,
+            artists=[artist.to_entity() for artist in self.artists],
+        )
+
+class TrackRecord:
+    """Registro ligero de una canción guardada; ver ArtistRecord."""
+    __slots__ = (
+        'id', 'spotify_track_id', 'track_name', 'artists', 'album', 'album_id',
+        'added_at', 'created_at', 'updated_at',
+    )
+
+    def __init__(
+        self,
+        spotify_track_id: str,
+        track_name: str,
+        artists: Tuple[ArtistRecord, ...],
+        album: Optional[AlbumRecord],
+        added_at: datetime,
+    ):
+        self.id: Optional[UUID] = None
+        self.spotify_track_id = spotify_track_id
+        self.track_name = track_name
+        self.artists = artists
+        self.album = album
+        self.album_id: Optional[UUID] = None
+        self.added_at = added_at
+        self.created_at: Optional[datetime] = None
+        self.updated_at: Optional[datetime] = None
+
+    @property
+    def spotify_url(self) -> str:
+        return f"{SPOTIFY_OPEN_URL}/track/{self.spotify_track_id}"
+
+    def to_entity(self) -> SavedTrack:
+        return SavedTrack(
+            id=self.id,
+            spotify_track_id=self.spotify_track_id,
+            track_name=self.track_name,
+            artists=[artist.to_entity() for artist in self.artists],
+            album=self.album.to_entity() if self.album is not None else None,
+            album_id=self.album_id,
+            spotify_url=self.spotify_url,
+            added_at=self.added_at,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+# Registros que los repositorios de Supabase aceptan en lugar de su entidad
+EntityRecord = Union[ArtistRecord, AlbumRecord, TrackRecord]
+
+# Entidad o registro equivalente, para el código de guardado que acepta los dos
+AnyArtist = Union[Artist, ArtistRecord]
+AnyAlbum = Union[Album, AlbumRecord]
+AnyTrack = Union[SavedTrack, TrackRecord]
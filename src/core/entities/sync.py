@@ -0,0 +1,84 @@
+from enum import Enum
+from pydantic import BaseModel, Field, computed_field
+
+
+class SyncSummary(BaseModel):
+    """Contadores de una operación de guardado de tracks en Supabase."""
+    tracks_processed: int = 0
+    created_tracks: int = 0
+    skipped_tracks: int = 0
+    created_artists: int = 0
+    skipped_artists: int = 0
+    created_albums: int = 0
+    skipped_albums: int = 0
+    # Artistas y álbumes escritos con upsert, sin distinguir nuevos de existentes
+    upserted_artists: int = 0
+    upserted_albums: int = 0
+    # Tracks que no se pudieron guardar (el error queda en el log y el resto del lote sigue)
+    failed_tracks: int = 0
+    # Items de Spotify que no se pueden guardar (`"track": null`, o sin ID o nombre): se omiten
+    unavailable_tracks: int = 0
+    # Páginas de Spotify descargadas (200) y no modificadas (304), que no se vuelven a guardar
+    pages_downloaded: int = 0
+    pages_not_modified: int = 0
+
+    @computed_field
+    @property
+    def page_cache_hit_ratio(self) -> float:
+        """Fracción de páginas que Spotify respondió con 304 Not Modified."""
+        pages = self.pages_downloaded + self.pages_not_modified
+        return self.pages_not_modified / pages if pages else 0.0
+
+    def accumulate(self, other: "SyncSummary") -> None:
+        """Suma los contadores de otro resumen a este."""
+        for field in type(self).model_fields:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+
+class ImportSummary(BaseModel):
+    """Contadores de una importación desde los datos de cuenta de Spotify."""
+    records_read: int = 0
+    # Entradas sin URI de track (p. ej. archivos locales) y tracks repetidos en el archivo
+    invalid_records: int = 0
+    duplicate_records: int = 0
+    # IDs que Spotify ya no conoce al pedir los tracks completos
+    not_found: int = 0
+    batches: int = 0
+    spotify_requests: int = 0
+    summary: SyncSummary = Field(default_factory=SyncSummary)
+
+
+class ReconcileSummary(BaseModel):
+    """Resultado de reconciliar los tracks guardados en Supabase con la biblioteca de Spotify."""
+    spotify_tracks: int = 0
+    stored_tracks: int = 0
+    # Tracks guardados en Supabase que ya no están en la biblioteca de Spotify
+    stale_tracks: int = 0
+    deleted_tracks: int = 0
+    # Items de Spotify con `"track": null` (p. ej. retirados del catálogo): no tienen ID que comparar
+    unavailable_tracks: int = 0
+    dry_run: bool = False
+    # Memoria de los dos conjuntos de IDs empaquetados
+    id_set_bytes: int = 0
+
+
+class EnrichmentSummary(BaseModel):
+    """Resultado de completar artistas y tracks con los endpoints de varios IDs de Spotify."""
+    artists_enriched: int = 0
+    # Artistas y tracks consultados para los que Spotify no devolvió datos
+    artists_not_found: int = 0
+    tracks_enriched: int = 0
+    tracks_not_found: int = 0
+    artist_requests: int = 0
+    audio_feature_requests: int = 0
+    # False si Spotify denegó `/audio-features` a la aplicación (403)
+    audio_features_available: bool = True
+
+
+class SyncJobState(str, Enum):
+    """Estados de un trabajo de sincronización en segundo plano."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
@@ -19,14 +19,15 @@ class Album(BaseModel):
     id: Optional[UUID] = None
     spotify_id: str
     name: str
-    release_date: str
-    spotify_url: HttpUrl
+    # Nulables en `spotify_albums`: una fila sin ellos debe poder leerse
+    release_date: Optional[str] = None
+    spotify_url: Optional[HttpUrl] = None
     album_type: Optional[str] = None
     artists: List[Artist] = []
 
     @field_serializer('spotify_url')
-    def serialize_url(self, url: HttpUrl, _info):
-        return str(url)
+    def serialize_url(self, url: Optional[HttpUrl], _info):
+        return str(url) if url is not None else None
 
 class SavedTrack(BaseModel):
     """Entidad de dominio para una canción guardada."""
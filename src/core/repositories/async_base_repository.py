@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+T = TypeVar('T')
+
+class AsyncBaseRepository(Generic[T], ABC):
+    """
+    Versión asíncrona del contrato de BaseRepository.
+    Permite que los servicios esperen las operaciones de persistencia sin
+    bloquear el event loop y que las escrituras independientes se solapen.
+    """
+
+    @abstractmethod
+    async def create(self, entity: T) -> T:
+        """Crea una nueva entidad en la base de datos."""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, entity_id: UUID) -> Optional[T]:
+        """Obtiene una entidad por su ID."""
+        pass
+
+    @abstractmethod
+    async def get_by_spotify_id(self, spotify_id: str) -> Optional[T]:
+        """Obtiene una entidad por su ID de Spotify."""
+        pass
+
+    @abstractmethod
+    async def get_by_spotify_ids(self, spotify_ids: List[str]) -> List[T]:
+        """Obtiene las entidades existentes para varios IDs de Spotify en una sola operación."""
+        pass
+
+    @abstractmethod
+    async def get_ids_by_spotify_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        """Obtiene solo el UUID de las entidades existentes para varios IDs de Spotify."""
+        pass
+
+    @abstractmethod
+    async def get_all(self, limit: int = 100, offset: int = 0) -> List[T]:
+        """Obtiene una lista de todas las entidades."""
+        pass
+
+    @abstractmethod
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_column: str = 'created_at',
+        descending: bool = True,
+        select: str = "*",
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Obtiene una página ordenada por (`order_column`, `id`) a partir de un cursor opaco.
+        Devuelve las entidades y el cursor de la página siguiente, o None si es la última.
+        """
+        pass
+
+    @abstractmethod
+    async def get_latest(self, order_column: str) -> Optional[T]:
+        """Obtiene la entidad con el mayor valor en `order_column`."""
+        pass
+
+    @abstractmethod
+    async def update(self, entity_id: UUID, updated_data: dict) -> Optional[T]:
+        """Actualiza una entidad existente."""
+        pass
+
+    @abstractmethod
+    async def delete(self, entity_id: UUID) -> bool:
+        """Elimina una entidad por su ID."""
+        pass
+
+    @abstractmethod
+    async def delete_by_spotify_ids(self, spotify_ids: List[str]) -> int:
+        """Elimina las entidades con esos IDs de Spotify y devuelve cuántas se eliminaron."""
+        pass
+
+    @abstractmethod
+    async def create_many(self, entities: List[T]) -> List[T]:
+        """Crea múltiples entidades en la base de datos."""
+        pass
+
+    @abstractmethod
+    async def upsert_many(
+        self,
+        entities: List[T],
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+    ) -> List[T]:
+        """
+        Inserta o actualiza múltiples entidades según una columna única.
+        Con `ignore_duplicates` las existentes no se modifican ni se devuelven.
+        """
+        pass
@@ -1,6 +1,6 @@
 # src/core/repositories/base_repository.py
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, List, Optional, Any
+from typing import Generic, TypeVar, Dict, List, Optional, Any, Tuple
 from uuid import UUID
 
 # T es un marcador de tipo genérico para nuestras entidades (e.g., SavedTrack, Artist)
@@ -27,11 +27,41 @@ class BaseRepository(Generic[T], ABC):
         """Obtiene una entidad por su ID de Spotify."""
         pass
 
+    @abstractmethod
+    def get_by_spotify_ids(self, spotify_ids: List[str]) -> List[T]:
+        """Obtiene las entidades existentes para varios IDs de Spotify en una sola operación."""
+        pass
+
+    @abstractmethod
+    def get_ids_by_spotify_ids(self, spotify_ids: List[str]) -> Dict[str, UUID]:
+        """Obtiene solo el UUID de las entidades existentes para varios IDs de Spotify."""
+        pass
+
     @abstractmethod
     def get_all(self, limit: int = 100, offset: int = 0) -> List[T]:
         """Obtiene una lista de todas las entidades."""
         pass
 
+    @abstractmethod
+    def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order_column: str = 'created_at',
+        descending: bool = True,
+        select: str = "*",
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Obtiene una página ordenada por (`order_column`, `id`) a partir de un cursor opaco.
+        Devuelve las entidades y el cursor de la página siguiente, o None si es la última.
+        """
+        pass
+
+    @abstractmethod
+    def get_latest(self, order_column: str) -> Optional[T]:
+        """Obtiene la entidad con el mayor valor en `order_column`."""
+        pass
+
     @abstractmethod
     def update(self, entity_id: UUID, updated_data: dict) -> Optional[T]:
         """Actualiza una entidad existente."""
@@ -42,7 +72,25 @@ class BaseRepository(Generic[T], ABC):
         """Elimina una entidad por su ID."""
         pass
 
+    @abstractmethod
+    def delete_by_spotify_ids(self, spotify_ids: List[str]) -> int:
+        """Elimina las entidades con esos IDs de Spotify y devuelve cuántas se eliminaron."""
+        pass
+
     @abstractmethod
     def create_many(self, entities: List[T]) -> List[T]:
         """Crea múltiples entidades en la base de datos."""
         pass
+
+    @abstractmethod
+    def upsert_many(
+        self,
+        entities: List[T],
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+    ) -> List[T]:
+        """
+        Inserta o actualiza múltiples entidades según una columna única.
+        Con `ignore_duplicates` las existentes no se modifican ni se devuelven.
+        """
+        pass
@@ -1,5 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
+
+# Clave que marca una página devuelta desde caché porque Spotify respondió 304 Not Modified:
+# su contenido es el mismo que la última vez que se descargó.
+PAGE_NOT_MODIFIED = "not_modified"
+
+# Clave con el ETag de una página recién descargada; la página pasa a la caché con
+# `remember_saved_tracks_page` solo después de guardarse.
+PAGE_ETAG = "etag"
 
 class SpotifyRepository(ABC):
     """
@@ -10,3 +18,44 @@ class SpotifyRepository(ABC):
     async def get_saved_tracks(self, offset: int, limit: int, token: str) -> List[dict]:
         """Obtiene las canciones guardadas del usuario."""
         pass
+
+    @abstractmethod
+    async def get_saved_tracks_page(self, offset: int, limit: int, token: str) -> dict:
+        """
+        Obtiene una página de canciones guardadas con sus metadatos de paginación
+        (`items`, `total`, `offset`, `limit`). Si la página no cambió desde la
+        última vez que se guardó, puede devolverse la copia en caché con `PAGE_NOT_MODIFIED`.
+        """
+        pass
+
+    @abstractmethod
+    async def get_tracks(self, track_ids: List[str], token: str) -> List[Optional[dict]]:
+        """
+        Obtiene los objetos de track completos para varios IDs, en su mismo orden
+        (None para los IDs desconocidos).
+        """
+        pass
+
+    @abstractmethod
+    async def get_artists(self, artist_ids: List[str], token: str) -> List[Optional[dict]]:
+        """
+        Obtiene los objetos de artista completos (géneros, popularidad, seguidores, imágenes)
+        para varios IDs, en su mismo orden (None para los IDs desconocidos).
+        """
+        pass
+
+    @abstractmethod
+    async def get_audio_features(self, track_ids: List[str], token: str) -> List[Optional[dict]]:
+        """
+        Obtiene las audio features de varios tracks, en el mismo orden que los IDs
+        (None para los tracks sin análisis).
+        """
+        pass
+
+    def remember_saved_tracks_page(self, offset: int, limit: int, page: dict) -> None:
+        """
+        Guarda en caché una página descargada (con su `PAGE_ETAG`) después de guardar
+        todos sus tracks, para pedirla la próxima vez con `If-None-Match`. Una página
+        leída pero no guardada no debe pasar por aquí: tras un 304 se daría por guardada.
+        Sin caché no hace nada.
+        """
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set
+from uuid import UUID
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.adapters.supabase.repository import measure_request
+from src.core.entities.records import AnyTrack
+from src.core.entities.sync import SyncSummary
+from src.core.entities.track import Artist, Album, SavedTrack
+from src.infrastructure import metrics
+from src.core.services.supabase_sync_service import (
+    album_id_override,
+    build_album_links,
+    build_track_links,
+    collect_batch_entities,
+    count_created_tracks,
+    failed_track_summary,
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncSupabaseSyncService:
+    """
+    Versión asíncrona de SupabaseSyncService.
+    Las escrituras no bloquean el event loop, y las que no dependen entre sí
+    (artistas y álbumes; relaciones album-artista y track-artista) se envían a la vez.
+    """
+
+    def __init__(
+        self,
+        artist_repo: AsyncSupabaseRepository[Artist],
+        album_repo: AsyncSupabaseRepository[Album],
+        track_repo: AsyncSupabaseRepository[SavedTrack],
+        client: AsyncClient,
+    ):
+        self.artist_repo = artist_repo
+        self.album_repo = album_repo
+        self.track_repo = track_repo
+        self.client = client
+
+    async def get_sync_watermark(self) -> Optional[datetime]:
+        """Devuelve el `added_at` más reciente guardado, o None si no hay tracks."""
+        latest = await self.track_repo.get_latest("added_at")
+        return latest.added_at if latest else None
+
+    async def save_saved_tracks_batch(self, tracks: Sequence[AnyTrack]) -> SyncSummary:
+        """
+        Versión asíncrona de SupabaseSyncService.save_saved_tracks_batch: si el lote
+        falla, se divide hasta aislar los tracks que fallan y el resto se guarda igual.
+        Acepta entidades o los registros ligeros de SpotifyRecordMapper.
+        """
+        return await self._save_splitting(tracks, set())
+
+    async def _save_splitting(self, tracks: Sequence[AnyTrack], created: Set[str]) -> SyncSummary:
+        try:
+            return await self._save_batch(tracks, created)
+        except Exception as e:
+            if len(tracks) == 1:
+                return failed_track_summary(tracks[0], e)
+            logger.warning(f"⚠️ Falló el guardado de un lote de {len(tracks)} tracks; se divide en dos: {e}")
+        middle = len(tracks) // 2
+        summary = await self._save_splitting(tracks[:middle], created)
+        summary.accumulate(await self._save_splitting(tracks[middle:], created))
+        return summary
+
+    async def _save_batch(self, tracks: Sequence[AnyTrack], created: Set[str]) -> SyncSummary:
+        """
+        Guarda un lote de tracks con las mismas escrituras que
+        SupabaseSyncService._save_batch, solapando las independientes.
+        """
+        summary = SyncSummary(tracks_processed=len(tracks))
+        if not tracks:
+            return summary
+        logger.info(f"Iniciando guardado asíncrono por lotes de {len(tracks)} tracks en Supabase")
+
+        artists, albums, unique_tracks = collect_batch_entities(tracks)
+
+        # Los artistas y álbumes ya conocidos por la caché de identidad no se escriben
+        artist_ids: Dict[str, UUID] = await self.artist_repo.get_cached_ids(list(artists))
+        album_ids: Dict[str, UUID] = await self.album_repo.get_cached_ids(list(albums))
+        summary.skipped_artists += len(artist_ids)
+        summary.skipped_albums += len(album_ids)
+        missing_artists = [a for sid, a in artists.items() if sid not in artist_ids]
+        missing_albums = [a for sid, a in albums.items() if sid not in album_ids]
+
+        # Artistas y álbumes no dependen entre sí: se escriben en paralelo
+        with metrics.SYNC_STAGE_SECONDS.time(stage="artists_albums"):
+            saved_artists, saved_albums = await asyncio.gather(
+                self.artist_repo.upsert_many(missing_artists),
+                self.album_repo.upsert_many(missing_albums),
+            )
+        for artist in saved_artists:
+            artist_ids[artist.spotify_id] = artist.id
+        for album in saved_albums:
+            album_ids[album.spotify_id] = album.id
+        summary.upserted_artists += len(missing_artists)
+        summary.upserted_albums += len(missing_albums)
+
+        with metrics.SYNC_STAGE_SECONDS.time(stage="tracks"):
+            created_tracks = await self.track_repo.upsert_many(
+                list(unique_tracks.values()), ignore_duplicates=True, overrides=album_id_override(album_ids),
+            )
+            track_ids = {track.spotify_track_id: track.id for track in created_tracks}
+            created.update(track_ids)
+            existing = [sid for sid in unique_tracks if sid not in track_ids]
+            if existing:
+                track_ids.update(await self.track_repo.get_ids_by_spotify_ids(existing))
+        count_created_tracks(summary, unique_tracks, created)
+
+        album_links = build_album_links(missing_albums, album_ids, artist_ids)
+        track_links = build_track_links(list(unique_tracks.values()), track_ids, artist_ids)
+        with metrics.SYNC_STAGE_SECONDS.time(stage="links"):
+            await asyncio.gather(
+                self._upsert_links("spotify_album_artists", "album_id,artist_id", album_links),
+                self._upsert_links("spotify_track_artists", "track_id,artist_id", track_links),
+            )
+
+        metrics.SYNC_TRACKS.inc(summary.created_tracks, result="created")
+        metrics.SYNC_TRACKS.inc(summary.skipped_tracks, result="skipped")
+        logger.info(
+            f"📊 Lote guardado: {summary.created_tracks} tracks creados, {summary.skipped_tracks} omitidos, "
+            f"{summary.upserted_artists} artistas y {summary.upserted_albums} álbumes escritos, "
+            f"{len(album_links)} relaciones album-artista y {len(track_links)} track-artista"
+        )
+        return summary
+
+    async def _upsert_links(self, table_name: str, on_conflict: str, rows: List[dict]) -> None:
+        """Escribe filas de una tabla de unión en una sola petición, ignorando duplicados."""
+        if not rows:
+            return
+        try:
+            with measure_request(table_name, "upsert"):
+                await self.client.table(table_name).upsert(
+                    rows,
+                    on_conflict=on_conflict,
+                    ignore_duplicates=True,
+                    returning=ReturnMethod.minimal,
+                ).execute()
+            # Con `returning=minimal` no hay filas en la respuesta: se cuentan las enviadas
+            metrics.SUPABASE_ROWS_WRITTEN.inc(len(rows), table=table_name, operation="upsert")
+        except Exception as e:
+            logger.error(f"Error escribiendo {len(rows)} relaciones en '{table_name}': {e}")
+            raise
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+from supabase import AsyncClient
+from src.adapters.spotify.scheduler import SpotifyAPIError
+from src.adapters.supabase.repository import measure_request
+from src.core.entities.sync import EnrichmentSummary
+from src.core.repositories.spotify_repository import SpotifyRepository
+from src.infrastructure import metrics
+
+logger = logging.getLogger(__name__)
+
+# IDs por petición a `GET /artists` y a `GET /audio-features`
+ARTIST_IDS_PER_REQUEST = 50
+AUDIO_FEATURE_IDS_PER_REQUEST = 100
+
+# Columnas de las filas pendientes: el id (orden de lectura) y la clave de Spotify
+PENDING_ARTISTS_SELECT = "id,spotify_id"
+PENDING_TRACKS_SELECT = "id,spotify_track_id"
+
+# Funciones SQL que actualizan cada bloque con un único `UPDATE ... FROM` (migración 09)
+ARTIST_ENRICHMENT_FUNCTION = "apply_artist_enrichment"
+AUDIO_FEATURES_FUNCTION = "apply_audio_features"
+
+# Claves de las audio features que no describen el audio (se derivan del ID del track)
+AUDIO_FEATURE_LINK_KEYS = ("id", "type", "uri", "track_href", "analysis_url")
+
+FetchMany = Callable[[List[str], str], Awaitable[List[Optional[dict]]]]
+
+class LibraryEnrichmentService:
+    """
+    Completa los artistas y tracks guardados en Supabase con datos que `/me/tracks` no trae:
+    géneros, popularidad, seguidores e imagen de cada artista y audio features de cada track.
+
+    Las filas pendientes (`enriched_at` / `audio_features_at` nulos) se leen de Supabase en
+    bloques de `chunk_size`, sus IDs se piden a Spotify en peticiones del máximo que acepta
+    cada endpoint (50 artistas, 100 tracks) en paralelo a través del planificador, y cada
+    bloque se escribe con una única llamada a una función SQL que solo actualiza las filas
+    existentes: las borradas mientras tanto (p. ej. por la reconciliación) no se vuelven a
+    insertar. Una biblioteca de 10 000 tracks se completa con
+    unas 100 peticiones de audio features más una por cada 50 artistas distintos.
+
+    Las filas consultadas quedan marcadas aunque Spotify no devuelva datos, así que una
+    segunda ejecución solo pide lo añadido desde la anterior.
+    """
+
+    def __init__(
+        self,
+        spotify_repo: SpotifyRepository,
+        client: AsyncClient,
+        chunk_size: int = 1000,
+    ):
+        self._spotify_repo = spotify_repo
+        self.client = client
+        self.chunk_size = max(AUDIO_FEATURE_IDS_PER_REQUEST, chunk_size)
+
+    async def run(self, token: str) -> EnrichmentSummary:
+        """Completa los artistas y los tracks pendientes; las dos tablas se recorren a la vez."""
+        summary = EnrichmentSummary()
+        started = time.perf_counter()
+        await asyncio.gather(self._enrich_artists(token, summary), self._enrich_tracks(token, summary))
+        logger.info(
+            f"🎨 Enriquecimiento completado en {time.perf_counter() - started:.2f}s: "
+            f"{summary.artists_enriched} artistas ({summary.artist_requests} peticiones), "
+            f"{summary.tracks_enriched} tracks con audio features ({summary.audio_feature_requests} peticiones), "
+            f"{summary.artists_not_found + summary.tracks_not_found} sin datos en Spotify"
+        )
+        return summary
+
+    async def _enrich_artists(self, token: str, summary: EnrichmentSummary) -> None:
+        async for rows in self._pending("spotify_artists", PENDING_ARTISTS_SELECT, "enriched_at"):
+            artists = await self._fetch(
+                self._spotify_repo.get_artists, [row["spotify_id"] for row in rows], ARTIST_IDS_PER_REQUEST, token
+            )
+            summary.artist_requests += math.ceil(len(rows) / ARTIST_IDS_PER_REQUEST)
+            now = datetime.now(timezone.utc).isoformat()
+            updates = []
+            for row, artist in zip(rows, artists):
+                artist = artist or {}
+                images = artist.get("images") or []
+                updates.append({
+                    "spotify_id": row["spotify_id"],
+                    "genres": artist.get("genres"),
+                    "popularity": artist.get("popularity"),
+                    "followers": (artist.get("followers") or {}).get("total"),
+                    "image_url": images[0].get("url") if images else None,
+                    "enriched_at": now,
+                })
+            found = sum(1 for artist in artists if artist)
+            await self._update("spotify_artists", ARTIST_ENRICHMENT_FUNCTION, updates)
+            self._count(summary, "artists", found, len(rows) - found)
+
+    async def _enrich_tracks(self, token: str, summary: EnrichmentSummary) -> None:
+        async for rows in self._pending("spotify_tracks", PENDING_TRACKS_SELECT, "audio_features_at"):
+            try:
+                features = await self._fetch(
+                    self._spotify_repo.get_audio_features,
+                    [row["spotify_track_id"] for row in rows],
+                    AUDIO_FEATURE_IDS_PER_REQUEST,
+                    token,
+                )
+            except SpotifyAPIError as e:
+                if e.status_code != 403:
+                    raise
+                # Spotify no da acceso a `/audio-features` a las aplicaciones nuevas: se deja
+                # de intentar en esta ejecución y las filas siguen pendientes
+                logger.warning(f"⚠️ Spotify deniega /audio-features a esta aplicación; se omiten: {e}")
+                summary.audio_features_available = False
+                return
+            summary.audio_feature_requests += math.ceil(len(rows) / AUDIO_FEATURE_IDS_PER_REQUEST)
+            now = datetime.now(timezone.utc).isoformat()
+            updates = [
+                {
+                    "spotify_track_id": row["spotify_track_id"],
+                    "audio_features": (
+                        {key: value for key, value in feature.items() if key not in AUDIO_FEATURE_LINK_KEYS}
+                        if feature else None
+                    ),
+                    "audio_features_at": now,
+                }
+                for row, feature in zip(rows, features)
+            ]
+            found = sum(1 for feature in features if feature)
+            await self._update("spotify_tracks", AUDIO_FEATURES_FUNCTION, updates)
+            self._count(summary, "tracks", found, len(rows) - found)
+
+    @staticmethod
+    def _count(summary: EnrichmentSummary, kind: str, found: int, not_found: int) -> None:
+        setattr(summary, f"{kind}_enriched", getattr(summary, f"{kind}_enriched") + found)
+        setattr(summary, f"{kind}_not_found", getattr(summary, f"{kind}_not_found") + not_found)
+        table_name = f"spotify_{kind}"
+        metrics.ENRICHED_ROWS.inc(found, table=table_name, result="enriched")
+        metrics.ENRICHED_ROWS.inc(not_found, table=table_name, result="not_found")
+
+    async def _pending(self, table_name: str, select: str, marker: str) -> AsyncIterator[List[dict]]:
+        """
+        Bloques de filas con `marker` nulo, por orden de id. Cada bloque se marca antes de
+        pedir el siguiente, así que la consulta vuelve a empezar por las que quedan.
+        """
+        while True:
+            try:
+                with measure_request(table_name, "select"):
+                    response = await (
+                        self.client.table(table_name).select(select)
+                        .is_(marker, "null").order("id").limit(self.chunk_size).execute()
+                    )
+            except Exception as e:
+                logger.error(f"Error al leer las filas pendientes de enriquecer en '{table_name}': {e}")
+                raise
+            rows = response.data
+            if rows:
+                yield rows
+            if len(rows) < self.chunk_size:
+                return
+
+    async def _fetch(self, fetch_many: FetchMany, ids: List[str], per_request: int, token: str) -> List[Optional[dict]]:
+        """Pide `ids` en bloques de `per_request` a la vez; el resultado sigue el orden de `ids`."""
+        chunks = [ids[i:i + per_request] for i in range(0, len(ids), per_request)]
+        responses = await asyncio.gather(*(fetch_many(chunk, token) for chunk in chunks))
+        results: List[Optional[dict]] = []
+        for chunk, response in zip(chunks, responses):
+            # Si Spotify devuelve menos elementos, los que faltan cuentan como no encontrados
+            results.extend(list(response[:len(chunk)]) + [None] * (len(chunk) - len(response)))
+        return results
+
+    async def _update(self, table_name: str, function: str, rows: List[dict]) -> None:
+        """Actualiza las filas de `rows` que siguen existiendo con la función SQL `function`."""
+        try:
+            with measure_request(table_name, "update"):
+                response = await self.client.rpc(function, {"rows": rows}).execute()
+            metrics.SUPABASE_ROWS_WRITTEN.inc(response.data or 0, table=table_name, operation="update")
+        except Exception as e:
+            logger.error(f"Error al guardar {len(rows)} filas enriquecidas en '{table_name}': {e}")
+            raise
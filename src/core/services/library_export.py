@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from enum import Enum
+from typing import AsyncIterator, Iterable
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.core.entities.track import SavedTrack
+
+logger = logging.getLogger(__name__)
+
+# Solo las columnas que se exportan, con el álbum y los artistas embebidos en la misma consulta
+EXPORT_SELECT = (
+    "id,spotify_track_id,track_name,spotify_url,added_at,"
+    "album:spotify_albums(spotify_id,name,release_date,album_type,spotify_url),"
+    "artists:spotify_artists(spotify_id,name,spotify_url)"
+)
+
+CSV_COLUMNS = (
+    "spotify_track_id", "track_name", "spotify_url", "added_at",
+    "album_spotify_id", "album_name", "album_release_date", "album_type",
+    "artist_spotify_ids", "artist_names",
+)
+
+# Separador de los artistas de un track dentro de una celda CSV
+CSV_LIST_SEPARATOR = "|"
+
+class ExportFormat(str, Enum):
+    """Formatos de exportación de la biblioteca."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+def _export_record(row: dict) -> dict:
+    """Track con su álbum y sus artistas, en el orden de campos de la exportación."""
+    return {
+        "spotify_track_id": row["spotify_track_id"],
+        "track_name": row["track_name"],
+        "spotify_url": row["spotify_url"],
+        "added_at": row["added_at"],
+        "album": row.get("album"),
+        "artists": row.get("artists") or [],
+    }
+
+def _ndjson_chunk(rows: Iterable[dict]) -> bytes:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    return "".join(dumps(_export_record(row)) + "\n" for row in rows).encode()
+
+def _csv_rows(rows: Iterable[dict]) -> Iterable[tuple]:
+    for row in rows:
+        album = row.get("album") or {}
+        artists = row.get("artists") or []
+        yield (
+            row["spotify_track_id"],
+            row["track_name"],
+            row["spotify_url"],
+            row["added_at"],
+            album.get("spotify_id"),
+            album.get("name"),
+            album.get("release_date"),
+            album.get("album_type"),
+            CSV_LIST_SEPARATOR.join(artist["spotify_id"] for artist in artists),
+            CSV_LIST_SEPARATOR.join(artist["name"] for artist in artists),
+        )
+
+def _csv_chunk(rows: Iterable[dict], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    writer.writerows(_csv_rows(rows))
+    return buffer.getvalue().encode()
+
+class LibraryExportService:
+    """
+    Exporta los tracks guardados con sus artistas y álbumes como NDJSON o CSV.
+
+    Las filas se leen de Supabase por bloques en orden de keyset y se codifican
+    directamente desde el JSON de PostgREST, sin construir ni validar entidades:
+    en memoria solo hay un bloque a la vez, sea cual sea el tamaño de la biblioteca.
+    """
+
+    def __init__(self, track_repo: AsyncSupabaseRepository[SavedTrack], chunk_size: int = 1000):
+        self.track_repo = track_repo
+        self.chunk_size = chunk_size
+
+    async def stream(self, export_format: ExportFormat, compress: bool = False) -> AsyncIterator[bytes]:
+        """Bloques de bytes de la exportación; con `compress`, un único stream gzip."""
+        encoded = self._encode(export_format)
+        if not compress:
+            async for chunk in encoded:
+                yield chunk
+            return
+        # wbits=31: formato gzip (cabecera y CRC), comprimido de forma incremental
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        async for chunk in encoded:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    async def _encode(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        exported = 0
+        if export_format is ExportFormat.CSV:
+            yield _csv_chunk([], header=True)
+        async for rows in self.track_repo.iter_rows(self.chunk_size, order_column="added_at", select=EXPORT_SELECT):
+            yield _ndjson_chunk(rows) if export_format is ExportFormat.NDJSON else _csv_chunk(rows)
+            exported += len(rows)
+        logger.info(f"📤 Exportación {export_format.value} completada: {exported} tracks")
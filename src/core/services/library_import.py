@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterable, List, Optional
+from src.adapters.spotify.mapper import SpotifyRecordMapper
+from src.adapters.spotify.privacy_export import track_id_from_uri
+from src.core.entities.sync import ImportSummary
+from src.core.entities.records import TrackRecord
+from src.core.repositories.spotify_repository import SpotifyRepository
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+
+logger = logging.getLogger(__name__)
+
+# IDs por petición a `GET /tracks`
+HYDRATE_CHUNK_SIZE = 50
+
+# `added_at` de los tracks importados cuando no se indica otro: el archivo no trae la
+# fecha de guardado y una anterior a cualquier guardado real no adelanta la marca de la
+# sincronización incremental (el `added_at` más reciente) por encima de los tracks
+# guardados entre la exportación y la importación
+IMPORTED_ADDED_AT = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+class LibraryImportService:
+    """
+    Importa a Supabase la lista `tracks` de `YourLibrary.json`.
+
+    El archivo solo trae nombres de artista, álbum y track más el URI del track, sin
+    IDs de artistas y álbumes, URLs ni fecha de guardado. Por eso cada lote de IDs se
+    completa con `GET /tracks?ids=` (50 por petición, en paralelo a través del
+    planificador) y se convierte con el mapper de siempre; `added_at` es la fecha
+    indicada para toda la importación, o IMPORTED_ADDED_AT si no se indica.
+
+    Los lotes de `batch_size` tracks se guardan con `save_saved_tracks_batch`, unas
+    pocas peticiones a Supabase por lote, y el guardado de un lote se solapa con la
+    lectura y descarga del siguiente. En memoria hay como mucho dos lotes más el
+    conjunto de IDs ya vistos.
+    """
+
+    def __init__(
+        self,
+        spotify_repo: SpotifyRepository,
+        supabase_sync_service: AsyncSupabaseSyncService,
+        batch_size: int = 1000,
+    ):
+        self._spotify_repo = spotify_repo
+        self._supabase_sync_service = supabase_sync_service
+        self.batch_size = max(HYDRATE_CHUNK_SIZE, batch_size)
+        self.result = ImportSummary()
+
+    async def run(
+        self, records: AsyncIterable[dict], token: str, added_at: Optional[datetime] = None
+    ) -> ImportSummary:
+        """Lee los registros, completa cada lote en Spotify y lo guarda en Supabase."""
+        mapper = SpotifyRecordMapper()
+        added_at_iso = (added_at or IMPORTED_ADDED_AT).isoformat()
+        seen = set()
+        batch: List[str] = []
+        saving: Optional[asyncio.Task] = None
+        started = time.perf_counter()
+
+        async def flush(track_ids: List[str]) -> None:
+            nonlocal saving
+            tracks = await self._hydrate(track_ids, token)
+            entities = mapper.saved_tracks({"added_at": added_at_iso, "track": track} for track in tracks)
+            if saving is not None:
+                await saving
+            saving = asyncio.create_task(self._save(entities))
+
+        try:
+            async for record in records:
+                self.result.records_read += 1
+                track_id = track_id_from_uri(record.get("uri")) if isinstance(record, dict) else None
+                if track_id is None:
+                    self.result.invalid_records += 1
+                    continue
+                if track_id in seen:
+                    self.result.duplicate_records += 1
+                    continue
+                seen.add(track_id)
+                batch.append(track_id)
+                if len(batch) >= self.batch_size:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+            if saving is not None:
+                await saving
+        except BaseException:
+            if saving is not None and not saving.done():
+                saving.cancel()
+            raise
+
+        elapsed = time.perf_counter() - started
+        processed = self.result.summary.tracks_processed
+        logger.info(
+            f"✅ Importación completada: {processed} tracks de {self.result.records_read} registros "
+            f"en {elapsed:.2f}s ({processed / elapsed if elapsed > 0 else 0:.0f} tracks/s), "
+            f"{self.result.spotify_requests} peticiones a Spotify, {self.result.not_found} no encontrados"
+        )
+        return self.result
+
+    async def _hydrate(self, track_ids: List[str], token: str) -> List[dict]:
+        """Objetos de track completos para el lote, pedidos en bloques de HYDRATE_CHUNK_SIZE a la vez."""
+        chunks = [track_ids[i:i + HYDRATE_CHUNK_SIZE] for i in range(0, len(track_ids), HYDRATE_CHUNK_SIZE)]
+        responses = await asyncio.gather(*(self._spotify_repo.get_tracks(chunk, token) for chunk in chunks))
+        self.result.spotify_requests += len(chunks)
+        tracks = [track for response in responses for track in response if track]
+        self.result.not_found += len(track_ids) - len(tracks)
+        return tracks
+
+    async def _save(self, entities: List[TrackRecord]) -> None:
+        batch_summary = await self._supabase_sync_service.save_saved_tracks_batch(entities)
+        self.result.summary.accumulate(batch_summary)
+        self.result.batches += 1
+        logger.info(
+            f"📦 Lote {self.result.batches} importado: {len(entities)} tracks "
+            f"({self.result.summary.tracks_processed} en total)"
+        )
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import List, Tuple
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.core.entities.sync import ReconcileSummary
+from src.core.entities.track import SavedTrack
+from src.core.services.sync_service import MAX_PAGE_SIZE, SyncService
+from src.infrastructure.id_set import PackedIdSet, PackedIdSetBuilder
+
+logger = logging.getLogger(__name__)
+
+# Columnas mínimas para recorrer spotify_tracks en orden de keyset
+STORED_IDS_SELECT = "id,spotify_track_id,added_at"
+
+class LibraryChangedError(RuntimeError):
+    """La biblioteca de Spotify cambió mientras se leía; borrar con esa lectura no es seguro."""
+
+class LibraryReconcileService:
+    """
+    Elimina de Supabase los tracks que el usuario ya no tiene guardados en Spotify.
+
+    Lee a la vez los IDs de toda la biblioteca de Spotify y la columna `spotify_track_id`
+    de las filas del usuario en `spotify_tracks` (el propietario de `track_repo`), los guarda en dos PackedIdSet (unos 22 bytes por ID) y borra la
+    diferencia en lotes. Los vínculos de `spotify_track_artists` se borran en cascada.
+
+    Si el `total` de Spotify cambia durante la lectura, los offsets se desplazan y podría
+    faltar algún track que sigue guardado, así que no se borra nada (LibraryChangedError).
+    """
+
+    def __init__(
+        self,
+        sync_service: SyncService,
+        track_repo: AsyncSupabaseRepository[SavedTrack],
+        chunk_size: int = 1000,
+    ):
+        self._sync_service = sync_service
+        self._track_repo = track_repo
+        self.chunk_size = chunk_size
+
+    async def run(
+        self,
+        token: str,
+        page_size: int = MAX_PAGE_SIZE,
+        concurrency: int = 4,
+        dry_run: bool = False,
+    ) -> ReconcileSummary:
+        (spotify_ids, unavailable), stored_ids = await asyncio.gather(
+            self._spotify_ids(token, page_size, concurrency),
+            self._stored_ids(),
+        )
+        summary = ReconcileSummary(
+            spotify_tracks=len(spotify_ids),
+            stored_tracks=len(stored_ids),
+            unavailable_tracks=unavailable,
+            dry_run=dry_run,
+            id_set_bytes=spotify_ids.nbytes + stored_ids.nbytes,
+        )
+
+        batch: List[str] = []
+        for spotify_id in stored_ids.difference(spotify_ids):
+            summary.stale_tracks += 1
+            if dry_run:
+                continue
+            batch.append(spotify_id)
+            if len(batch) >= self.chunk_size:
+                summary.deleted_tracks += await self._track_repo.delete_by_spotify_ids(batch)
+                batch = []
+        if batch:
+            summary.deleted_tracks += await self._track_repo.delete_by_spotify_ids(batch)
+
+        logger.info(
+            f"🧹 Reconciliación{' (simulada)' if dry_run else ''}: {summary.stale_tracks} tracks eliminados "
+            f"en Spotify de {summary.stored_tracks} guardados, {summary.deleted_tracks} borrados "
+            f"({summary.id_set_bytes / 2**20:.1f} MB en conjuntos de IDs)"
+        )
+        return summary
+
+    async def _spotify_ids(self, token: str, page_size: int, concurrency: int) -> Tuple[PackedIdSet, int]:
+        """IDs de la biblioteca de Spotify y número de items sin track (`"track": null`)."""
+        builder = PackedIdSetBuilder()
+        total = None
+        seen = 0
+        unavailable = 0
+        async for page in self._sync_service.iter_saved_track_pages(token, page_size, concurrency):
+            if total is None:
+                total = page.get("total", 0)
+            elif page.get("total", 0) != total:
+                raise LibraryChangedError(
+                    f"La biblioteca de Spotify cambió durante la lectura ({total} -> {page.get('total')} tracks)"
+                )
+            for item in page.get("items", []):
+                track = item.get("track")
+                if track is None:
+                    unavailable += 1
+                    continue
+                seen += 1
+                # Los archivos locales no tienen ID de Spotify y nunca se guardan
+                if track.get("id"):
+                    builder.add(track["id"])
+        # Los items sin track también cuentan en el `total` de Spotify
+        if total is not None and seen + unavailable != total:
+            raise LibraryChangedError(
+                f"Se leyeron {seen} tracks y {unavailable} items sin track de {total} de la biblioteca de Spotify"
+            )
+        if unavailable:
+            logger.warning(f"⚠️ {unavailable} items de la biblioteca de Spotify sin track: no se pueden comparar")
+        return builder.build(), unavailable
+
+    async def _stored_ids(self) -> PackedIdSet:
+        builder = PackedIdSetBuilder()
+        async for rows in self._track_repo.iter_rows(
+            self.chunk_size, order_column="added_at", select=STORED_IDS_SELECT
+        ):
+            builder.update(row["spotify_track_id"] for row in rows)
+        return builder.build()
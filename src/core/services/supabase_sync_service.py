@@ -1,11 +1,88 @@
 import logging
-from typing import List
-from src.adapters.supabase.repository import SupabaseRepository
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+from postgrest.types import ReturnMethod
+from src.adapters.supabase.repository import SupabaseRepository, measure_request
+from src.core.entities.records import AnyAlbum, AnyArtist, AnyTrack
+from src.core.entities.sync import SyncSummary
 from src.core.entities.track import Artist, Album, SavedTrack
 from src.adapters.supabase.client import get_supabase_client
+from src.infrastructure import metrics
 
 logger = logging.getLogger(__name__)
 
+def collect_batch_entities(
+    tracks: Sequence[AnyTrack],
+) -> Tuple[Dict[str, AnyArtist], Dict[str, AnyAlbum], Dict[str, AnyTrack]]:
+    """Artistas, álbumes y tracks distintos de un lote, indexados por ID de Spotify."""
+    artists: Dict[str, AnyArtist] = {}
+    albums: Dict[str, AnyAlbum] = {}
+    unique_tracks: Dict[str, AnyTrack] = {}
+    for track in tracks:
+        for artist in track.artists:
+            artists.setdefault(artist.spotify_id, artist)
+        if track.album:
+            albums.setdefault(track.album.spotify_id, track.album)
+            for artist in track.album.artists:
+                artists.setdefault(artist.spotify_id, artist)
+        unique_tracks.setdefault(track.spotify_track_id, track)
+    return artists, albums, unique_tracks
+
+def build_album_links(
+    albums: Sequence[AnyAlbum], album_ids: Dict[str, UUID], artist_ids: Dict[str, UUID]
+) -> List[dict]:
+    """Filas distintas de `spotify_album_artists` para los álbumes dados."""
+    links = {}
+    for album in albums:
+        for artist in album.artists:
+            key = (album_ids[album.spotify_id], artist_ids[artist.spotify_id])
+            links.setdefault(key, {
+                "album_id": str(key[0]),
+                "artist_id": str(key[1]),
+                "artist_name": artist.name,
+                "album_name": album.name,
+            })
+    return list(links.values())
+
+def build_track_links(
+    tracks: Sequence[AnyTrack], track_ids: Dict[str, UUID], artist_ids: Dict[str, UUID]
+) -> List[dict]:
+    """
+    Filas distintas de `spotify_track_artists` para los tracks dados, con el UUID de
+    cada uno en `track_ids` (tanto los recién creados como los que ya existían).
+    """
+    links = {}
+    for track in tracks:
+        for artist in track.artists:
+            key = (track_ids[track.spotify_track_id], artist_ids[artist.spotify_id])
+            links.setdefault(key, {
+                "track_id": str(key[0]),
+                "artist_id": str(key[1]),
+                "artist_name": artist.name,
+                "spotify_track_name": track.track_name,
+            })
+    return list(links.values())
+
+def album_id_override(album_ids: Dict[str, UUID]) -> Callable[[AnyTrack], dict]:
+    """`album_id` de cada track, resuelto en el lote, para enviarlo sin modificar el track."""
+    def override(track: AnyTrack) -> dict:
+        return {"album_id": album_ids.get(track.album.spotify_id)} if track.album else {}
+    return override
+
+def count_created_tracks(summary: SyncSummary, unique_tracks: Dict[str, AnyTrack], created: Set[str]) -> None:
+    """Cuenta como creados los tracks del lote insertados por el guardado en curso, y el resto como omitidos."""
+    created_count = sum(1 for spotify_id in unique_tracks if spotify_id in created)
+    summary.created_tracks += created_count
+    summary.skipped_tracks += len(unique_tracks) - created_count
+
+def failed_track_summary(track: AnyTrack, error: Exception) -> SyncSummary:
+    """Resumen de un track que no se pudo guardar, con el error en el log."""
+    logger.error(f"❌ Error guardando track '{track.track_name}' (ID: {track.spotify_track_id}): {error}")
+    logger.error(f"Detalles del error: {type(error).__name__}: {error}")
+    metrics.SYNC_TRACKS.inc(result="failed")
+    return SyncSummary(tracks_processed=1, failed_tracks=1)
+
 class SupabaseSyncService:
     """
     Servicio para sincronizar datos de Spotify a Supabase.
@@ -23,6 +100,11 @@ class SupabaseSyncService:
         self.track_repo = track_repo
         self.client = get_supabase_client()
 
+    def get_sync_watermark(self) -> Optional[datetime]:
+        """Devuelve el `added_at` más reciente guardado, o None si no hay tracks."""
+        latest = self.track_repo.get_latest("added_at")
+        return latest.added_at if latest else None
+
     def save_saved_tracks(self, tracks: List[SavedTrack]) -> List[SavedTrack]:
         """
         Guarda las tracks en Supabase, creando artistas y álbumes si no existen.
@@ -163,4 +245,111 @@ class SupabaseSyncService:
         logger.info(f"  • Álbumes creados: {created_albums}")
         logger.info(f"  • Total tracks guardados: {len(saved_tracks)}")
 
-        return saved_tracks
\ No newline at end of file
+        return saved_tracks
+
+    def save_saved_tracks_batch(self, tracks: List[SavedTrack]) -> SyncSummary:
+        """
+        Guarda un lote de tracks con un número fijo de round trips a Supabase (ver
+        `_save_batch`). Si el lote falla, se divide en dos mitades que se guardan por
+        separado, hasta aislar los tracks que fallan solos: esos se registran en el log
+        y se cuentan en `failed_tracks`, y el resto del lote se guarda igual.
+
+        Los reintentos son idempotentes: un intento que falla después de insertar los
+        tracks (p. ej. al escribir sus relaciones) no deja esos tracks sin relaciones,
+        y siguen contando como creados.
+        """
+        return self._save_splitting(tracks, set())
+
+    def _save_splitting(self, tracks: List[SavedTrack], created: Set[str]) -> SyncSummary:
+        # `created`: IDs de Spotify de los tracks insertados por este guardado, también
+        # los de intentos que fallaron después de insertarlos
+        try:
+            return self._save_batch(tracks, created)
+        except Exception as e:
+            if len(tracks) == 1:
+                return failed_track_summary(tracks[0], e)
+            logger.warning(f"⚠️ Falló el guardado de un lote de {len(tracks)} tracks; se divide en dos: {e}")
+        middle = len(tracks) // 2
+        summary = self._save_splitting(tracks[:middle], created)
+        summary.accumulate(self._save_splitting(tracks[middle:], created))
+        return summary
+
+    def _save_batch(self, tracks: List[SavedTrack], created: Set[str]) -> SyncSummary:
+        """
+        Guarda un lote de tracks con un número fijo de round trips a Supabase.
+
+        Reúne los artistas, álbumes y tracks distintos del lote y los escribe con
+        un `upsert_many` por tabla: artistas y álbumes se actualizan si ya existen
+        (así se obtienen todos sus UUID sin lecturas previas) y los tracks
+        existentes se ignoran; el UUID de estos se lee aparte para escribir las
+        relaciones de todos los tracks del lote. Los artistas y álbumes presentes
+        en la caché de identidad de los repositorios se omiten sin ningún round
+        trip. Las relaciones album-artista y track-artista se escriben con un
+        upsert masivo cada una, ignorando las que ya existen.
+        """
+        summary = SyncSummary(tracks_processed=len(tracks))
+        if not tracks:
+            return summary
+        logger.info(f"Iniciando guardado por lotes de {len(tracks)} tracks en Supabase")
+
+        artists, albums, unique_tracks = collect_batch_entities(tracks)
+
+        with metrics.SYNC_STAGE_SECONDS.time(stage="artists_albums"):
+            # Los artistas y álbumes ya conocidos por la caché de identidad no se escriben
+            artist_ids: Dict[str, UUID] = self.artist_repo.get_cached_ids(list(artists))
+            summary.skipped_artists += len(artist_ids)
+            missing_artists = [a for sid, a in artists.items() if sid not in artist_ids]
+            for artist in self.artist_repo.upsert_many(missing_artists):
+                artist_ids[artist.spotify_id] = artist.id
+            summary.upserted_artists += len(missing_artists)
+
+            album_ids: Dict[str, UUID] = self.album_repo.get_cached_ids(list(albums))
+            summary.skipped_albums += len(album_ids)
+            missing_albums = [a for sid, a in albums.items() if sid not in album_ids]
+            for album in self.album_repo.upsert_many(missing_albums):
+                album_ids[album.spotify_id] = album.id
+            summary.upserted_albums += len(missing_albums)
+
+        with metrics.SYNC_STAGE_SECONDS.time(stage="tracks"):
+            created_tracks = self.track_repo.upsert_many(
+                list(unique_tracks.values()), ignore_duplicates=True, overrides=album_id_override(album_ids),
+            )
+            track_ids = {track.spotify_track_id: track.id for track in created_tracks}
+            created.update(track_ids)
+            existing = [sid for sid in unique_tracks if sid not in track_ids]
+            if existing:
+                track_ids.update(self.track_repo.get_ids_by_spotify_ids(existing))
+            count_created_tracks(summary, unique_tracks, created)
+
+        with metrics.SYNC_STAGE_SECONDS.time(stage="links"):
+            album_links = build_album_links(missing_albums, album_ids, artist_ids)
+            self._upsert_links("spotify_album_artists", "album_id,artist_id", album_links)
+            track_links = build_track_links(list(unique_tracks.values()), track_ids, artist_ids)
+            self._upsert_links("spotify_track_artists", "track_id,artist_id", track_links)
+
+        metrics.SYNC_TRACKS.inc(summary.created_tracks, result="created")
+        metrics.SYNC_TRACKS.inc(summary.skipped_tracks, result="skipped")
+        logger.info(
+            f"📊 Lote guardado: {summary.created_tracks} tracks creados, {summary.skipped_tracks} omitidos, "
+            f"{summary.upserted_artists} artistas y {summary.upserted_albums} álbumes escritos, "
+            f"{len(album_links)} relaciones album-artista y {len(track_links)} track-artista"
+        )
+        return summary
+
+    def _upsert_links(self, table_name: str, on_conflict: str, rows: List[dict]) -> None:
+        """Escribe filas de una tabla de unión en una sola petición, ignorando duplicados."""
+        if not rows:
+            return
+        try:
+            with measure_request(table_name, "upsert"):
+                self.client.table(table_name).upsert(
+                    rows,
+                    on_conflict=on_conflict,
+                    ignore_duplicates=True,
+                    returning=ReturnMethod.minimal,
+                ).execute()
+            # Con `returning=minimal` no hay filas en la respuesta: se cuentan las enviadas
+            metrics.SUPABASE_ROWS_WRITTEN.inc(len(rows), table=table_name, operation="upsert")
+        except Exception as e:
+            logger.error(f"Error escribiendo {len(rows)} relaciones en '{table_name}': {e}")
+            raise
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+from uuid import uuid4
+from src.core.entities.sync import SyncJobState
+from src.core.services.sync_pipeline import SyncPipeline
+from src.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class SyncJobLimitError(Exception):
+    """Se alcanzó el número máximo de trabajos pendientes o en curso."""
+
+class SyncJob:
+    """Sincronización de la biblioteca completa ejecutándose en segundo plano."""
+
+    def __init__(self, pipeline: SyncPipeline, user: str):
+        self.id = str(uuid4())
+        self.pipeline = pipeline
+        self.user = user
+        self.state = SyncJobState.PENDING
+        self.created_at = datetime.now(timezone.utc)
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        # El gestor activa `_turn` cuando el trabajo obtiene un hueco de ejecución
+        self._turn = asyncio.Event()
+        self._granted = False
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (SyncJobState.PENDING, SyncJobState.RUNNING)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    def status(self) -> dict:
+        """Progreso actual del trabajo, leído de los contadores del pipeline."""
+        elapsed = self.elapsed_seconds
+        summary = self.pipeline.summary
+        return {
+            "id": self.id,
+            "user": self.user,
+            "state": self.state,
+            "created_at": self.created_at,
+            "total": self.pipeline.total,
+            "pages": self.pipeline.pages,
+            "elapsed_seconds": elapsed,
+            "tracks_per_second": summary.tracks_processed / elapsed if elapsed > 0 else 0.0,
+            "summary": summary,
+            "enrichment": self.pipeline.enrichment,
+            "error": self.error,
+        }
+
+class SyncJobManager:
+    """
+    Ejecuta sincronizaciones como tareas de asyncio independientes de la petición HTTP.
+
+    Como máximo `max_running` trabajos se ejecutan a la vez, y `max_running_per_user` de un
+    mismo usuario; el resto espera en estado `pending`. Los huecos libres se reparten por
+    turnos entre los usuarios con trabajos pendientes, así que quien encola muchos no deja
+    sin turno a los demás. Se rechazan trabajos nuevos cuando ya hay `max_active`
+    pendientes o en curso. Se conservan los últimos `history_size` trabajos terminados
+    para poder consultarlos.
+    """
+
+    def __init__(self, max_running: int, max_active: int, history_size: int, max_running_per_user: int = 1):
+        self.max_running = max(1, max_running)
+        self.max_active = max(self.max_running, max_active)
+        self.max_running_per_user = max(1, min(self.max_running, max_running_per_user))
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        # Trabajos pendientes por usuario y número del último turno de cada usuario
+        self._pending: Dict[str, Deque[SyncJob]] = {}
+        self._last_turn: Dict[str, int] = {}
+        self._turns = 0
+        self._running = 0
+        self._running_by_user: Counter = Counter()
+
+    def start(self, pipeline: SyncPipeline, token: str, page_size: int, user: str = "me") -> SyncJob:
+        """Registra el trabajo y lo lanza en segundo plano. Lanza SyncJobLimitError si no hay hueco."""
+        active = sum(1 for job in self._jobs.values() if job.is_active)
+        if active >= self.max_active:
+            raise SyncJobLimitError(f"Ya hay {active} sincronizaciones pendientes o en curso")
+        job = SyncJob(pipeline, user)
+        self._jobs[job.id] = job
+        self._pending.setdefault(user, deque()).append(job)
+        job.task = asyncio.create_task(self._run(job, token, page_size), name=f"sync-job-{job.id}")
+        self._dispatch()
+        self._prune()
+        logger.info(f"🗂️ Trabajo de sincronización {job.id} de '{user}' creado ({active + 1} activos)")
+        return job
+
+    def _dispatch(self) -> None:
+        """Da hueco a los trabajos pendientes mientras queden huecos libres."""
+        while self._running < self.max_running:
+            job = self._next_pending()
+            if job is None:
+                return
+            job._granted = True
+            self._running += 1
+            self._running_by_user[job.user] += 1
+            job._turn.set()
+
+    def _next_pending(self) -> Optional[SyncJob]:
+        eligible = [user for user in self._pending if self._running_by_user[user] < self.max_running_per_user]
+        if not eligible:
+            return None
+        # El usuario que lleva más turnos sin ejecutar; quien aún no ha tenido ninguno va primero
+        user = min(eligible, key=lambda user: self._last_turn.get(user, 0))
+        self._turns += 1
+        self._last_turn[user] = self._turns
+        queue = self._pending[user]
+        job = queue.popleft()
+        if not queue:
+            del self._pending[user]
+        return job
+
+    def _release(self, job: SyncJob) -> None:
+        self._running -= 1
+        self._running_by_user[job.user] -= 1
+        if self._running_by_user[job.user] <= 0:
+            del self._running_by_user[job.user]
+        self._forget_idle(job.user)
+        self._dispatch()
+
+    def _withdraw(self, job: SyncJob) -> None:
+        # Trabajo cancelado antes de obtener hueco
+        queue = self._pending.get(job.user)
+        if queue is None or job not in queue:
+            return
+        queue.remove(job)
+        if not queue:
+            del self._pending[job.user]
+        self._forget_idle(job.user)
+
+    def _forget_idle(self, user: str) -> None:
+        if user not in self._pending and user not in self._running_by_user:
+            self._last_turn.pop(user, None)
+
+    async def _run(self, job: SyncJob, token: str, page_size: int) -> None:
+        try:
+            await job._turn.wait()
+            job.state = SyncJobState.RUNNING
+            job._started = time.perf_counter()
+            await job.pipeline.run(token, page_size)
+            job.state = SyncJobState.COMPLETED
+            logger.info(f"✅ Trabajo {job.id} completado: {job.pipeline.summary.tracks_processed} tracks")
+        except asyncio.CancelledError:
+            job.state = SyncJobState.CANCELLED
+            logger.info(f"⏹️ Trabajo {job.id} cancelado tras {job.pipeline.pages} páginas")
+        except Exception as e:
+            job.state = SyncJobState.FAILED
+            job.error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Trabajo {job.id} fallido: {job.error}")
+        finally:
+            if job._started is not None:
+                job._finished = time.perf_counter()
+            if job._granted:
+                self._release(job)
+            else:
+                self._withdraw(job)
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        return self._jobs.get(job_id)
+
+    def list(self, user: Optional[str] = None) -> List[SyncJob]:
+        """Trabajos registrados, del más reciente al más antiguo; solo los de `user` si se indica."""
+        return [job for job in reversed(self._jobs.values()) if user is None or job.user == user]
+
+    def cancel(self, job_id: str) -> Optional[SyncJob]:
+        """Solicita la cancelación del trabajo; las páginas ya guardadas se conservan."""
+        job = self._jobs.get(job_id)
+        if job is not None and job.is_active and job.task is not None:
+            job.task.cancel()
+            if not job._granted:
+                # La tarea puede no haber empezado aún: se retira de la cola aquí
+                self._withdraw(job)
+                job.state = SyncJobState.CANCELLED
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancela los trabajos activos y espera a que terminen. Se llama al apagar la aplicación."""
+        tasks = [job.task for job in self._jobs.values() if job.is_active and job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if not job.is_active]
+        for job_id in finished[:max(0, len(finished) - self.history_size)]:
+            del self._jobs[job_id]
+
+_manager: Optional[SyncJobManager] = None
+
+def get_sync_job_manager() -> SyncJobManager:
+    """Retorna el gestor único de trabajos de sincronización del proceso."""
+    global _manager
+    if _manager is None:
+        _manager = SyncJobManager(
+            max_running=settings.SYNC_MAX_RUNNING_JOBS,
+            max_active=settings.SYNC_MAX_ACTIVE_JOBS,
+            history_size=settings.SYNC_JOB_HISTORY,
+            max_running_per_user=settings.SYNC_MAX_RUNNING_JOBS_PER_USER,
+        )
+    return _manager
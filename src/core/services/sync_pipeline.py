@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from typing import Callable, List, Optional
+from src.adapters.spotify.mapper import UnavailableTrackError
+from src.core.entities.sync import EnrichmentSummary, SyncSummary
+from src.core.entities.records import TrackRecord
+from src.core.repositories.spotify_repository import PAGE_NOT_MODIFIED
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+from src.core.services.library_enrichment import LibraryEnrichmentService
+from src.core.services.sync_service import MAX_PAGE_SIZE, SyncService
+from src.infrastructure import metrics
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin de stream que cada etapa envía a los workers de la siguiente
+_END = object()
+
+class SyncPipeline:
+    """
+    Sincronización de la biblioteca completa en tres etapas encadenadas:
+
+    1. Descarga de páginas de Spotify (`SyncService`), con `fetch_concurrency` peticiones en vuelo.
+    2. Conversión de los items JSON a registros ligeros con `map_item`, en `map_concurrency` workers.
+    3. Guardado de cada lote en Supabase, en `persist_concurrency` workers.
+
+    Las etapas se comunican por colas acotadas a `queue_size` elementos: si una etapa
+    se retrasa, las anteriores se bloquean al llenar su cola en lugar de acumular páginas.
+    La memoria queda acotada por el tamaño de las colas y no por el de la biblioteca,
+    y el ritmo total lo marca la etapa más lenta.
+
+    Los items que no se pueden guardar (`"track": null`, o sin ID o nombre) se omiten y
+    se cuentan en `unavailable_tracks`, sin interrumpir la sincronización.
+
+    Las páginas que Spotify responde con 304 Not Modified ya se guardaron en una
+    sincronización anterior: se cuentan y no pasan por la conversión ni el guardado.
+    Una página descargada solo entra en la caché de ETag cuando todos sus tracks se
+    guardaron; si la sincronización falla o se interrumpe antes, se vuelve a descargar.
+
+    Con `enrichment_service`, al terminar el guardado se completan los artistas y tracks
+    pendientes con los endpoints de varios IDs de Spotify; su resultado queda en `enrichment`.
+
+    Los contadores (`pages`, `total`, `summary`) se actualizan a medida que avanzan
+    las etapas, así que pueden consultarse mientras `run` está en curso.
+    """
+
+    def __init__(
+        self,
+        sync_service: SyncService,
+        supabase_sync_service: AsyncSupabaseSyncService,
+        map_item: Callable[[dict], TrackRecord],
+        fetch_concurrency: int = 4,
+        map_concurrency: int = 1,
+        persist_concurrency: int = 2,
+        queue_size: int = 4,
+        enrichment_service: Optional[LibraryEnrichmentService] = None,
+    ):
+        self._sync_service = sync_service
+        self._supabase_sync_service = supabase_sync_service
+        self._map_item = map_item
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.map_concurrency = max(1, map_concurrency)
+        self.persist_concurrency = max(1, persist_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.pages = 0
+        self.total = 0
+        self.summary = SyncSummary()
+        self._enrichment_service = enrichment_service
+        self.enrichment: Optional[EnrichmentSummary] = None
+
+    async def run(self, token: str, page_size: int = MAX_PAGE_SIZE) -> SyncSummary:
+        """Ejecuta las tres etapas hasta agotar la biblioteca y devuelve los contadores acumulados."""
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        active_mappers = self.map_concurrency
+
+        async def fetch() -> None:
+            async for page in self._sync_service.iter_saved_track_pages(token, page_size, self.fetch_concurrency):
+                self.total = page.get("total", self.total)
+                await pages.put(page)
+            for _ in range(self.map_concurrency):
+                await pages.put(_END)
+
+        async def map_worker() -> None:
+            nonlocal active_mappers
+            while (page := await pages.get()) is not _END:
+                offset = page.get("offset", 0)
+                if page.get(PAGE_NOT_MODIFIED):
+                    self.summary.pages_not_modified += 1
+                    self.pages += 1
+                    continue
+                self.summary.pages_downloaded += 1
+                with metrics.SYNC_STAGE_SECONDS.time(stage="map"):
+                    batch = self._map_page(page)
+                await batches.put((offset, page, batch))
+            # El último worker en terminar cierra la etapa de guardado
+            active_mappers -= 1
+            if active_mappers == 0:
+                for _ in range(self.persist_concurrency):
+                    await batches.put(_END)
+
+        async def persist_worker() -> None:
+            while (entry := await batches.get()) is not _END:
+                offset, page, batch = entry
+                # Con tracks fallidos la página no cuenta como guardada: se vuelve a pedir la próxima vez
+                if not (await self._persist(batch)).failed_tracks:
+                    self._sync_service.remember_saved_tracks_page(offset, page_size, page)
+
+        logger.info(
+            f"🔁 Pipeline de sincronización: fetch={self.fetch_concurrency}, map={self.map_concurrency}, "
+            f"persist={self.persist_concurrency}, cola={self.queue_size}"
+        )
+        # Si una etapa falla, TaskGroup cancela las demás
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(fetch())
+                for _ in range(self.map_concurrency):
+                    group.create_task(map_worker())
+                for _ in range(self.persist_concurrency):
+                    group.create_task(persist_worker())
+        except ExceptionGroup as errors:
+            # Se propaga el primer error tal cual para que lo traten los manejadores de la app;
+            # los demás solo quedan en el log
+            for index, error in enumerate(errors.exceptions, 1):
+                logger.error(
+                    f"❌ Etapa del pipeline fallida ({index}/{len(errors.exceptions)}): "
+                    f"{type(error).__name__}: {error}",
+                    exc_info=error,
+                )
+            raise errors.exceptions[0]
+        if self._enrichment_service is not None:
+            # Después de guardar todos los lotes: así los IDs de toda la biblioteca
+            # se agrupan en peticiones completas a Spotify
+            with metrics.SYNC_STAGE_SECONDS.time(stage="enrich"):
+                self.enrichment = await self._enrichment_service.run(token)
+        return self.summary
+
+    def _map_page(self, page: dict) -> List[TrackRecord]:
+        """Registros de los items de la página, omitiendo y contando los que no se pueden guardar."""
+        batch = []
+        for item in page.get("items", []):
+            try:
+                batch.append(self._map_item(item))
+            except UnavailableTrackError as e:
+                self.summary.unavailable_tracks += 1
+                logger.warning(f"⚠️ Item de Spotify omitido (offset {page.get('offset', 0)}): {e}")
+        return batch
+
+    async def _persist(self, batch: List[TrackRecord]) -> SyncSummary:
+        with metrics.SYNC_STAGE_SECONDS.time(stage="persist"):
+            batch_summary = await self._supabase_sync_service.save_saved_tracks_batch(batch)
+        self.summary.accumulate(batch_summary)
+        self.pages += 1
+        logger.info(f"📄 Lote {self.pages} guardado: {len(batch)} tracks ({self.summary.tracks_processed}/{self.total})")
+        return batch_summary
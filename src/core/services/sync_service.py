@@ -1,5 +1,27 @@
-from typing import List
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 from src.core.repositories.spotify_repository import SpotifyRepository
+from src.infrastructure import metrics
+from src.infrastructure.single_flight import SingleFlight
+
+# Tamaño máximo de página que acepta `/me/tracks`
+MAX_PAGE_SIZE = 50
+
+# Sincronizaciones de una página en curso por (usuario, offset, limit): las llamadas
+# simultáneas a `/sync` con la misma página comparten una descarga y un guardado
+sync_page_flights: SingleFlight[Tuple[str, int, int], list] = SingleFlight("sync_page")
+
+metrics.registry.callback(
+    "single_flight_in_flight",
+    "Operaciones agrupadas en curso, por operación.",
+    lambda: [({"operation": sync_page_flights.operation}, len(sync_page_flights))],
+)
+
+def get_sync_page_flights() -> SingleFlight[Tuple[str, int, int], list]:
+    """Retorna las sincronizaciones de página en curso del proceso."""
+    return sync_page_flights
 
 class SyncService:
     """
@@ -11,3 +33,85 @@ class SyncService:
     async def get_saved_tracks(self, offset: int, limit: int, token: str) -> List[dict]:
         """Obtiene las canciones guardadas de Spotify."""
         return await self._spotify_repo.get_saved_tracks(offset, limit, token)
+
+    async def get_saved_tracks_page(self, offset: int, limit: int, token: str) -> dict:
+        """Obtiene una página de canciones guardadas con sus metadatos (`items`, `total`)."""
+        return await self._spotify_repo.get_saved_tracks_page(offset, limit, token)
+
+    def remember_saved_tracks_page(self, offset: int, limit: int, page: dict) -> None:
+        """Guarda en caché, con su ETag, una página cuyos tracks se guardaron todos."""
+        self._spotify_repo.remember_saved_tracks_page(offset, limit, page)
+
+    async def iter_saved_tracks_since(
+        self,
+        token: str,
+        watermark: Optional[datetime],
+        page_size: int = MAX_PAGE_SIZE,
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Recorre las canciones guardadas después de `watermark`, una página a la vez.
+
+        Spotify devuelve las canciones de la más reciente a la más antigua, así que
+        se pagina desde el offset 0 y se para en el primer item anterior a la marca.
+        Los items con la misma fecha que la marca se incluyen, porque `added_at` solo
+        tiene precisión de segundos y podrían no estar guardados todavía.
+        Sin marca se recorre toda la biblioteca; como cada página se entrega antes de
+        pedir la siguiente, la memoria no crece con su tamaño. Las páginas no pasan a la
+        caché de ETag: solo se entregan sus items nuevos.
+        """
+        offset = 0
+        while True:
+            page = await self._spotify_repo.get_saved_tracks_page(offset, page_size, token)
+            items = page.get("items", [])
+            new_items: List[dict] = []
+            for item in items:
+                added_at = datetime.fromisoformat(item["added_at"].replace("Z", "+00:00"))
+                if watermark is not None and added_at < watermark:
+                    if new_items:
+                        yield new_items
+                    return
+                new_items.append(item)
+            if new_items:
+                yield new_items
+            offset += len(items)
+            if not items or offset >= page.get("total", 0):
+                return
+
+    async def iter_saved_track_pages(
+        self,
+        token: str,
+        page_size: int = MAX_PAGE_SIZE,
+        concurrency: int = 4,
+    ) -> AsyncIterator[dict]:
+        """
+        Recorre toda la biblioteca de canciones guardadas, página a página.
+
+        La primera página indica el `total`; las siguientes se piden en paralelo
+        con una ventana de como máximo `concurrency` peticiones en vuelo. Las
+        páginas se entregan ordenadas por offset, y la ventana solo avanza cuando
+        el consumidor procesa la página más antigua, así que la memoria no crece
+        con el tamaño de la biblioteca.
+        """
+        first_page = await self._spotify_repo.get_saved_tracks_page(0, page_size, token)
+        yield first_page
+
+        offsets = iter(range(page_size, first_page.get("total", 0), page_size))
+        in_flight: deque = deque()
+
+        def schedule_next() -> None:
+            offset = next(offsets, None)
+            if offset is not None:
+                in_flight.append(asyncio.create_task(
+                    self._spotify_repo.get_saved_tracks_page(offset, page_size, token)
+                ))
+
+        for _ in range(max(1, concurrency)):
+            schedule_next()
+        try:
+            while in_flight:
+                page = await in_flight.popleft()
+                schedule_next()
+                yield page
+        finally:
+            for task in in_flight:
+                task.cancel()
@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Iterable, Mapping, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Caché en memoria acotada con política LRU y contadores de aciertos y fallos.
+    Es segura entre hilos, ya que los repositorios síncronos pueden ejecutarse
+    en el threadpool de FastAPI.
+    """
+
+    # Si sus operaciones pueden bloquear (p. ej. respaldada por SQLite): desde asyncio
+    # deben llamarse en un hilo
+    blocking = False
+
+    def __init__(self, maxsize: int):
+        if maxsize <= 0:
+            raise ValueError("maxsize debe ser mayor que 0")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K) -> Optional[V]:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """Devuelve solo las claves presentes; cada clave cuenta como acierto o fallo."""
+        found: Dict[K, V] = {}
+        with self._lock:
+            for key in keys:
+                try:
+                    value = self._data[key]
+                except KeyError:
+                    self.misses += 1
+                    continue
+                self._data.move_to_end(key)
+                self.hits += 1
+                found[key] = value
+        return found
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._put(key, value)
+
+    def put_many(self, items: Mapping[K, V]) -> None:
+        with self._lock:
+            for key, value in items.items():
+                self._put(key, value)
+
+    def _put(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def discard(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_value(self, value: V) -> None:
+        """Elimina las claves que apuntan a `value` (recorrido lineal, para borrados)."""
+        with self._lock:
+            for key in [k for k, v in self._data.items() if v == value]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -10,6 +10,16 @@ class Settings(BaseSettings):
     SPOTIFY_CLIENT_SECRET: str
     SPOTIFY_REDIRECT_URI: str
     SPOTIFY_ACCESS_TOKEN: Optional[str] = None
+    # Segundos antes de la caducidad del access token en que se refresca
+    SPOTIFY_TOKEN_REFRESH_MARGIN: float = 60.0
+    # Directorio con un archivo de token por usuario (el usuario por defecto usa token.json)
+    SPOTIFY_TOKEN_DIR: str = "tokens"
+    # Segundos de validez del `state` de cada /login: el callback debe llegar antes
+    SPOTIFY_OAUTH_STATE_TTL_SECONDS: float = 600.0
+    # Segundos de validez de los tokens de sesión que emite /callback (30 días)
+    SPOTIFY_SESSION_TTL_SECONDS: float = 2_592_000.0
+    # Exigir sesión en todas las peticiones; sin ella, las peticiones sin sesión usan el usuario por defecto
+    SPOTIFY_REQUIRE_SESSION: bool = False
 
     # Supabase
     SUPABASE_URL: Optional[str] = None
@@ -21,6 +31,58 @@ class Settings(BaseSettings):
     APP_PORT: int = 8000
     APP_DEBUG: bool = False
 
+    # Clientes HTTP compartidos hacia Spotify
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 10.0
+    HTTP2_ENABLED: bool = False
+
+    # Planificador de peticiones a la Web API de Spotify
+    SPOTIFY_RATE_LIMIT_PER_SECOND: float = 10.0
+    SPOTIFY_RATE_LIMIT_BURST: int = 20
+    SPOTIFY_MAX_CONCURRENT_REQUESTS: int = 8
+    SPOTIFY_MAX_RETRIES: int = 5
+    SPOTIFY_BACKOFF_BASE: float = 0.5
+    SPOTIFY_BACKOFF_MAX: float = 30.0
+    SPOTIFY_MAX_RETRY_AFTER: float = 120.0
+    # Páginas de /me/tracks guardadas con su ETag (unas 50 canciones cada una)
+    SPOTIFY_PAGE_CACHE_SIZE: int = 200
+
+    # Sincronización de la biblioteca completa
+    SPOTIFY_PAGE_CONCURRENCY: int = 4
+    SPOTIFY_MAX_PAGE_CONCURRENCY: int = 16
+    # Workers de conversión y guardado, y tamaño de las colas entre etapas
+    SYNC_MAP_CONCURRENCY: int = 1
+    SYNC_PERSIST_CONCURRENCY: int = 2
+    SYNC_QUEUE_SIZE: int = 4
+
+    # Trabajos de sincronización en segundo plano
+    SYNC_MAX_RUNNING_JOBS: int = 2
+    SYNC_MAX_RUNNING_JOBS_PER_USER: int = 1
+    SYNC_MAX_ACTIVE_JOBS: int = 10
+    SYNC_JOB_HISTORY: int = 50
+
+    # Filas leídas de Supabase por consulta al exportar la biblioteca
+    EXPORT_CHUNK_SIZE: int = 1000
+    # Tracks por lote al importar YourLibrary.json
+    IMPORT_BATCH_SIZE: int = 1000
+    # IDs por consulta y por lote de borrado al reconciliar las canciones eliminadas
+    RECONCILE_CHUNK_SIZE: int = 1000
+    # Completar artistas (géneros, popularidad...) y audio features de los tracks al terminar
+    # cada sincronización, y filas pendientes leídas de Supabase por consulta
+    SYNC_ENRICHMENT_ENABLED: bool = False
+    ENRICHMENT_CHUNK_SIZE: int = 1000
+
+    # Cachés de identidad (ID de Spotify -> UUID en Supabase)
+    IDENTITY_CACHE_MAX_ARTISTS: int = 50_000
+    IDENTITY_CACHE_MAX_ALBUMS: int = 50_000
+    IDENTITY_CACHE_WARMUP: bool = False
+
+    # Estado compartido entre workers (tokens, marcas de sincronización, cachés de identidad).
+    # Vacío: cada proceso guarda su estado en memoria; "sqlite": archivo SQLite en SHARED_STATE_PATH
+    SHARED_STATE_BACKEND: Optional[str] = None
+    SHARED_STATE_PATH: str = "shared_state.db"
 
     class Config:
         env_file = ".env"
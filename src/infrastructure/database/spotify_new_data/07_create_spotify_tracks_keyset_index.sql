@@ -0,0 +1,10 @@
+-- Índice para la paginación por cursor (keyset) de GET /api/v1/tracks.
+-- La consulta ordena por (added_at, id) descendente y filtra con
+-- `added_at < X OR (added_at = X AND id < Y)`: con este índice cada página
+-- se lee a partir de la posición del cursor, sin recorrer las filas anteriores,
+-- y su coste no depende de lo profunda que sea la página.
+CREATE INDEX IF NOT EXISTS idx_spotify_tracks_added_at_id
+    ON public.spotify_tracks (added_at DESC, id DESC);
+
+-- Los artistas de cada track se embeben a través de la tabla de unión;
+-- idx_spotify_track_artists_track_id (04) ya cubre esa búsqueda.
@@ -0,0 +1,24 @@
+-- Datos de enriquecimiento pedidos a Spotify después de guardar los tracks:
+-- `GET /artists?ids=` (50 por petición) para los artistas y
+-- `GET /audio-features?ids=` (100 por petición) para los tracks.
+--
+-- `enriched_at` / `audio_features_at` marcan las filas ya consultadas, también
+-- cuando Spotify no devuelve datos para ellas: así no se vuelven a pedir.
+ALTER TABLE public.spotify_artists
+    ADD COLUMN IF NOT EXISTS genres TEXT[],
+    ADD COLUMN IF NOT EXISTS popularity INTEGER,
+    ADD COLUMN IF NOT EXISTS followers INTEGER,
+    ADD COLUMN IF NOT EXISTS image_url TEXT,
+    ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMP WITH TIME ZONE;
+
+-- Objeto de audio features tal cual lo devuelve Spotify (danceability, energy, tempo...)
+ALTER TABLE public.spotify_tracks
+    ADD COLUMN IF NOT EXISTS audio_features JSONB,
+    ADD COLUMN IF NOT EXISTS audio_features_at TIMESTAMP WITH TIME ZONE;
+
+-- La etapa de enriquecimiento busca las filas pendientes ordenadas por id:
+-- con índices parciales la consulta solo recorre las que faltan.
+CREATE INDEX IF NOT EXISTS idx_spotify_artists_pending_enrichment
+    ON public.spotify_artists (id) WHERE enriched_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_spotify_tracks_pending_audio_features
+    ON public.spotify_tracks (id) WHERE audio_features_at IS NULL;
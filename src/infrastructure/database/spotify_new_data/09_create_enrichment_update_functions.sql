@@ -0,0 +1,58 @@
+-- Escritura de los datos de enriquecimiento (08) con un UPDATE por bloque.
+--
+-- Un upsert sobre la clave de Spotify volvería a insertar las filas que otra
+-- operación (p. ej. la reconciliación) borró entre la lectura de las pendientes
+-- y la escritura. Estas funciones solo actualizan las filas que siguen existiendo
+-- y devuelven cuántas actualizaron. Se llaman por RPC con `rows`, un array JSON
+-- de objetos con la clave de Spotify y las columnas a escribir.
+CREATE OR REPLACE FUNCTION public.apply_artist_enrichment(rows JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE public.spotify_artists AS a
+        SET genres = r.genres,
+            popularity = r.popularity,
+            followers = r.followers,
+            image_url = r.image_url,
+            enriched_at = r.enriched_at,
+            updated_at = NOW()
+        FROM jsonb_to_recordset(rows) AS r(
+            spotify_id VARCHAR(100),
+            genres TEXT[],
+            popularity INTEGER,
+            followers INTEGER,
+            image_url TEXT,
+            enriched_at TIMESTAMP WITH TIME ZONE
+        )
+        WHERE a.spotify_id = r.spotify_id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$;
+
+-- Las audio features dependen solo del track: se escriben en todas sus filas
+CREATE OR REPLACE FUNCTION public.apply_audio_features(rows JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE public.spotify_tracks AS t
+        SET audio_features = r.audio_features,
+            audio_features_at = r.audio_features_at,
+            updated_at = NOW()
+        FROM jsonb_to_recordset(rows) AS r(
+            spotify_track_id VARCHAR(100),
+            audio_features JSONB,
+            audio_features_at TIMESTAMP WITH TIME ZONE
+        )
+        WHERE t.spotify_track_id = r.spotify_track_id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$;
+
+REVOKE ALL ON FUNCTION public.apply_artist_enrichment(JSONB) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.apply_audio_features(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.apply_artist_enrichment(JSONB) TO service_role;
+GRANT EXECUTE ON FUNCTION public.apply_audio_features(JSONB) TO service_role;
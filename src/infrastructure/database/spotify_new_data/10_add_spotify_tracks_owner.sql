@@ -0,0 +1,40 @@
+-- Cada usuario de Spotify tiene su propia biblioteca: los tracks guardados pasan a
+-- pertenecer a un usuario (`owner`, el de la sesión de la petición). Las filas
+-- existentes quedan para el usuario por defecto, el de los despliegues de una sola cuenta.
+-- Artistas y álbumes siguen compartidos entre todos los usuarios.
+ALTER TABLE public.spotify_tracks
+    ADD COLUMN IF NOT EXISTS owner VARCHAR(100) NOT NULL DEFAULT 'me';
+
+-- El mismo track puede estar en la biblioteca de varios usuarios: el ID de Spotify
+-- pasa a ser único por usuario, y es la restricción que usan los upserts
+ALTER TABLE public.spotify_tracks
+    DROP CONSTRAINT IF EXISTS spotify_tracks_spotify_track_id_key;
+ALTER TABLE public.spotify_tracks
+    ADD CONSTRAINT spotify_tracks_owner_spotify_track_id_key UNIQUE (owner, spotify_track_id);
+
+-- La paginación por cursor, la marca de la sincronización incremental, la exportación
+-- y la reconciliación leen las filas de un usuario por (added_at, id): el índice de 07
+-- se sustituye por uno que empieza por el propietario
+DROP INDEX IF EXISTS public.idx_spotify_tracks_added_at_id;
+CREATE INDEX IF NOT EXISTS idx_spotify_tracks_owner_added_at_id
+    ON public.spotify_tracks (owner, added_at DESC, id DESC);
+
+-- La vista legible expone el propietario de cada track
+CREATE OR REPLACE VIEW public.track_details AS
+SELECT
+    t.id AS track_id,
+    t.track_name,
+    t.spotify_url,
+    al.name AS album_name,
+    string_agg(ar.name, ', ') AS artists_names,
+    t.owner
+FROM
+    public.spotify_tracks t
+LEFT JOIN
+    public.spotify_albums al ON t.album_id = al.id
+LEFT JOIN
+    public.spotify_track_artists ta ON t.id = ta.track_id
+LEFT JOIN
+    public.spotify_artists ar ON ta.artist_id = ar.id
+GROUP BY
+    t.id, al.id;
@@ -0,0 +1,134 @@
+import heapq
+from bisect import bisect_left
+from typing import Iterable, Iterator, List
+
+# Longitud de los IDs base62 de Spotify
+SPOTIFY_ID_WIDTH = 22
+
+
+class _Records:
+    """Vista de un buffer de registros de ancho fijo como secuencia ordenada de `bytes` (para `bisect`)."""
+
+    def __init__(self, data: bytes, width: int):
+        self._data = data
+        self._width = width
+
+    def __len__(self) -> int:
+        return len(self._data) // self._width
+
+    def __getitem__(self, index: int) -> bytes:
+        start = index * self._width
+        return self._data[start:start + self._width]
+
+    def __iter__(self) -> Iterator[bytes]:
+        width = self._width
+        data = self._data
+        return (data[start:start + width] for start in range(0, len(data), width))
+
+
+class PackedIdSet:
+    """
+    Conjunto inmutable de IDs de ancho fijo, ordenados y empaquetados uno tras otro
+    en un único `bytes`: 100k IDs de Spotify ocupan 2,2 MB, frente a los más de 10 MB
+    de un `set` de `str`. La pertenencia se resuelve con búsqueda binaria y la
+    diferencia entre dos conjuntos recorriendo ambos a la vez, sin crear un objeto
+    por ID.
+
+    Los IDs más cortos que `width` se rellenan con bytes nulos; deben ser ASCII.
+    """
+
+    def __init__(self, data: bytes = b"", width: int = SPOTIFY_ID_WIDTH):
+        if len(data) % width:
+            raise ValueError(f"El buffer no contiene registros completos de {width} bytes")
+        self.width = width
+        self._data = data
+        self._records = _Records(data, width)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[str], width: int = SPOTIFY_ID_WIDTH) -> "PackedIdSet":
+        builder = PackedIdSetBuilder(width)
+        builder.update(ids)
+        return builder.build()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes que ocupan los IDs empaquetados."""
+        return len(self._data)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, spotify_id: str) -> bool:
+        record = _pack(spotify_id, self.width)
+        index = bisect_left(self._records, record)
+        return index < len(self._records) and self._records[index] == record
+
+    def __iter__(self) -> Iterator[str]:
+        return (_unpack(record) for record in self._records)
+
+    def difference(self, other: "PackedIdSet") -> Iterator[str]:
+        """IDs de este conjunto que no están en `other`, en orden, recorriendo ambos una sola vez."""
+        if other.width != self.width:
+            raise ValueError("Los conjuntos tienen anchos de ID distintos")
+        theirs = iter(other._records)
+        current = next(theirs, None)
+        for record in self._records:
+            while current is not None and current < record:
+                current = next(theirs, None)
+            if current != record:
+                yield _unpack(record)
+
+
+class PackedIdSetBuilder:
+    """
+    Construye un PackedIdSet a partir de IDs que llegan por partes (páginas de
+    Spotify, bloques de Supabase).
+
+    Los IDs se acumulan en tramos de `run_size` que se ordenan y empaquetan al
+    llenarse; `build` los fusiona y elimina duplicados. Así solo hay `run_size`
+    objetos `str` vivos a la vez, sea cual sea el número de IDs.
+    """
+
+    def __init__(self, width: int = SPOTIFY_ID_WIDTH, run_size: int = 4096):
+        self.width = width
+        self.run_size = run_size
+        self._pending: List[str] = []
+        self._runs: List[bytes] = []
+
+    def add(self, spotify_id: str) -> None:
+        self._pending.append(spotify_id)
+        if len(self._pending) >= self.run_size:
+            self._flush()
+
+    def update(self, ids: Iterable[str]) -> None:
+        for spotify_id in ids:
+            self.add(spotify_id)
+
+    def _flush(self) -> None:
+        if self._pending:
+            width = self.width
+            self._runs.append(b"".join(sorted(_pack(spotify_id, width) for spotify_id in self._pending)))
+            self._pending = []
+
+    def build(self) -> PackedIdSet:
+        self._flush()
+        runs, self._runs = self._runs, []
+        data = bytearray()
+        previous = None
+        for record in heapq.merge(*(_Records(run, self.width) for run in runs)):
+            if record != previous:
+                data += record
+                previous = record
+        # El bytearray se usa tal cual: copiarlo a `bytes` duplicaría el pico de memoria
+        return PackedIdSet(data, self.width)
+
+
+def _pack(spotify_id: str, width: int) -> bytes:
+    record = spotify_id.encode("ascii")
+    if len(record) > width:
+        raise ValueError(f"El ID '{spotify_id}' supera los {width} caracteres")
+    return record.ljust(width, b"\0")
+
+
+def _unpack(record: bytes) -> str:
+    return record.rstrip(b"\0").decode("ascii")
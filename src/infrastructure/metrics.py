@@ -0,0 +1,234 @@
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Límites de los histogramas de latencia, en segundos
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        """Muestras (nombre, etiquetas, valor) en el formato de exposición de Prometheus."""
+
+class Counter(_Metric):
+    """Contador monótono con etiquetas."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+class Histogram(_Metric):
+    """Histograma de latencias con buckets fijos, suma y número de observaciones."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteo por bucket (no acumulado) + desbordamiento, suma]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Mide la duración del bloque, también si termina con una excepción."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+class CallbackGauge(_Metric):
+    """Valores leídos en el momento de exponer las métricas, sin coste en el camino caliente."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]],
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._callback = callback
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._callback():
+            yield self.name, labels, value
+
+class MetricsRegistry:
+    """Conjunto de métricas del proceso, exportable en formato de texto de Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"La métrica '{metric.name}' ya está registrada")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]],
+        kind: str = "gauge",
+    ) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, callback, kind))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# -- Métricas de la aplicación ---------------------------------------------
+
+SUPABASE_REQUEST_SECONDS = registry.histogram(
+    "supabase_request_seconds",
+    "Latencia de las peticiones a Supabase por tabla y operación.",
+    ("table", "operation"),
+)
+SUPABASE_REQUEST_ERRORS = registry.counter(
+    "supabase_request_errors_total",
+    "Peticiones a Supabase que terminaron con error, por tabla y operación.",
+    ("table", "operation"),
+)
+SUPABASE_ROWS_WRITTEN = registry.counter(
+    "supabase_rows_written_total",
+    "Filas insertadas, actualizadas o borradas en Supabase, por tabla y operación.",
+    ("table", "operation"),
+)
+SPOTIFY_REQUEST_SECONDS = registry.histogram(
+    "spotify_request_seconds",
+    "Latencia de las llamadas a la Web API de Spotify, reintentos incluidos, por endpoint.",
+    ("endpoint",),
+)
+SPOTIFY_REQUESTS = registry.counter(
+    "spotify_requests_total",
+    "Llamadas a la Web API de Spotify por endpoint y código de estado final.",
+    ("endpoint", "status"),
+)
+SPOTIFY_PAGE_CACHE = registry.counter(
+    "spotify_page_cache_total",
+    "Páginas de /me/tracks por resultado de la caché: hit (304 Not Modified) o miss (200).",
+    ("result",),
+)
+SYNC_STAGE_SECONDS = registry.histogram(
+    "sync_stage_seconds",
+    "Duración de cada etapa de la sincronización por lote.",
+    ("stage",),
+)
+SYNC_TRACKS = registry.counter(
+    "sync_tracks_total",
+    "Tracks procesados por la sincronización, por resultado (created, skipped, failed).",
+    ("result",),
+)
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "single_flight_calls_total",
+    "Llamadas a operaciones agrupadas por clave, por operación y resultado "
+    "(leader: ejecutó la operación, coalesced: recibió el resultado de otra llamada en curso).",
+    ("operation", "result"),
+)
+ENRICHED_ROWS = registry.counter(
+    "enrichment_rows_total",
+    "Filas completadas con datos de Spotify, por tabla y resultado (enriched, not_found).",
+    ("table", "result"),
+)
@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Mapping, Optional
+from uuid import UUID
+
+from src.infrastructure.config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock no hay bloqueo entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Variables por sentencia `IN (...)`: por debajo del límite de las versiones antiguas de SQLite (999)
+SQLITE_IN_CHUNK_SIZE = 500
+
+
+class InterProcessLock:
+    """
+    Bloqueo exclusivo entre procesos con `flock` sobre un archivo.
+    `acquire` bloquea el hilo: desde asyncio debe llamarse con `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> None:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "InterProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class SharedState(ABC):
+    """
+    Estado compartido por todos los workers de un despliegue: tokens de Spotify, logins
+    OAuth en curso, sesiones, marcas de sincronización incremental y correspondencias ID de Spotify -> UUID.
+
+    Sin backend configurado cada proceso guarda este estado por su cuenta (tokens en
+    archivos JSON, cachés en memoria), lo que solo es correcto con un único worker.
+    """
+
+    @abstractmethod
+    def get_token(self, user: str) -> Optional[dict]:
+        """Datos del token del usuario, o None si no hay ninguno guardado."""
+
+    @abstractmethod
+    def put_token(self, user: str, token_data: dict) -> None:
+        """Guarda los datos del token del usuario."""
+
+    @abstractmethod
+    def token_lock(self, user: str) -> InterProcessLock:
+        """Bloqueo que serializa el refresco del token del usuario entre procesos."""
+
+    @abstractmethod
+    def put_oauth_state(self, state: str, user: str, expires_at: float) -> None:
+        """Registra el `state` de un login OAuth del usuario, válido hasta `expires_at` (epoch)."""
+
+    @abstractmethod
+    def pop_oauth_state(self, state: str) -> Optional[str]:
+        """Consume el `state`: usuario del login, o None si no existe o ya caducó."""
+
+    @abstractmethod
+    def put_session(self, session_hash: str, user: str, expires_at: float) -> None:
+        """Registra una sesión del usuario (el SHA-256 de su token), válida hasta `expires_at` (epoch)."""
+
+    @abstractmethod
+    def get_session(self, session_hash: str) -> Optional[str]:
+        """Usuario de la sesión, o None si no existe o ya caducó."""
+
+    @abstractmethod
+    def get_watermark(self, user: str) -> Optional[datetime]:
+        """`added_at` más reciente sincronizado para el usuario."""
+
+    @abstractmethod
+    def put_watermark(self, user: str, watermark: datetime) -> None:
+        """Avanza la marca del usuario; una marca anterior a la guardada se ignora."""
+
+    @abstractmethod
+    def get_ids(self, namespace: str, spotify_ids: Iterable[str]) -> Dict[str, UUID]:
+        """UUID conocidos de los IDs de Spotify; los ausentes no aparecen en el resultado."""
+
+    @abstractmethod
+    def put_ids(self, namespace: str, ids: Mapping[str, UUID]) -> None:
+        """Registra correspondencias ID de Spotify -> UUID."""
+
+    @abstractmethod
+    def discard_ids(self, namespace: str, spotify_ids: Iterable[str]) -> None:
+        """Olvida las correspondencias de los IDs de Spotify."""
+
+    @abstractmethod
+    def discard_uuid(self, namespace: str, uuid: UUID) -> None:
+        """Olvida las correspondencias que apuntan a `uuid`."""
+
+    @abstractmethod
+    def clear_ids(self, namespace: str) -> None:
+        """Olvida todas las correspondencias del espacio de nombres."""
+
+
+class SQLiteSharedState(SharedState):
+    """
+    Estado compartido en un archivo SQLite, seguro entre procesos.
+
+    Usa WAL, así que las lecturas no esperan a las escrituras de otros workers y una
+    consulta de identidad de una página (50 IDs) cuesta decenas de microsegundos:
+    puede hacerse en cada petición. Cada hilo de cada proceso abre su propia conexión.
+    El refresco de tokens se serializa con `flock` sobre un archivo junto a la base
+    de datos, uno por usuario.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        if fcntl is None:
+            raise RuntimeError("El estado compartido en SQLite necesita flock (sistemas POSIX)")
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock_prefix = os.path.join(directory, f".{os.path.basename(path)}")
+        with InterProcessLock(f"{self._lock_prefix}.schema.lock"):
+            self._create_schema(self._connection())
+
+    def _connection(self) -> sqlite3.Connection:
+        # Las conexiones no se comparten entre hilos ni sobreviven a un fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection) -> None:
+        connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tokens (
+                user TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS oauth_states (
+                state TEXT PRIMARY KEY,
+                user TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_hash TEXT PRIMARY KEY,
+                user TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS watermarks (
+                user TEXT PRIMARY KEY,
+                added_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS identities (
+                namespace TEXT NOT NULL,
+                spotify_id TEXT NOT NULL,
+                uuid TEXT NOT NULL,
+                PRIMARY KEY (namespace, spotify_id)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def _write(self, sql: str, rows: List[tuple]) -> None:
+        if not rows:
+            return
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(sql, rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get_token(self, user: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT data FROM tokens WHERE user = ?", (user,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_token(self, user: str, token_data: dict) -> None:
+        self._write(
+            "INSERT INTO tokens (user, data) VALUES (?, ?) ON CONFLICT (user) DO UPDATE SET data = excluded.data",
+            [(user, json.dumps(token_data))],
+        )
+
+    def token_lock(self, user: str) -> InterProcessLock:
+        return InterProcessLock(f"{self._lock_prefix}.token-{user}.lock")
+
+    def put_oauth_state(self, state: str, user: str, expires_at: float) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Los logins que nunca volvieron del callback se purgan al registrar uno nuevo
+            connection.execute("DELETE FROM oauth_states WHERE expires_at < ?", (time.time(),))
+            connection.execute(
+                "INSERT INTO oauth_states (state, user, expires_at) VALUES (?, ?, ?)", (state, user, expires_at)
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def pop_oauth_state(self, state: str) -> Optional[str]:
+        connection = self._connection()
+        # Lectura y borrado en la misma transacción: cada `state` se consume una sola vez
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT user, expires_at FROM oauth_states WHERE state = ?", (state,)).fetchone()
+            connection.execute("DELETE FROM oauth_states WHERE state = ?", (state,))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def put_session(self, session_hash: str, user: str, expires_at: float) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Las sesiones caducadas se purgan al registrar una nueva
+            connection.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+            connection.execute(
+                "INSERT INTO sessions (session_hash, user, expires_at) VALUES (?, ?, ?)",
+                (session_hash, user, expires_at),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get_session(self, session_hash: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT user, expires_at FROM sessions WHERE session_hash = ?", (session_hash,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def get_watermark(self, user: str) -> Optional[datetime]:
+        row = self._connection().execute("SELECT added_at FROM watermarks WHERE user = ?", (user,)).fetchone()
+        return datetime.fromtimestamp(row[0], timezone.utc) if row else None
+
+    def put_watermark(self, user: str, watermark: datetime) -> None:
+        self._write(
+            "INSERT INTO watermarks (user, added_at) VALUES (?, ?) "
+            "ON CONFLICT (user) DO UPDATE SET added_at = max(added_at, excluded.added_at)",
+            [(user, watermark.timestamp())],
+        )
+
+    def get_ids(self, namespace: str, spotify_ids: Iterable[str]) -> Dict[str, UUID]:
+        keys = list(spotify_ids)
+        found: Dict[str, UUID] = {}
+        connection = self._connection()
+        for start in range(0, len(keys), SQLITE_IN_CHUNK_SIZE):
+            chunk = keys[start:start + SQLITE_IN_CHUNK_SIZE]
+            rows = connection.execute(
+                f"SELECT spotify_id, uuid FROM identities WHERE namespace = ? "
+                f"AND spotify_id IN ({','.join('?' * len(chunk))})",
+                (namespace, *chunk),
+            )
+            found.update((spotify_id, UUID(uuid)) for spotify_id, uuid in rows)
+        return found
+
+    def put_ids(self, namespace: str, ids: Mapping[str, UUID]) -> None:
+        self._write(
+            "INSERT INTO identities (namespace, spotify_id, uuid) VALUES (?, ?, ?) "
+            "ON CONFLICT (namespace, spotify_id) DO UPDATE SET uuid = excluded.uuid",
+            [(namespace, spotify_id, str(uuid)) for spotify_id, uuid in ids.items()],
+        )
+
+    def discard_ids(self, namespace: str, spotify_ids: Iterable[str]) -> None:
+        self._write(
+            "DELETE FROM identities WHERE namespace = ? AND spotify_id = ?",
+            [(namespace, spotify_id) for spotify_id in spotify_ids],
+        )
+
+    def discard_uuid(self, namespace: str, uuid: UUID) -> None:
+        self._write("DELETE FROM identities WHERE namespace = ? AND uuid = ?", [(namespace, str(uuid))])
+
+    def clear_ids(self, namespace: str) -> None:
+        self._write("DELETE FROM identities WHERE namespace = ?", [(namespace,)])
+
+
+_shared_state: Optional[SharedState] = None
+_shared_state_lock = threading.Lock()
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """
+    Retorna el estado compartido configurado con `SHARED_STATE_BACKEND`, o None si no
+    hay ninguno (un único worker que guarda su estado en memoria y en archivos).
+    """
+    global _shared_state
+    if _shared_state is None and settings.SHARED_STATE_BACKEND:
+        with _shared_state_lock:
+            if _shared_state is None:
+                if settings.SHARED_STATE_BACKEND != "sqlite":
+                    raise ValueError(f"SHARED_STATE_BACKEND desconocido: '{settings.SHARED_STATE_BACKEND}'")
+                _shared_state = SQLiteSharedState(settings.SHARED_STATE_PATH)
+                logger.info(f"🗄️ Estado compartido en SQLite: {settings.SHARED_STATE_PATH}")
+    return _shared_state
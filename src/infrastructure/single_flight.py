@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+from src.infrastructure import metrics
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Agrupa las llamadas concurrentes con la misma clave en una sola ejecución.
+
+    La primera llamada con una clave lanza la operación en una tarea propia; las que
+    llegan mientras sigue en curso esperan esa misma tarea y reciben su resultado o
+    su excepción. Al terminar, la clave se libera y la siguiente llamada vuelve a
+    ejecutar la operación: no es una caché de resultados.
+
+    La tarea no pertenece a ninguna llamada: si quien la lanzó se cancela (p. ej. el
+    cliente HTTP se desconecta), la operación sigue para las demás y termina igual.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.leaders = 0
+        self.coalesced = 0
+        self._tasks: Dict[K, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """Ejecuta `fn` para `key`, o espera la ejecución que ya está en curso."""
+        task = self._tasks.get(key)
+        # Una tarea de otro event loop (p. ej. uno ya cerrado) no puede esperarse desde este
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            metrics.SINGLE_FLIGHT_CALLS.inc(operation=self.operation, result="coalesced")
+            logger.info(f"🔗 {self.operation} {key} ya en curso; se espera su resultado")
+        else:
+            self.leaders += 1
+            metrics.SINGLE_FLIGHT_CALLS.inc(operation=self.operation, result="leader")
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: K, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Si todas las llamadas se cancelaron nadie lee la excepción: se marca como leída
+        if not task.cancelled():
+            task.exception()
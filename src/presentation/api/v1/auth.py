@@ -1,6 +1,8 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from src.adapters.spotify import auth
+from src.presentation.api.v1.deps import get_spotify_user
 import logging
 
 router = APIRouter()
@@ -15,22 +17,29 @@ class LoginResponse(BaseModel):
     summary="Paso 1: Iniciar autenticación con Spotify",
     response_model=LoginResponse,
 )
-def login():
+def login(user: str = auth.DEFAULT_USER):
     """
     **Este endpoint inicia el flujo de autenticación OAuth2 con Spotify.**
 
     Genera la URL de autorización de Spotify a la que el usuario debe ser redirigido.
+    Con `user`, el token se guarda para ese usuario; sin él, para el usuario por defecto.
+    El callback devuelve un `session_token` que las demás peticiones envían en la cabecera
+    `Authorization: Bearer` para actuar como ese usuario. Un usuario que ya tiene token
+    solo puede volver a iniciar sesión con la misma cuenta de Spotify.
     Desde la UI de Swagger, puedes ejecutar este endpoint y luego copiar la `auth_url` de la respuesta
     y pegarla en una nueva pestaña de tu navegador para autorizar la aplicación.
 
     Después de que apruebes los permisos, Spotify te redirigirá de vuelta al endpoint `/callback` de esta API.
     """
-    auth_url = auth.get_auth_url()
+    try:
+        auth_url = auth.get_auth_url(auth.validate_user(user))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     logging.info(f"Generada URL de autorización de Spotify: {auth_url}")
     return {"auth_url": auth_url}
 
 @router.get("/callback", summary="Paso 2: Callback automático de Spotify")
-def callback(code: str):
+def callback(code: str, state: Optional[str] = None):
     """
     **Este endpoint es para uso exclusivo de Spotify y se llama automáticamente.**
     
@@ -40,22 +49,44 @@ def callback(code: str):
     La API recibe un `code` de un solo uso, lo intercambia por un `access_token` y lo almacena en memoria para futuras peticiones.
     Si intentas usar un `code` que ya fue utilizado (por ejemplo, recargando la página o usándolo aquí manualmente),
     recibirás un error de `invalid_grant`.
+
+    `state` es el valor aleatorio que generó `/login`: identifica al usuario bajo el que se
+    guarda el token y solo vale una vez. Sin él, o si no lo emitió esta API o caducó, responde 400.
+    Si el usuario ya tiene el token de otra cuenta de Spotify, responde 403 y no guarda nada.
+
+    La respuesta incluye `session_token`, la credencial del usuario en las demás peticiones
+    (`Authorization: Bearer <session_token>`), válida SPOTIFY_SESSION_TTL_SECONDS.
     """
-    logging.info("Recibido el código de autorización de Spotify. Intercambiando por token...")
-    token_data = auth.exchange_code_for_token(code)
+    user = auth.consume_oauth_state(state) if state else None
+    if user is None:
+        logging.warning("Callback de Spotify con un state ausente, desconocido o caducado")
+        raise HTTPException(
+            status_code=400,
+            detail="Parámetro 'state' ausente, desconocido o caducado. Vuelve a iniciar sesión en /api/v1/auth/login",
+        )
+    logging.info(f"Recibido el código de autorización de Spotify para '{user}'. Intercambiando por token...")
+    try:
+        token_data = auth.exchange_code_for_token(code, user)
+    except auth.SpotifyAccountMismatchError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     if token_data:
         logging.info("Token de acceso obtenido y almacenado correctamente.")
-        return {"status": "success", "message": "Autenticación completada. Ya puedes cerrar esta pestaña y volver a la documentación para usar los otros endpoints."}
+        return {
+            "status": "success",
+            "message": "Autenticación completada. Envía `session_token` en la cabecera `Authorization: Bearer` de los otros endpoints.",
+            "session_token": auth.create_session(user),
+        }
     logging.error("No se pudo obtener el token de acceso de Spotify.")
     return {"status": "error", "message": "No se pudo obtener el token de acceso."}
 
 @router.get("/status", summary="Paso 3: Verificar estado de autenticación")
-def status():
+def status(user: str = Depends(get_spotify_user)):
     """
-    Verifica si hay un token de acceso válido almacenado en la sesión del servidor.
+    Verifica si hay un token de acceso válido almacenado en la sesión del servidor
+    para el usuario de la sesión de `Authorization: Bearer` (o el usuario por defecto).
     Útil para comprobar si necesitas iniciar sesión antes de llamar a endpoints protegidos.
     """
-    token = auth.get_access_token()
+    token = auth.get_access_token(user)
     if token:
         logging.debug("Token de acceso encontrado.")
         return {"status": "authenticated"}
@@ -1,25 +1,115 @@
+import functools
+import httpx
+from typing import Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from src.core.repositories.spotify_repository import SpotifyRepository
 from src.adapters.spotify.repository import SpotifyAPIRepository
-from src.core.services.sync_service import SyncService
+from src.core.services.sync_service import SyncService, get_sync_page_flights
 from src.core.services.supabase_sync_service import SupabaseSyncService
 from src.adapters.spotify import auth
-from src.adapters.supabase.client import get_supabase_client
+from src.adapters.spotify.client import get_spotify_api_client
+from src.adapters.spotify.page_cache import get_page_cache
+from src.adapters.spotify.scheduler import SpotifyRequestScheduler, get_spotify_scheduler
+from src.adapters.supabase.client import get_async_supabase_client, get_supabase_client
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+from src.core.services.library_export import LibraryExportService
+from src.core.services.library_enrichment import LibraryEnrichmentService
+from src.core.services.library_import import LibraryImportService
+from src.core.services.library_reconcile import LibraryReconcileService
+from src.core.services.sync_jobs import SyncJobManager, get_sync_job_manager
 from src.adapters.supabase.repository import SupabaseRepository
+from src.adapters.supabase.identity_cache import get_album_identity_cache, get_artist_identity_cache
 from src.core.entities.track import Artist, Album, SavedTrack
+from src.infrastructure import shared_state
+from src.infrastructure.single_flight import SingleFlight
+from src.infrastructure.config.settings import settings
 
-def get_spotify_repository() -> SpotifyRepository:
-    return SpotifyAPIRepository()
+def get_spotify_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP compartido para la API de Spotify, creado en el arranque de la aplicación."""
+    return get_spotify_api_client()
+
+def get_spotify_request_scheduler() -> SpotifyRequestScheduler:
+    """Planificador compartido que limita y reintenta las peticiones a Spotify."""
+    return get_spotify_scheduler()
+
+def get_shared_state() -> Optional[shared_state.SharedState]:
+    """Estado compartido entre workers, o None si cada proceso guarda el suyo."""
+    return shared_state.get_shared_state()
+
+def get_sync_flights() -> SingleFlight:
+    """Sincronizaciones de página en curso, compartidas por las peticiones iguales y simultáneas."""
+    return get_sync_page_flights()
+
+def get_sync_jobs() -> SyncJobManager:
+    """Gestor compartido de los trabajos de sincronización en segundo plano."""
+    return get_sync_job_manager()
+
+# Token de sesión que devuelve /auth/callback, enviado en `Authorization: Bearer`
+session_scheme = HTTPBearer(auto_error=False, description="`session_token` devuelto por /api/v1/auth/callback.")
+
+def get_spotify_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(session_scheme)) -> str:
+    """
+    Usuario de Spotify de la petición: el de la sesión emitida por `/auth/callback`,
+    enviada en `Authorization: Bearer <session_token>`. El cliente no puede elegirlo.
+
+    Sin sesión se usa el usuario por defecto, el de los despliegues de una sola cuenta,
+    salvo con SPOTIFY_REQUIRE_SESSION. Una sesión desconocida o caducada responde 401.
+    """
+    if credentials is None:
+        if not settings.SPOTIFY_REQUIRE_SESSION:
+            return auth.DEFAULT_USER
+        detail = "Falta la sesión. Inicia sesión en /api/v1/auth/login"
+    else:
+        user = auth.get_session_user(credentials.credentials)
+        if user is not None:
+            return user
+        detail = "Sesión desconocida o caducada. Vuelve a iniciar sesión en /api/v1/auth/login"
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+def get_spotify_repository(
+    client: httpx.AsyncClient = Depends(get_spotify_http_client),
+    scheduler: SpotifyRequestScheduler = Depends(get_spotify_request_scheduler),
+    user: str = Depends(get_spotify_user),
+) -> SpotifyRepository:
+    return SpotifyAPIRepository(
+        client,
+        scheduler,
+        token_provider=functools.partial(auth.resolve_access_token, user=user),
+        page_cache=get_page_cache(),
+        user=user,
+    )
+
+def get_uncached_spotify_repository(
+    client: httpx.AsyncClient = Depends(get_spotify_http_client),
+    scheduler: SpotifyRequestScheduler = Depends(get_spotify_request_scheduler),
+    user: str = Depends(get_spotify_user),
+) -> SpotifyRepository:
+    """
+    Como get_spotify_repository, pero sin la caché de ETag de `/me/tracks`: para leer
+    páginas que no se guardan. Con la caché, la siguiente sincronización recibiría 304
+    para esas páginas y las daría por guardadas.
+    """
+    return SpotifyAPIRepository(
+        client,
+        scheduler,
+        token_provider=functools.partial(auth.resolve_access_token, user=user),
+        user=user,
+    )
 
 def get_sync_service(
     repo: SpotifyRepository = Depends(get_spotify_repository)
 ) -> SyncService:
     return SyncService(repo)
 
-def get_spotify_token() -> str:
+async def get_spotify_token(user: str = Depends(get_spotify_user)) -> str:
     """
     Esta función es una dependencia de FastAPI.
-    Se encarga de obtener el token de acceso que fue guardado en memoria.
+    Se encarga de obtener el token de acceso del usuario que fue guardado en memoria,
+    refrescándolo antes si está a punto de caducar.
 
     Si el token no existe, lanza un error 401 para proteger el endpoint,
     forzando al usuario a autenticarse primero.
@@ -27,29 +117,86 @@ def get_spotify_token() -> str:
     FastAPI se encarga de "inyectar" el resultado de esta función en cualquier
     endpoint que la declare.
     """
-    token = auth.get_access_token()
+    token = await auth.get_valid_access_token(user)
     if not token:
+        login = "/api/v1/auth/login" if user == auth.DEFAULT_USER else f"/api/v1/auth/login?user={user}"
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No autenticado en Spotify. Por favor, ve a /api/v1/auth/login",
+            detail=f"No autenticado en Spotify. Por favor, ve a {login}",
         )
     return token
 
 def get_supabase_artist_repository() -> SupabaseRepository[Artist]:
     supabase_client = get_supabase_client()
-    return SupabaseRepository(supabase_client, Artist, "spotify_artists")
+    return SupabaseRepository(supabase_client, Artist, "spotify_artists", get_artist_identity_cache())
 
 def get_supabase_album_repository() -> SupabaseRepository[Album]:
     supabase_client = get_supabase_client()
-    return SupabaseRepository(supabase_client, Album, "spotify_albums")
+    return SupabaseRepository(supabase_client, Album, "spotify_albums", get_album_identity_cache())
 
-def get_supabase_track_repository() -> SupabaseRepository[SavedTrack]:
+def get_supabase_track_repository(user: str = Depends(get_spotify_user)) -> SupabaseRepository[SavedTrack]:
+    """Tracks guardados del usuario de la petición: solo lee, escribe y borra los suyos."""
     supabase_client = get_supabase_client()
-    return SupabaseRepository(supabase_client, SavedTrack, "spotify_tracks")
+    return SupabaseRepository(supabase_client, SavedTrack, "spotify_tracks", owner=user)
 
 def get_supabase_sync_service(
     artist_repo: SupabaseRepository[Artist] = Depends(get_supabase_artist_repository),
     album_repo: SupabaseRepository[Album] = Depends(get_supabase_album_repository),
     track_repo: SupabaseRepository[SavedTrack] = Depends(get_supabase_track_repository),
 ) -> SupabaseSyncService:
-    return SupabaseSyncService(artist_repo, album_repo, track_repo)
\ No newline at end of file
+    return SupabaseSyncService(artist_repo, album_repo, track_repo)
+
+async def get_async_supabase_artist_repository() -> AsyncSupabaseRepository[Artist]:
+    supabase_client = await get_async_supabase_client()
+    return AsyncSupabaseRepository(supabase_client, Artist, "spotify_artists", get_artist_identity_cache())
+
+async def get_async_supabase_album_repository() -> AsyncSupabaseRepository[Album]:
+    supabase_client = await get_async_supabase_client()
+    return AsyncSupabaseRepository(supabase_client, Album, "spotify_albums", get_album_identity_cache())
+
+async def get_async_supabase_track_repository(
+    user: str = Depends(get_spotify_user),
+) -> AsyncSupabaseRepository[SavedTrack]:
+    """Versión asíncrona de get_supabase_track_repository."""
+    supabase_client = await get_async_supabase_client()
+    return AsyncSupabaseRepository(supabase_client, SavedTrack, "spotify_tracks", owner=user)
+
+async def get_async_supabase_sync_service(
+    artist_repo: AsyncSupabaseRepository[Artist] = Depends(get_async_supabase_artist_repository),
+    album_repo: AsyncSupabaseRepository[Album] = Depends(get_async_supabase_album_repository),
+    track_repo: AsyncSupabaseRepository[SavedTrack] = Depends(get_async_supabase_track_repository),
+) -> AsyncSupabaseSyncService:
+    supabase_client = await get_async_supabase_client()
+    return AsyncSupabaseSyncService(artist_repo, album_repo, track_repo, supabase_client)
+
+def get_library_export_service(
+    track_repo: AsyncSupabaseRepository[SavedTrack] = Depends(get_async_supabase_track_repository),
+) -> LibraryExportService:
+    return LibraryExportService(track_repo, settings.EXPORT_CHUNK_SIZE)
+
+def get_library_import_service(
+    spotify_repo: SpotifyRepository = Depends(get_spotify_repository),
+    supabase_sync_service: AsyncSupabaseSyncService = Depends(get_async_supabase_sync_service),
+) -> LibraryImportService:
+    return LibraryImportService(spotify_repo, supabase_sync_service, settings.IMPORT_BATCH_SIZE)
+
+def get_library_reconcile_service(
+    spotify_repo: SpotifyRepository = Depends(get_uncached_spotify_repository),
+    track_repo: AsyncSupabaseRepository[SavedTrack] = Depends(get_async_supabase_track_repository),
+) -> LibraryReconcileService:
+    # La reconciliación solo lee la biblioteca: no debe dejar ETags de páginas sin guardar
+    return LibraryReconcileService(SyncService(spotify_repo), track_repo, settings.RECONCILE_CHUNK_SIZE)
+
+async def get_library_enrichment_service(
+    spotify_repo: SpotifyRepository = Depends(get_spotify_repository),
+) -> LibraryEnrichmentService:
+    supabase_client = await get_async_supabase_client()
+    return LibraryEnrichmentService(spotify_repo, supabase_client, settings.ENRICHMENT_CHUNK_SIZE)
+
+async def get_sync_enrichment_service(
+    spotify_repo: SpotifyRepository = Depends(get_spotify_repository),
+) -> Optional[LibraryEnrichmentService]:
+    """Enriquecimiento al final de cada sincronización, o None (sin crearlo) sin SYNC_ENRICHMENT_ENABLED."""
+    if not settings.SYNC_ENRICHMENT_ENABLED:
+        return None
+    return await get_library_enrichment_service(spotify_repo)
@@ -1,101 +1,468 @@
-from fastapi import APIRouter, Depends, Query
-from typing import List
+import asyncio
 from datetime import datetime
-from src.core.services.sync_service import SyncService
-from src.core.services.supabase_sync_service import SupabaseSyncService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import time
+from src.adapters.spotify.mapper import SpotifyRecordMapper
+from src.adapters.spotify.privacy_export import PrivacyExportError, aiter_library_tracks
+from src.adapters.spotify.scheduler import SpotifyRequestScheduler
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.adapters.supabase.pagination import InvalidCursorError
+from src.adapters.supabase.repository import SAVED_TRACK_WITH_RELATIONS
+from src.core.entities.sync import SyncSummary
+from src.core.entities.track import SavedTrack
+from src.core.repositories.spotify_repository import PAGE_NOT_MODIFIED
+from src.core.services.sync_service import MAX_PAGE_SIZE, SyncService
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+from src.core.services.library_enrichment import LibraryEnrichmentService
+from src.core.services.library_export import ExportFormat, LibraryExportService
+from src.core.services.library_import import IMPORTED_ADDED_AT, LibraryImportService
+from src.core.services.library_reconcile import LibraryChangedError, LibraryReconcileService
+from src.core.services.sync_jobs import SyncJobLimitError, SyncJobManager
+from src.core.services.sync_pipeline import SyncPipeline
+from src.infrastructure.shared_state import SharedState
+from src.infrastructure.single_flight import SingleFlight
 from src.presentation.api.v1 import deps
-from src.presentation.schemas.track import AlbumResponse, ArtistResponse, SavedTrackResponse
-from src.core.entities.track import Artist, Album, SavedTrack
+from src.presentation.schemas.track import (
+    EnrichmentResponse,
+    IncrementalSyncResponse,
+    LibraryImportResponse,
+    LibrarySyncResponse,
+    ReconcileResponse,
+    SavedTrackResponse,
+    SyncJobResponse,
+    TrackPageResponse,
+)
+from src.infrastructure.config.settings import settings
 import logging
 
 router = APIRouter()
 
+def _build_pipeline(
+    sync_service: SyncService,
+    supabase_sync_service: AsyncSupabaseSyncService,
+    concurrency: int,
+    enrichment_service: Optional[LibraryEnrichmentService],
+) -> SyncPipeline:
+    # Un mapper por trabajo: los artistas y álbumes se internan durante toda la sincronización
+    return SyncPipeline(
+        sync_service,
+        supabase_sync_service,
+        SpotifyRecordMapper().saved_track,
+        fetch_concurrency=concurrency,
+        map_concurrency=settings.SYNC_MAP_CONCURRENCY,
+        persist_concurrency=settings.SYNC_PERSIST_CONCURRENCY,
+        queue_size=settings.SYNC_QUEUE_SIZE,
+        enrichment_service=enrichment_service,
+    )
+
+@router.get(
+    "",
+    summary="Listar los tracks guardados en Supabase",
+    response_model=TrackPageResponse,
+    dependencies=[Depends(deps.get_spotify_token)],
+)
+async def list_stored_tracks(
+    limit: int = Query(50, description="Número máximo de tracks por página (1-100).", ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior."),
+    track_repo: AsyncSupabaseRepository[SavedTrack] = Depends(deps.get_async_supabase_track_repository),
+) -> TrackPageResponse:
+    """
+    Devuelve los tracks ya sincronizados, del más reciente al más antiguo según `added_at`,
+    con sus artistas y su álbum obtenidos en la misma consulta.
+
+    La paginación es por cursor: para la página siguiente, pasa el `next_cursor` recibido.
+    Cada página cuesta lo mismo sea la primera o la quingentésima. `next_cursor` es `null`
+    en la última página.
+
+    **Requiere autenticación previa.**
+    """
+    try:
+        tracks, next_cursor = await track_repo.get_page(
+            limit, cursor, order_column='added_at', select=SAVED_TRACK_WITH_RELATIONS
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return TrackPageResponse(
+        items=[SavedTrackResponse.from_entity(track) for track in tracks],
+        next_cursor=next_cursor,
+    )
+
+_EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+@router.get(
+    "/export",
+    summary="Exportar la biblioteca guardada (NDJSON o CSV)",
+    dependencies=[Depends(deps.get_spotify_token)],
+)
+async def export_library(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Formato de salida: `ndjson` o `csv`."),
+    gzip: bool = Query(False, description="Comprimir la exportación con gzip."),
+    export_service: LibraryExportService = Depends(deps.get_library_export_service),
+) -> StreamingResponse:
+    """
+    Descarga todos los tracks guardados en Supabase, con sus artistas y su álbum,
+    del más reciente al más antiguo.
+
+    La respuesta se envía en streaming mientras se lee Supabase por bloques, así que
+    la memoria del servidor no crece con el tamaño de la biblioteca. En CSV, los IDs y
+    nombres de los artistas de cada track van separados por `|`.
+
+    **Requiere autenticación previa.**
+    """
+    filename = f"library.{format.value}"
+    media_type = _EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    logging.info(f"📤 Exportando la biblioteca como {filename}")
+    return StreamingResponse(
+        export_service.stream(format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.post("/import", summary="Importar YourLibrary.json de los datos de cuenta", response_model=LibraryImportResponse)
+async def import_library(
+    request: Request,
+    added_at: Optional[datetime] = Query(
+        None,
+        description=(
+            "Fecha de guardado para los tracks nuevos (el archivo no la incluye). Por defecto, "
+            "1970-01-01T00:00:00Z, anterior a cualquier guardado real."
+        ),
+    ),
+    import_service: LibraryImportService = Depends(deps.get_library_import_service),
+    token: str = Depends(deps.get_spotify_token),
+) -> LibraryImportResponse:
+    """
+    Importa la biblioteca desde el `YourLibrary.json` de «Descargar tus datos» de Spotify.
+    Envía el archivo tal cual como cuerpo de la petición (`Content-Type: application/json`).
+
+    El cuerpo se procesa en streaming, sin cargar el archivo en memoria. Como el archivo
+    no trae los IDs de artistas y álbumes, cada lote se completa con `GET /tracks?ids=`
+    (50 IDs por petición) y se guarda en Supabase en lotes grandes. Los tracks que ya
+    estaban guardados conservan su `added_at`. Sin `added_at`, los nuevos reciben
+    IMPORTED_ADDED_AT: con la hora de la importación, la sincronización incremental
+    empezaría en ella y se saltaría los tracks guardados después de exportar el archivo.
+
+    **Requiere autenticación previa.**
+    """
+    added_at = added_at or IMPORTED_ADDED_AT
+    logging.info(f"📥 Importando YourLibrary.json (added_at={added_at.isoformat()})")
+    started = time.perf_counter()
+    try:
+        result = await import_service.run(aiter_library_tracks(request.stream()), token, added_at)
+    except PrivacyExportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    elapsed = time.perf_counter() - started
+    return LibraryImportResponse(
+        **result.model_dump(exclude={"summary"}),
+        summary=result.summary,
+        elapsed_seconds=elapsed,
+        tracks_per_second=result.summary.tracks_processed / elapsed if elapsed > 0 else 0.0,
+    )
+
 @router.get("/sync", summary="Obtener canciones guardadas de Spotify", response_model=List[SavedTrackResponse])
 async def sync_saved_tracks(
     offset: int = Query(0, description="El índice del primer elemento a devolver.", ge=0),
     limit: int = Query(10, description="El número máximo de elementos a devolver (1-50).", ge=1, le=50),
     sync_service: SyncService = Depends(deps.get_sync_service),
-    supabase_sync_service: SupabaseSyncService = Depends(deps.get_supabase_sync_service),
+    supabase_sync_service: AsyncSupabaseSyncService = Depends(deps.get_async_supabase_sync_service),
+    flights: SingleFlight = Depends(deps.get_sync_flights),
+    user: str = Depends(deps.get_spotify_user),
     token: str = Depends(deps.get_spotify_token),
 ) -> List[SavedTrackResponse]:
     """
     Obtiene una lista paginada de las canciones que el usuario ha guardado en su biblioteca de 'Me Gusta' en Spotify.
-    
+
+    Las peticiones simultáneas del mismo usuario con el mismo `offset` y `limit` (p. ej. un
+    reintento tras un timeout) comparten una sola descarga y un solo guardado, y reciben
+    la misma respuesta.
+
     **Requiere autenticación previa.**
     """
-    logging.info(f"🔍 Obteniendo canciones guardadas de Spotify (offset={offset}, limit={limit})")
-    spotify_tracks = await sync_service.get_saved_tracks(offset, limit, token)
-    logging.info(f"✅ Se encontraron {len(spotify_tracks)} canciones en Spotify")
-
-    response_tracks = []
-    saved_tracks = []
-
-    for i, item in enumerate(spotify_tracks, 1):
-        track = item['track']
-        logging.debug(f"Procesando track {i}/{len(spotify_tracks)}: {track['name']}")
-
-        # Build response objects
-        artists_response = [
-            ArtistResponse(
-                name=artist['name'],
-                spotify_id=artist['id'],
-                spotify_url=artist['external_urls']['spotify']
-            ) for artist in track['artists']
-        ]
-        album_response = AlbumResponse(
-            name=track['album']['name'],
-            spotify_id=track['album']['id'],
-            spotify_url=track['album']['external_urls']['spotify'],
-            release_date=track['album']['release_date']
-        )
-        saved_track_response = SavedTrackResponse(
-            added_at=item['added_at'],
-            spotify_track_id=track['id'],
-            track_name=track['name'],
-            artists=artists_response,
-            album=album_response,
-            spotify_url=track['external_urls']['spotify']
-        )
-        response_tracks.append(saved_track_response)
-
-        # Build SavedTrack entity for saving
-        artists_entity = [
-            Artist(
-                spotify_id=artist['id'],
-                name=artist['name'],
-                spotify_url=artist['external_urls']['spotify']
-            ) for artist in track['artists']
-        ]
-        album_artists_entity = [
-            Artist(
-                spotify_id=artist['id'],
-                name=artist['name'],
-                spotify_url=artist['external_urls']['spotify']
-            ) for artist in track['album'].get('artists', [])
-        ]
-        album_entity = Album(
-            spotify_id=track['album']['id'],
-            name=track['album']['name'],
-            release_date=track['album']['release_date'],
-            spotify_url=track['album']['external_urls']['spotify'],
-            album_type=track['album']['album_type'],
-            artists=album_artists_entity
-        )
-        saved_track_entity = SavedTrack(
-            spotify_track_id=track['id'],
-            track_name=track['name'],
-            artists=artists_entity,
-            album=album_entity,
-            spotify_url=track['external_urls']['spotify'],
-            added_at=datetime.fromisoformat(item['added_at'].replace('Z', '+00:00'))
-        )
-        saved_tracks.append(saved_track_entity)
+    async def fetch_and_save() -> List[SavedTrackResponse]:
+        logging.info(f"🔍 Obteniendo canciones guardadas de Spotify (offset={offset}, limit={limit})")
+        page = await sync_service.get_saved_tracks_page(offset, limit, token)
+        spotify_tracks = page.get("items", [])
+        logging.info(f"✅ Se encontraron {len(spotify_tracks)} canciones en Spotify")
+
+        saved_tracks = SpotifyRecordMapper().saved_tracks(spotify_tracks)
+        if len(saved_tracks) < len(spotify_tracks):
+            logging.warning(f"⚠️ Se omiten {len(spotify_tracks) - len(saved_tracks)} items de Spotify sin track")
+        response_tracks = [SavedTrackResponse.from_entity(track.to_entity()) for track in saved_tracks]
+
+        if page.get(PAGE_NOT_MODIFIED):
+            # La página no cambió desde que se descargó y guardó: no hay nada nuevo que escribir
+            logging.info("⏭️ Página sin cambios en Spotify (304); se omite el guardado en Supabase")
+            return response_tracks
+
+        logging.info(f"📦 Preparados {len(saved_tracks)} tracks para guardar en Supabase")
+
+        # Save to Supabase
+        logging.info("💾 Iniciando guardado en Supabase...")
+        summary = await supabase_sync_service.save_saved_tracks_batch(saved_tracks)
+        if not summary.failed_tracks:
+            # Solo una página guardada entera puede darse por guardada tras un 304
+            sync_service.remember_saved_tracks_page(offset, limit, page)
+        logging.info("✅ Proceso de sincronización completado exitosamente")
+
+        return response_tracks
 
-    logging.info(f"📦 Preparados {len(saved_tracks)} tracks para guardar en Supabase")
+    return await flights.do((user, offset, limit), fetch_and_save)
 
-    # Save to Supabase
-    logging.info("💾 Iniciando guardado en Supabase...")
-    supabase_sync_service.save_saved_tracks(saved_tracks)
-    logging.info("✅ Proceso de sincronización completado exitosamente")
+@router.get("/sync/spotify-stats", summary="Contadores del planificador de peticiones a Spotify")
+def spotify_request_stats(
+    scheduler: SpotifyRequestScheduler = Depends(deps.get_spotify_request_scheduler),
+) -> dict:
+    """
+    Devuelve los contadores del planificador compartido: peticiones enviadas, limitadas (429),
+    reintentadas y fallidas, junto con el límite de concurrencia actual.
+    """
+    return scheduler.stats()
+
+@router.get("/sync/library", summary="Sincronizar toda la biblioteca de Spotify", response_model=LibrarySyncResponse)
+async def sync_library(
+    page_size: int = Query(MAX_PAGE_SIZE, description="Canciones por página de Spotify (1-50).", ge=1, le=MAX_PAGE_SIZE),
+    concurrency: int = Query(
+        settings.SPOTIFY_PAGE_CONCURRENCY,
+        description="Número máximo de páginas pedidas a Spotify en paralelo.",
+        ge=1,
+        le=settings.SPOTIFY_MAX_PAGE_CONCURRENCY,
+    ),
+    sync_service: SyncService = Depends(deps.get_sync_service),
+    supabase_sync_service: AsyncSupabaseSyncService = Depends(deps.get_async_supabase_sync_service),
+    enrichment_service: Optional[LibraryEnrichmentService] = Depends(deps.get_sync_enrichment_service),
+    token: str = Depends(deps.get_spotify_token),
+) -> LibrarySyncResponse:
+    """
+    Sincroniza **toda** la biblioteca de canciones guardadas en una sola llamada.
+
+    Las páginas de Spotify se piden en paralelo (hasta `concurrency` a la vez), se convierten
+    a entidades y se guardan en Supabase en etapas encadenadas por colas acotadas, de modo que
+    la descarga, la conversión y el guardado se solapan y la memoria no crece con la biblioteca.
+    Con `SYNC_ENRICHMENT_ENABLED`, al final se completan los artistas y tracks pendientes
+    (ver `POST /sync/enrich`).
+
+    **Requiere autenticación previa.**
+    """
+    logging.info(f"🔍 Sincronizando biblioteca completa (page_size={page_size}, concurrency={concurrency})")
+    started = time.perf_counter()
+    pipeline = _build_pipeline(sync_service, supabase_sync_service, concurrency, enrichment_service)
+    summary = await pipeline.run(token, page_size)
 
-    return response_tracks
+    elapsed = time.perf_counter() - started
+    pages_per_second = pipeline.pages / elapsed if elapsed > 0 else 0.0
+    logging.info(
+        f"✅ Biblioteca sincronizada: {pipeline.pages} páginas, {summary.tracks_processed}/{pipeline.total} tracks "
+        f"en {elapsed:.2f}s ({pages_per_second:.2f} páginas/s)"
+    )
+    return LibrarySyncResponse(
+        total=pipeline.total,
+        pages=pipeline.pages,
+        elapsed_seconds=elapsed,
+        pages_per_second=pages_per_second,
+        summary=summary,
+        enrichment=pipeline.enrichment,
+    )
+
+@router.post(
+    "/sync-jobs",
+    summary="Iniciar una sincronización de la biblioteca en segundo plano",
+    response_model=SyncJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_sync_job(
+    page_size: int = Query(MAX_PAGE_SIZE, description="Canciones por página de Spotify (1-50).", ge=1, le=MAX_PAGE_SIZE),
+    concurrency: int = Query(
+        settings.SPOTIFY_PAGE_CONCURRENCY,
+        description="Número máximo de páginas pedidas a Spotify en paralelo.",
+        ge=1,
+        le=settings.SPOTIFY_MAX_PAGE_CONCURRENCY,
+    ),
+    sync_service: SyncService = Depends(deps.get_sync_service),
+    supabase_sync_service: AsyncSupabaseSyncService = Depends(deps.get_async_supabase_sync_service),
+    enrichment_service: Optional[LibraryEnrichmentService] = Depends(deps.get_sync_enrichment_service),
+    jobs: SyncJobManager = Depends(deps.get_sync_jobs),
+    user: str = Depends(deps.get_spotify_user),
+    token: str = Depends(deps.get_spotify_token),
+) -> SyncJobResponse:
+    """
+    Lanza la sincronización de **toda** la biblioteca como un trabajo en segundo plano y
+    responde de inmediato con su ID. El progreso se consulta con `GET /sync-jobs/{job_id}`.
+
+    Los trabajos de distintos usuarios (según su sesión) se ejecutan por turnos,
+    con un máximo de `SYNC_MAX_RUNNING_JOBS_PER_USER` en curso por usuario.
+    Si ya hay demasiados trabajos pendientes o en curso responde 429.
+
+    **Requiere autenticación previa.**
+    """
+    pipeline = _build_pipeline(sync_service, supabase_sync_service, concurrency, enrichment_service)
+    try:
+        job = jobs.start(pipeline, token, page_size, user)
+    except SyncJobLimitError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return SyncJobResponse(**job.status())
+
+@router.get("/sync-jobs", summary="Listar los trabajos de sincronización", response_model=List[SyncJobResponse])
+def list_sync_jobs(
+    jobs: SyncJobManager = Depends(deps.get_sync_jobs),
+    user: str = Depends(deps.get_spotify_user),
+) -> List[SyncJobResponse]:
+    """Devuelve los trabajos activos y los últimos terminados del usuario, del más reciente al más antiguo."""
+    return [SyncJobResponse(**job.status()) for job in jobs.list(user)]
+
+@router.get("/sync-jobs/{job_id}", summary="Consultar el progreso de un trabajo", response_model=SyncJobResponse)
+def get_sync_job(
+    job_id: str,
+    jobs: SyncJobManager = Depends(deps.get_sync_jobs),
+    user: str = Depends(deps.get_spotify_user),
+) -> SyncJobResponse:
+    """
+    Devuelve el estado del trabajo (`pending`, `running`, `completed`, `failed` o `cancelled`),
+    las páginas guardadas, los contadores de tracks creados y omitidos, el ritmo en tracks por
+    segundo y el error si lo hubo.
+    """
+    job = jobs.get(job_id)
+    if job is None or job.user != user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trabajo {job_id} no encontrado")
+    return SyncJobResponse(**job.status())
+
+@router.delete("/sync-jobs/{job_id}", summary="Cancelar un trabajo de sincronización", response_model=SyncJobResponse)
+async def cancel_sync_job(
+    job_id: str,
+    jobs: SyncJobManager = Depends(deps.get_sync_jobs),
+    user: str = Depends(deps.get_spotify_user),
+) -> SyncJobResponse:
+    """
+    Cancela un trabajo pendiente o en curso. Las páginas ya guardadas en Supabase se conservan,
+    así que una sincronización posterior continúa sin duplicar datos.
+    """
+    job = jobs.get(job_id)
+    if job is None or job.user != user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Trabajo {job_id} no encontrado")
+    jobs.cancel(job_id)
+    if job.task is not None and not job.task.done():
+        # Se espera a que la cancelación se aplique para devolver el estado final
+        await asyncio.wait({job.task})
+    return SyncJobResponse(**job.status())
+
+@router.get("/sync/incremental", summary="Sincronizar solo las canciones nuevas", response_model=IncrementalSyncResponse)
+async def sync_incremental(
+    sync_service: SyncService = Depends(deps.get_sync_service),
+    supabase_sync_service: AsyncSupabaseSyncService = Depends(deps.get_async_supabase_sync_service),
+    enrichment_service: Optional[LibraryEnrichmentService] = Depends(deps.get_sync_enrichment_service),
+    state: Optional[SharedState] = Depends(deps.get_shared_state),
+    user: str = Depends(deps.get_spotify_user),
+    token: str = Depends(deps.get_spotify_token),
+) -> IncrementalSyncResponse:
+    """
+    Sincroniza solo las canciones guardadas desde la última sincronización.
+
+    Usa como marca el `added_at` más reciente guardado en Supabase y pide páginas a Spotify
+    desde el principio hasta encontrar una canción anterior a esa marca. Si el usuario guardó
+    pocas canciones nuevas, basta con una llamada a Spotify. Cada página se guarda antes de
+    pedir la siguiente, así que sin marca (primera sincronización) la memoria no crece con
+    la biblioteca.
+
+    Con estado compartido entre workers (`SHARED_STATE_BACKEND`), la marca de cada usuario
+    se guarda allí y solo se consulta Supabase la primera vez.
+
+    **Requiere autenticación previa.**
+    """
+    started = time.perf_counter()
+    # SQLite bloquea: las lecturas y escrituras del estado compartido se hacen en un hilo
+    watermark = await asyncio.to_thread(state.get_watermark, user) if state is not None else None
+    stored_watermark = watermark
+    if watermark is None:
+        watermark = await supabase_sync_service.get_sync_watermark()
+    logging.info(f"🔍 Sincronización incremental desde {watermark.isoformat() if watermark else 'el principio'}")
+
+    # Un mapper para toda la sincronización: los artistas y álbumes se internan entre páginas
+    mapper = SpotifyRecordMapper()
+    summary = SyncSummary()
+    new_tracks = 0
+    latest = watermark
+    async for items in sync_service.iter_saved_tracks_since(token, watermark):
+        saved_tracks = mapper.saved_tracks(items)
+        summary.unavailable_tracks += len(items) - len(saved_tracks)
+        summary.accumulate(await supabase_sync_service.save_saved_tracks_batch(saved_tracks))
+        new_tracks += len(items)
+        page_latest = max((track.added_at for track in saved_tracks), default=None)
+        if page_latest is not None and (latest is None or page_latest > latest):
+            latest = page_latest
+
+    # Con tracks fallidos la marca no avanza: la próxima sincronización los vuelve a intentar
+    if state is not None and not summary.failed_tracks:
+        if latest is not None and latest != stored_watermark:
+            await asyncio.to_thread(state.put_watermark, user, latest)
+
+    enrichment = None
+    if enrichment_service is not None and new_tracks:
+        enrichment = await enrichment_service.run(token)
+
+    elapsed = time.perf_counter() - started
+    logging.info(f"✅ Sincronización incremental completada: {new_tracks} canciones nuevas en {elapsed:.2f}s")
+    return IncrementalSyncResponse(
+        watermark=watermark,
+        new_tracks=new_tracks,
+        elapsed_seconds=elapsed,
+        summary=summary,
+        enrichment=enrichment,
+    )
+
+@router.post("/sync/reconcile", summary="Borrar las canciones que ya no están guardadas en Spotify", response_model=ReconcileResponse)
+async def sync_reconcile(
+    dry_run: bool = Query(False, description="Solo cuenta las canciones que se borrarían."),
+    concurrency: int = Query(
+        settings.SPOTIFY_PAGE_CONCURRENCY,
+        description="Número máximo de páginas pedidas a Spotify en paralelo.",
+        ge=1,
+        le=settings.SPOTIFY_MAX_PAGE_CONCURRENCY,
+    ),
+    reconcile_service: LibraryReconcileService = Depends(deps.get_library_reconcile_service),
+    token: str = Depends(deps.get_spotify_token),
+) -> ReconcileResponse:
+    """
+    Elimina de Supabase las canciones que el usuario quitó de su biblioteca de Spotify.
+
+    La sincronización solo inserta, así que sin este paso las canciones eliminadas en Spotify
+    se quedan guardadas. Se leen todos los IDs de Spotify y de `spotify_tracks` en conjuntos
+    compactos y se borra la diferencia, junto con sus vínculos con artistas. Si la biblioteca
+    cambia durante la lectura no se borra nada y se responde `409`.
+
+    **Requiere autenticación previa.**
+    """
+    logging.info(f"🔍 Reconciliando canciones eliminadas (dry_run={dry_run}, concurrency={concurrency})")
+    started = time.perf_counter()
+    try:
+        summary = await reconcile_service.run(token, concurrency=concurrency, dry_run=dry_run)
+    except LibraryChangedError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return ReconcileResponse(**summary.model_dump(), elapsed_seconds=time.perf_counter() - started)
+
+@router.post("/sync/enrich", summary="Completar artistas y audio features desde Spotify", response_model=EnrichmentResponse)
+async def sync_enrich(
+    enrichment_service: LibraryEnrichmentService = Depends(deps.get_library_enrichment_service),
+    token: str = Depends(deps.get_spotify_token),
+) -> EnrichmentResponse:
+    """
+    Completa los artistas guardados con sus géneros, popularidad, seguidores e imagen, y los
+    tracks con sus audio features, pidiendo a Spotify solo las filas que aún no se consultaron.
+
+    Los IDs pendientes se agrupan en peticiones de `GET /artists?ids=` (50 por petición) y
+    `GET /audio-features?ids=` (100 por petición), y cada bloque se guarda con un único UPDATE.
+    Con `SYNC_ENRICHMENT_ENABLED` este paso se ejecuta al final de cada sincronización; sin él,
+    este endpoint completa la biblioteca bajo demanda.
+
+    **Requiere autenticación previa.**
+    """
+    logging.info("🔍 Enriqueciendo artistas y tracks pendientes")
+    started = time.perf_counter()
+    summary = await enrichment_service.run(token)
+    return EnrichmentResponse(**summary.model_dump(), elapsed_seconds=time.perf_counter() - started)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+from src.core.entities.sync import EnrichmentSummary, ImportSummary, ReconcileSummary, SyncJobState, SyncSummary
+from src.core.entities.track import Artist, Album, SavedTrack
 
 class ArtistResponse(BaseModel):
     """Schema de respuesta para un artista."""
@@ -8,12 +10,26 @@ class ArtistResponse(BaseModel):
     spotify_id: str
     spotify_url: HttpUrl
 
+    @classmethod
+    def from_entity(cls, artist: Artist) -> "ArtistResponse":
+        # La entidad ya está validada: se construye sin volver a validar la URL
+        return cls.model_construct(name=artist.name, spotify_id=artist.spotify_id, spotify_url=artist.spotify_url)
+
 class AlbumResponse(BaseModel):
     """Schema de respuesta para un album."""
     name: str
     spotify_id: str
-    spotify_url: HttpUrl
-    release_date: str
+    spotify_url: Optional[HttpUrl] = None
+    release_date: Optional[str] = None
+
+    @classmethod
+    def from_entity(cls, album: Album) -> "AlbumResponse":
+        return cls.model_construct(
+            name=album.name,
+            spotify_id=album.spotify_id,
+            spotify_url=album.spotify_url,
+            release_date=album.release_date,
+        )
 
 class SavedTrackResponse(BaseModel):
     """Schema de respuesta para una canción guardada."""
@@ -21,5 +37,68 @@ class SavedTrackResponse(BaseModel):
     spotify_track_id: str
     track_name: str
     artists: List[ArtistResponse]
-    album: AlbumResponse
+    # Los tracks guardados conservan la fila aunque se borre su álbum
+    album: Optional[AlbumResponse] = None
     spotify_url: HttpUrl
+
+    @classmethod
+    def from_entity(cls, track: SavedTrack) -> "SavedTrackResponse":
+        """Deriva la respuesta de la entidad ya construida por el mapper."""
+        return cls.model_construct(
+            added_at=track.added_at,
+            spotify_track_id=track.spotify_track_id,
+            track_name=track.track_name,
+            artists=[ArtistResponse.from_entity(artist) for artist in track.artists],
+            album=AlbumResponse.from_entity(track.album) if track.album is not None else None,
+            spotify_url=track.spotify_url,
+        )
+
+class TrackPageResponse(BaseModel):
+    """Schema de respuesta para una página de tracks guardados en Supabase."""
+    items: List[SavedTrackResponse]
+    next_cursor: Optional[str] = None
+
+class LibrarySyncResponse(BaseModel):
+    """Schema de respuesta para la sincronización de la biblioteca completa."""
+    total: int
+    pages: int
+    elapsed_seconds: float
+    pages_per_second: float
+    summary: SyncSummary
+    # Solo con SYNC_ENRICHMENT_ENABLED
+    enrichment: Optional[EnrichmentSummary] = None
+
+class IncrementalSyncResponse(BaseModel):
+    """Schema de respuesta para la sincronización incremental."""
+    watermark: Optional[datetime]
+    new_tracks: int
+    elapsed_seconds: float
+    summary: SyncSummary
+    enrichment: Optional[EnrichmentSummary] = None
+
+class LibraryImportResponse(ImportSummary):
+    """Schema de respuesta de la importación de `YourLibrary.json`, con su rendimiento."""
+    elapsed_seconds: float
+    tracks_per_second: float
+
+class ReconcileResponse(ReconcileSummary):
+    """Schema de respuesta de la reconciliación de canciones eliminadas."""
+    elapsed_seconds: float
+
+class EnrichmentResponse(EnrichmentSummary):
+    """Schema de respuesta del enriquecimiento de artistas y tracks."""
+    elapsed_seconds: float
+
+class SyncJobResponse(BaseModel):
+    """Schema de respuesta con el estado y el progreso de un trabajo de sincronización."""
+    id: str
+    user: str
+    state: SyncJobState
+    created_at: datetime
+    total: int
+    pages: int
+    elapsed_seconds: float
+    tracks_per_second: float
+    summary: SyncSummary
+    enrichment: Optional[EnrichmentSummary] = None
+    error: Optional[str]
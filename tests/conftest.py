@@ -0,0 +1,81 @@
+import os
+import socket
+
+import pytest
+import pytest_asyncio
+
+# Settings exige las credenciales de Spotify y el cliente de Supabase se crea al importarse;
+# los tests no llaman a ninguno de los dos servicios
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "test-client-id")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "test-client-secret")
+os.environ.setdefault("SPOTIFY_REDIRECT_URI", "http://127.0.0.1:8000/api/v1/auth/callback")
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
+
+import httpx  # noqa: E402
+from supabase import acreate_client, create_client  # noqa: E402
+
+from benchmarks.common import serve_in_thread  # noqa: E402
+from benchmarks.stand_ins import fake_postgrest, fake_spotify  # noqa: E402
+from src.adapters.spotify.scheduler import SpotifyRequestScheduler  # noqa: E402
+
+SERVICE_KEY = "test-service-key"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def postgrest_server():
+    """Stand-in de PostgREST (benchmarks/stand_ins) servido en un hilo durante toda la sesión."""
+    store = fake_postgrest.FakePostgrest()
+    with serve_in_thread(fake_postgrest.create_app(store), free_port()) as url:
+        yield store, url
+
+
+@pytest.fixture
+def postgrest(postgrest_server) -> fake_postgrest.FakePostgrest:
+    """Almacén del stand-in, vacío al empezar cada test."""
+    store, _ = postgrest_server
+    store.reset()
+    return store
+
+
+@pytest.fixture
+def supabase_client(postgrest, postgrest_server):
+    return create_client(postgrest_server[1], SERVICE_KEY)
+
+
+@pytest_asyncio.fixture
+async def async_supabase_client(postgrest, postgrest_server):
+    return await acreate_client(postgrest_server[1], SERVICE_KEY)
+
+
+@pytest.fixture
+def spotify_library() -> fake_spotify.FakeSpotifyLibrary:
+    return fake_spotify.FakeSpotifyLibrary(library_size=45, artist_pool=7, album_pool=9)
+
+
+@pytest_asyncio.fixture
+async def spotify_client(spotify_library):
+    """Cliente HTTP cuyas peticiones a la Web API llegan al stand-in de Spotify, sin red."""
+    transport = httpx.ASGITransport(app=fake_spotify.create_app(spotify_library))
+    async with httpx.AsyncClient(transport=transport) as client:
+        yield client
+
+
+@pytest.fixture
+def spotify_scheduler() -> SpotifyRequestScheduler:
+    """Planificador sin límite de ritmo efectivo y con esperas de milisegundos."""
+    return SpotifyRequestScheduler(
+        rate_per_second=10_000,
+        burst=100,
+        max_concurrency=4,
+        max_retries=2,
+        backoff_base=0.001,
+        backoff_max=0.002,
+        max_retry_after=1,
+    )
@@ -0,0 +1,77 @@
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.adapters.spotify import auth
+from src.infrastructure.config.settings import settings
+from src.presentation.api.v1 import auth as auth_router
+
+# Cuenta de Spotify que autoriza cada código de autorización
+ACCOUNTS = {"code-alice": "spotify-alice", "code-mallory": "spotify-mallory"}
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path) -> TestClient:
+    """Router de autenticación con `/api/token` y `/me` de Spotify simulados; los tokens van a tmp_path."""
+
+    def spotify(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/token":
+            code = parse_qs(request.content.decode())["code"][0]
+            return httpx.Response(200, json={"access_token": f"token-{code}", "refresh_token": "r", "expires_in": 3600})
+        if request.url.path == "/v1/me":
+            code = request.headers["Authorization"].removeprefix("Bearer token-")
+            return httpx.Response(200, json={"id": ACCOUNTS[code]})
+        return httpx.Response(404)
+
+    accounts_client = httpx.Client(transport=httpx.MockTransport(spotify))
+    monkeypatch.setattr(auth, "get_spotify_accounts_client", lambda: accounts_client)
+    monkeypatch.setattr(auth, "TOKEN_FILE", str(tmp_path / "token.json"))
+    monkeypatch.setattr(settings, "SPOTIFY_TOKEN_DIR", str(tmp_path / "tokens"))
+    monkeypatch.setattr(auth, "_token_storage", {})
+    monkeypatch.setattr(auth, "_oauth_states", {})
+    monkeypatch.setattr(auth, "_sessions", {})
+
+    app = FastAPI()
+    app.include_router(auth_router.router, prefix="/api/v1/auth")
+    return TestClient(app)
+
+
+def login(api: TestClient, code: str, user: str = "alice") -> httpx.Response:
+    auth_url = api.get("/api/v1/auth/login", params={"user": user}).json()["auth_url"]
+    state = parse_qs(urlparse(auth_url).query)["state"][0]
+    return api.get("/api/v1/auth/callback", params={"code": code, "state": state})
+
+
+def status(api: TestClient, **headers) -> httpx.Response:
+    return api.get("/api/v1/auth/status", headers=headers)
+
+
+def test_the_session_issued_by_the_callback_selects_the_user(api):
+    session = login(api, "code-alice").json()["session_token"]
+
+    assert status(api, Authorization=f"Bearer {session}").json() == {"status": "authenticated"}
+    # Sin sesión se usa el usuario por defecto, que no ha iniciado sesión
+    assert status(api).json() == {"status": "not authenticated"}
+    assert status(api, **{"X-Spotify-User": "alice"}).json() == {"status": "not authenticated"}
+
+
+def test_unknown_or_missing_session_is_rejected(api, monkeypatch):
+    assert status(api, Authorization="Bearer forged").status_code == 401
+
+    monkeypatch.setattr(settings, "SPOTIFY_REQUIRE_SESSION", True)
+    assert status(api).status_code == 401
+
+
+def test_login_with_another_spotify_account_cannot_take_over_a_user(api):
+    login(api, "code-alice")
+
+    response = login(api, "code-mallory")
+
+    assert response.status_code == 403
+    assert auth.get_access_token("alice") == "token-code-alice"
+    # El dueño puede volver a iniciar sesión, y el refresco conserva la cuenta del token
+    assert login(api, "code-alice").json()["status"] == "success"
+    assert auth._store_token({"access_token": "refreshed", "expires_in": 3600}, "alice")["spotify_user_id"] == "spotify-alice"
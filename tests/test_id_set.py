@@ -0,0 +1,69 @@
+import random
+import string
+
+import pytest
+
+from src.infrastructure.id_set import PackedIdSet, PackedIdSetBuilder
+
+
+def random_ids(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+    return ["".join(rng.choices(alphabet, k=22)) for _ in range(count)]
+
+
+def test_difference_matches_set_difference():
+    ids = random_ids(3000)
+    mine = ids[:2000]
+    theirs = ids[1000:] + random_ids(500, seed=1)
+
+    difference = list(PackedIdSet.from_ids(mine).difference(PackedIdSet.from_ids(theirs)))
+
+    assert difference == sorted(set(mine) - set(theirs))
+
+
+def test_difference_with_empty_sets():
+    ids = PackedIdSet.from_ids(["b", "a"])
+
+    assert list(ids.difference(PackedIdSet())) == ["a", "b"]
+    assert list(PackedIdSet().difference(ids)) == []
+    assert list(ids.difference(ids)) == []
+
+
+def test_difference_does_not_confuse_prefixes():
+    # Los IDs cortos se rellenan con bytes nulos: "ab" y "abc" son registros distintos
+    mine = PackedIdSet.from_ids(["ab", "abc", "abd"])
+    theirs = PackedIdSet.from_ids(["abc"])
+
+    assert list(mine.difference(theirs)) == ["ab", "abd"]
+
+
+def test_difference_requires_the_same_width():
+    with pytest.raises(ValueError):
+        list(PackedIdSet.from_ids(["a"], width=4).difference(PackedIdSet.from_ids(["a"], width=8)))
+
+
+def test_builder_merges_runs_and_removes_duplicates():
+    ids = random_ids(1000)
+    builder = PackedIdSetBuilder(run_size=64)
+    builder.update(ids)
+    builder.update(reversed(ids[:300]))
+
+    packed = builder.build()
+
+    assert len(packed) == 1000
+    assert packed.nbytes == 1000 * 22
+    assert list(packed) == sorted(ids)
+
+
+def test_membership():
+    ids = random_ids(200)
+    packed = PackedIdSet.from_ids(ids[:100])
+
+    assert all(spotify_id in packed for spotify_id in ids[:100])
+    assert not any(spotify_id in packed for spotify_id in ids[100:])
+
+
+def test_rejects_ids_longer_than_the_width():
+    with pytest.raises(ValueError):
+        PackedIdSet.from_ids(["x" * 23])
@@ -0,0 +1,46 @@
+import pytest
+
+from benchmarks.stand_ins.fake_spotify import spotify_id
+from src.adapters.spotify.repository import SpotifyAPIRepository
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.core.entities.track import Album, Artist, SavedTrack
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+from src.core.services.library_import import IMPORTED_ADDED_AT, LibraryImportService
+from src.core.services.sync_service import SyncService
+from src.presentation.api.v1 import tracks
+
+# El archivo se exportó cuando la biblioteca tenía los 30 tracks más antiguos
+EXPORTED = 30
+
+
+def supabase_sync_service(client) -> AsyncSupabaseSyncService:
+    return AsyncSupabaseSyncService(
+        AsyncSupabaseRepository(client, Artist, "spotify_artists"),
+        AsyncSupabaseRepository(client, Album, "spotify_albums"),
+        AsyncSupabaseRepository(client, SavedTrack, "spotify_tracks", owner="me"),
+        client,
+    )
+
+
+async def exported_records():
+    for index in reversed(range(EXPORTED)):
+        yield {"uri": f"spotify:track:{spotify_id('track', index)}"}
+
+
+@pytest.mark.asyncio
+async def test_import_without_added_at_does_not_advance_the_watermark(
+    postgrest, async_supabase_client, spotify_client, spotify_scheduler
+):
+    spotify_repo = SpotifyAPIRepository(spotify_client, spotify_scheduler, user="me")
+    supabase = supabase_sync_service(async_supabase_client)
+
+    result = await LibraryImportService(spotify_repo, supabase).run(exported_records(), "token")
+
+    assert result.summary.created_tracks == EXPORTED
+    assert await supabase.get_sync_watermark() == IMPORTED_ADDED_AT
+
+    # Los 15 tracks guardados después de exportar el archivo llegan con la incremental
+    response = await tracks.sync_incremental(SyncService(spotify_repo), supabase, None, None, "me", "token")
+
+    assert response.summary.created_tracks == 45 - EXPORTED
+    assert len(postgrest.tables["spotify_tracks"]) == 45
@@ -0,0 +1,82 @@
+from typing import List
+
+import pytest
+
+from src.adapters.spotify.page_cache import get_page_cache
+from src.core.services.library_reconcile import LibraryChangedError, LibraryReconcileService
+from src.presentation.api.v1 import deps
+
+
+def page(offset: int, total: int, tracks: List) -> dict:
+    items = [{"track": None if track is None else {"id": track}} for track in tracks]
+    return {"offset": offset, "total": total, "items": items}
+
+
+class FakeSyncService:
+    def __init__(self, pages: List[dict]):
+        self.pages = pages
+
+    async def iter_saved_track_pages(self, token, page_size, concurrency):
+        for library_page in self.pages:
+            yield library_page
+
+
+class FakeTrackRepository:
+    def __init__(self, stored_ids: List[str]):
+        self.stored_ids = stored_ids
+        self.deleted: List[str] = []
+
+    async def iter_rows(self, chunk_size, order_column, select):
+        yield [{"spotify_track_id": spotify_id} for spotify_id in self.stored_ids]
+
+    async def delete_by_spotify_ids(self, spotify_ids):
+        self.deleted.extend(spotify_ids)
+        return len(spotify_ids)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_deletes_stored_tracks_missing_from_spotify():
+    repo = FakeTrackRepository(["a", "b", "c", "d"])
+    service = LibraryReconcileService(FakeSyncService([page(0, 3, ["a", "c", "e"])]), repo)
+
+    summary = await service.run("token")
+
+    assert sorted(repo.deleted) == ["b", "d"]
+    assert (summary.spotify_tracks, summary.stored_tracks, summary.stale_tracks) == (3, 4, 2)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_accounts_for_items_without_track():
+    repo = FakeTrackRepository(["a", "b"])
+    pages = [page(0, 4, ["a", None]), page(2, 4, [None, "c"])]
+
+    summary = await LibraryReconcileService(FakeSyncService(pages), repo).run("token", page_size=2)
+
+    assert summary.unavailable_tracks == 2
+    assert summary.spotify_tracks == 2
+    assert repo.deleted == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_deletes_nothing_when_pages_are_missing():
+    repo = FakeTrackRepository(["a", "b"])
+    service = LibraryReconcileService(FakeSyncService([page(0, 3, ["a", None])]), repo)
+
+    with pytest.raises(LibraryChangedError):
+        await service.run("token")
+    assert repo.deleted == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_does_not_cache_the_pages_it_reads(spotify_library, spotify_client, spotify_scheduler):
+    page_cache = get_page_cache()
+    page_cache.clear()
+    spotify_repo = deps.get_uncached_spotify_repository(spotify_client, spotify_scheduler, "me")
+    service = deps.get_library_reconcile_service(spotify_repo, FakeTrackRepository(["gone"]))
+
+    summary = await service.run("token", page_size=10)
+
+    assert (summary.spotify_tracks, summary.deleted_tracks) == (45, 1)
+    # La siguiente sincronización debe descargar (y guardar) las páginas, no recibir 304
+    assert len(page_cache) == 0
+    assert spotify_library.requests["304"] == 0
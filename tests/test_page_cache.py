@@ -0,0 +1,121 @@
+from typing import List, Optional
+
+import pytest
+
+from benchmarks.stand_ins.fake_spotify import spotify_id
+from src.adapters.spotify.mapper import SpotifyRecordMapper
+from src.adapters.spotify.repository import SpotifyAPIRepository
+from src.core.entities.sync import SyncSummary
+from src.core.repositories.spotify_repository import PAGE_ETAG, PAGE_NOT_MODIFIED
+from src.core.services.sync_pipeline import SyncPipeline
+from src.core.services.sync_service import SyncService
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.single_flight import SingleFlight
+from src.presentation.api.v1 import tracks
+
+PAGE_SIZE = 10
+
+
+class FakeSupabaseSyncService:
+    """Guardado que falla para los tracks de `failing_ids`, o entero con `error`."""
+
+    def __init__(self, failing_ids=(), error: Optional[Exception] = None):
+        self.failing_ids = set(failing_ids)
+        self.error = error
+        self.saved: List[str] = []
+
+    async def get_sync_watermark(self):
+        return None
+
+    async def save_saved_tracks_batch(self, batch) -> SyncSummary:
+        if self.error is not None:
+            raise self.error
+        failed = sum(1 for track in batch if track.spotify_track_id in self.failing_ids)
+        self.saved.extend(track.spotify_track_id for track in batch)
+        return SyncSummary(tracks_processed=len(batch), created_tracks=len(batch) - failed, failed_tracks=failed)
+
+
+@pytest.fixture
+def page_cache() -> LRUCache:
+    return LRUCache(100)
+
+
+@pytest.fixture
+def sync_service(spotify_client, spotify_scheduler, page_cache) -> SyncService:
+    return SyncService(SpotifyAPIRepository(spotify_client, spotify_scheduler, page_cache=page_cache, user="me"))
+
+
+def pipeline(sync_service: SyncService, supabase_sync_service) -> SyncPipeline:
+    return SyncPipeline(sync_service, supabase_sync_service, SpotifyRecordMapper().saved_track, fetch_concurrency=2)
+
+
+@pytest.mark.asyncio
+async def test_page_is_cached_only_once_remembered(sync_service, spotify_library, page_cache):
+    page = await sync_service.get_saved_tracks_page(0, PAGE_SIZE, "token")
+    assert page[PAGE_ETAG] and len(page_cache) == 0
+
+    # Sin guardar, la siguiente petición vuelve a descargar la página
+    page = await sync_service.get_saved_tracks_page(0, PAGE_SIZE, "token")
+    assert not page.get(PAGE_NOT_MODIFIED)
+
+    sync_service.remember_saved_tracks_page(0, PAGE_SIZE, page)
+    cached = await sync_service.get_saved_tracks_page(0, PAGE_SIZE, "token")
+
+    assert cached[PAGE_NOT_MODIFIED]
+    assert PAGE_ETAG not in cached
+    assert cached["items"] == page["items"]
+    assert spotify_library.requests["304"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_downloads_again_the_pages_that_failed_to_save(sync_service):
+    # Posición 12 de la biblioteca (segunda página): el índice 45 - 1 - 12
+    failing = FakeSupabaseSyncService(failing_ids=[spotify_id("track", 32)])
+    await pipeline(sync_service, failing).run("token", PAGE_SIZE)
+
+    summary = await pipeline(sync_service, FakeSupabaseSyncService()).run("token", PAGE_SIZE)
+
+    assert (summary.pages_downloaded, summary.pages_not_modified) == (1, 4)
+    assert summary.tracks_processed == PAGE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_failed_pipeline_leaves_no_page_cached(sync_service, page_cache):
+    with pytest.raises(RuntimeError):
+        await pipeline(sync_service, FakeSupabaseSyncService(error=RuntimeError("supabase caído"))).run("token", PAGE_SIZE)
+
+    assert len(page_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_endpoint_caches_the_page_after_saving_it(sync_service, spotify_library):
+    supabase = FakeSupabaseSyncService(failing_ids=[spotify_id("track", 44)])
+
+    async def sync_page():
+        return await tracks.sync_saved_tracks(
+            0, PAGE_SIZE, sync_service, supabase, SingleFlight("test"), "me", "token"
+        )
+
+    await sync_page()
+    supabase.failing_ids.clear()
+    await sync_page()
+    assert len(supabase.saved) == 2 * PAGE_SIZE
+
+    # Guardada entera: la tercera vez Spotify responde 304 y no se vuelve a guardar
+    assert len(await sync_page()) == PAGE_SIZE
+    assert len(supabase.saved) == 2 * PAGE_SIZE
+    assert spotify_library.requests["304"] == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_never_caches_pages(sync_service, page_cache):
+    with pytest.raises(RuntimeError):
+        await tracks.sync_incremental(
+            sync_service, FakeSupabaseSyncService(error=RuntimeError("supabase caído")), None, None, "me", "token"
+        )
+    assert len(page_cache) == 0
+
+    response = await tracks.sync_incremental(sync_service, FakeSupabaseSyncService(), None, None, "me", "token")
+
+    assert response.new_tracks == 45
+    assert len(page_cache) == 0
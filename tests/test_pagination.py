@@ -0,0 +1,39 @@
+import pytest
+
+from src.adapters.supabase.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_filter
+
+
+def test_cursor_round_trip_keeps_values_exactly():
+    cursor = encode_cursor("2024-03-01T12:00:00.123456+00:00", "6f1c2d9e-0000-4000-8000-000000000001")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-03-01T12:00:00.123456+00:00", "6f1c2d9e-0000-4000-8000-000000000001")
+
+
+@pytest.mark.parametrize("cursor", ["garbage!!", "", encode_cursor("a", "b")[:-3], "WzEsMl0"])
+def test_decode_rejects_invalid_cursors(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_descending():
+    cursor = encode_cursor("2024-03-01T12:00:00+00:00", "row-1")
+
+    assert keyset_filter("added_at", cursor) == (
+        'added_at.lt."2024-03-01T12:00:00+00:00",'
+        'and(added_at.eq."2024-03-01T12:00:00+00:00",id.lt."row-1")'
+    )
+
+
+def test_keyset_filter_ascending_quotes_special_characters():
+    cursor = encode_cursor('a,b."c"', "row\\1")
+
+    assert keyset_filter("track_name", cursor, descending=False) == (
+        'track_name.gt."a,b.\\"c\\"",'
+        'and(track_name.eq."a,b.\\"c\\"",id.gt."row\\\\1")'
+    )
+
+
+def test_keyset_filter_rejects_invalid_cursor():
+    with pytest.raises(InvalidCursorError):
+        keyset_filter("added_at", "not-a-cursor")
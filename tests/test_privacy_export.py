@@ -0,0 +1,86 @@
+import io
+import json
+
+import pytest
+
+from src.adapters.spotify.privacy_export import (
+    JsonArrayStream,
+    PrivacyExportError,
+    iter_library_tracks,
+    track_id_from_uri,
+)
+
+LIBRARY = {
+    "artists": [{"name": "Björk", "uri": "spotify:artist:7w29UYBi0qsHi5RTcv3lmA"}],
+    "tracks": [
+        {"artist": "Sigur Rós", "track": "Svefn-g-englar", "uri": "spotify:track:6eTGxxQxiTFE6LfZHC33Wm"},
+        {"artist": "坂本龍一", "track": "Merry Christmas Mr. Lawrence", "uri": "spotify:track:1a2b3c"},
+        {"track": "Local", "uri": None, "plays": 12345, "rating": -0.25, "tags": [[], {}, "]}"]},
+    ],
+    "shows": {"nested": {"tracks": [1, 2, 3]}},
+    "count": 1234567,
+}
+DOCUMENT = json.dumps(LIBRARY, ensure_ascii=False, indent=1).encode()
+
+
+def feed_in_chunks(data: bytes, boundaries) -> list:
+    stream = JsonArrayStream("tracks")
+    items, start = [], 0
+    for end in list(boundaries) + [len(data)]:
+        items.extend(stream.feed(data[start:end]))
+        start = end
+    items.extend(stream.feed(b"", final=True))
+    return items
+
+
+def test_single_chunk():
+    assert feed_in_chunks(DOCUMENT, []) == LIBRARY["tracks"]
+
+
+def test_one_byte_chunks_split_multibyte_characters_and_numbers():
+    assert feed_in_chunks(DOCUMENT, range(1, len(DOCUMENT))) == LIBRARY["tracks"]
+
+
+@pytest.mark.parametrize("split", range(0, len(DOCUMENT), 7))
+def test_two_chunks_split_anywhere(split):
+    assert feed_in_chunks(DOCUMENT, [split]) == LIBRARY["tracks"]
+
+
+def test_items_are_returned_as_soon_as_they_are_complete():
+    stream = JsonArrayStream("tracks")
+    first_item_end = DOCUMENT.index(b"}", DOCUMENT.index(b'"tracks"')) + 1
+
+    assert stream.feed(DOCUMENT[:first_item_end]) == LIBRARY["tracks"][:1]
+    assert stream.feed(DOCUMENT[first_item_end:], final=True) == LIBRARY["tracks"][1:]
+
+
+def test_number_at_the_end_of_a_chunk_waits_for_the_next_one():
+    stream = JsonArrayStream("tracks")
+
+    assert stream.feed(b'{"tracks": [12') == []
+    assert stream.feed(b'34, 5]}', final=True) == [1234, 5]
+
+
+def test_truncated_document_fails():
+    with pytest.raises(PrivacyExportError):
+        feed_in_chunks(DOCUMENT[:-10], range(1, len(DOCUMENT) - 10, 64))
+
+
+def test_top_level_must_be_an_object():
+    with pytest.raises(PrivacyExportError):
+        JsonArrayStream("tracks").feed(b'[{"tracks": []}]')
+
+
+def test_missing_key_is_reported():
+    with pytest.raises(PrivacyExportError):
+        list(iter_library_tracks(io.BytesIO(b'{"artists": []}')))
+
+
+def test_iter_library_tracks_reads_in_small_chunks():
+    assert list(iter_library_tracks(io.BytesIO(DOCUMENT), chunk_size=5)) == LIBRARY["tracks"]
+
+
+def test_track_id_from_uri():
+    assert track_id_from_uri("spotify:track:6eTGxxQxiTFE6LfZHC33Wm") == "6eTGxxQxiTFE6LfZHC33Wm"
+    assert track_id_from_uri("spotify:episode:abc") is None
+    assert track_id_from_uri(None) is None
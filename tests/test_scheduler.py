@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.adapters.spotify import scheduler as scheduler_module
+from src.adapters.spotify.scheduler import FairTokenBucket, SpotifyAPIError, SpotifyRequestScheduler
+
+URL = "https://api.spotify.com/v1/me/tracks"
+
+
+class StubSpotify:
+    """
+    Transporte de prueba: responde en orden con `responses` (un código de estado, un
+    par (código, cabeceras) o una excepción), repitiendo la última. Anota cuándo llega
+    cada petición y cuántas hay en curso a la vez.
+    """
+
+    def __init__(self, *responses, latency: float = 0.0):
+        self.responses = list(responses)
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(time.monotonic())
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if isinstance(response, Exception):
+            raise response
+        status_code, headers = response if isinstance(response, tuple) else (response, {})
+        return httpx.Response(status_code, headers=headers, json={})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+
+def make_scheduler(**overrides) -> SpotifyRequestScheduler:
+    options = dict(
+        rate_per_second=10_000,
+        burst=100,
+        max_concurrency=4,
+        max_retries=2,
+        backoff_base=0.001,
+        backoff_max=0.002,
+        max_retry_after=1,
+    )
+    return SpotifyRequestScheduler(**{**options, **overrides})
+
+
+async def acquire_all(bucket: FairTokenBucket, requests) -> list:
+    served = []
+
+    async def request(key, name):
+        await bucket.acquire(key)
+        served.append(name)
+
+    tasks = []
+    for key, name in requests:
+        tasks.append(asyncio.create_task(request(key, name)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return served
+
+
+@pytest.mark.asyncio
+async def test_acquire_is_immediate_while_tokens_remain():
+    bucket = FairTokenBucket(rate=1, capacity=3)
+
+    await asyncio.wait_for(acquire_all(bucket, [("a", 1), ("a", 2), ("b", 3)]), timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_waiting_keys_take_turns():
+    bucket = FairTokenBucket(rate=500, capacity=1)
+    requests = [("heavy", f"heavy-{i}") for i in range(6)] + [("light", "light-0"), ("light", "light-1")]
+
+    served = await acquire_all(bucket, requests)
+
+    # El primero se sirve con el token disponible; después, un turno para cada usuario
+    assert served[:5] == ["heavy-0", "heavy-1", "light-0", "heavy-2", "light-1"]
+    assert served[5:] == ["heavy-3", "heavy-4", "heavy-5"]
+    assert bucket.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_does_not_block_the_queue():
+    bucket = FairTokenBucket(rate=200, capacity=1)
+    await bucket.acquire("a")
+    cancelled = asyncio.create_task(bucket.acquire("a"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.wait_for(bucket.acquire("b"), timeout=1)
+
+    assert cancelled.cancelled()
+    assert bucket.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_429_waits_retry_after_and_pauses_every_caller():
+    stub = StubSpotify((429, {"Retry-After": "0.1"}), 200)
+    scheduler = make_scheduler()
+
+    async with stub.client() as client:
+        response = await scheduler.request(client, "GET", URL)
+        # La pausa es global: una petición nueva durante la pausa también espera
+        stub.responses = [(429, {"Retry-After": "0.1"}), 200]
+        throttled = asyncio.create_task(scheduler.request(client, "GET", URL))
+        await asyncio.sleep(0.01)
+        await scheduler.request(client, "GET", URL)
+        await throttled
+
+    assert response.status_code == 200
+    assert stub.calls[1] - stub.calls[0] >= 0.1
+    assert stub.calls[3] - stub.calls[2] >= 0.1
+    assert (scheduler.counters["throttled"], scheduler.counters["retried"], scheduler.counters["failed"]) == (2, 2, 0)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_above_the_limit_fails_without_retrying():
+    stub = StubSpotify((429, {"Retry-After": "30"}))
+    scheduler = make_scheduler(max_retry_after=1)
+
+    async with stub.client() as client:
+        with pytest.raises(SpotifyAPIError) as error:
+            await scheduler.request(client, "GET", URL)
+
+    assert error.value.status_code == 429
+    assert len(stub.calls) == 1
+    assert scheduler.counters["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_errors_back_off_exponentially_up_to_max_retries(monkeypatch):
+    # Sin jitter: cada espera es el máximo del intento
+    monkeypatch.setattr(scheduler_module.random, "uniform", lambda low, high: high)
+    stub = StubSpotify(503)
+    scheduler = make_scheduler(max_retries=3, backoff_base=0.02, backoff_max=0.05)
+
+    async with stub.client() as client:
+        with pytest.raises(SpotifyAPIError) as error:
+            await scheduler.request(client, "GET", URL)
+
+    assert error.value.status_code == 503
+    assert len(stub.calls) == 4
+    gaps = [later - earlier for earlier, later in zip(stub.calls, stub.calls[1:])]
+    # 0.02 * 2**intento, con tope en backoff_max
+    for gap, expected in zip(gaps, [0.02, 0.04, 0.05]):
+        assert gap >= expected
+    assert scheduler.counters["server_errors"] == 4
+    assert (scheduler.counters["retried"], scheduler.counters["failed"]) == (3, 1)
+
+
+@pytest.mark.asyncio
+async def test_server_and_transport_errors_are_retried_until_success():
+    stub = StubSpotify(500, httpx.ConnectError("connection refused"), 200)
+    scheduler = make_scheduler()
+
+    async with stub.client() as client:
+        response = await scheduler.request(client, "GET", URL)
+
+    assert response.status_code == 200
+    assert (scheduler.counters["server_errors"], scheduler.counters["transport_errors"]) == (1, 1)
+    assert scheduler.counters["retried"] == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    stub = StubSpotify(404, 200)
+    scheduler = make_scheduler()
+
+    async with stub.client() as client:
+        with pytest.raises(SpotifyAPIError) as error:
+            await scheduler.request(client, "GET", URL)
+
+    assert error.value.status_code == 404
+    assert len(stub.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_throttling_halves_concurrency_and_successes_restore_it_additively():
+    stub = StubSpotify((429, {"Retry-After": "0"}), (429, {"Retry-After": "0"}), 200, latency=0.01)
+    scheduler = make_scheduler(max_concurrency=4, max_retries=1)
+
+    async with stub.client() as client:
+        with pytest.raises(SpotifyAPIError):
+            await scheduler.request(client, "GET", URL)
+        # 4 -> 2 -> 1 tras dos 429
+        assert scheduler.concurrency_limit == 1
+
+        await asyncio.gather(*(scheduler.request(client, "GET", URL) for _ in range(2)))
+        # Con límite 1 la segunda petición espera a que termine la primera
+        assert stub.peak_in_flight == 1
+        # +1/límite por éxito: 1 -> 2 -> 2.5
+        assert scheduler.concurrency_limit == 2
+
+        for _ in range(20):
+            await scheduler.request(client, "GET", URL)
+
+    # El aumento aditivo no pasa de max_concurrency
+    assert scheduler.concurrency_limit == 4
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from src.adapters.supabase.serialization import get_entity_plan
+from src.core.entities.track import SavedTrack
+from src.presentation.schemas.track import SavedTrackResponse, TrackPageResponse
+
+
+def stored_track_row(**album_columns) -> dict:
+    """Fila de `spotify_tracks` como la devuelve `SAVED_TRACK_WITH_RELATIONS`."""
+    album = {
+        "id": str(uuid4()),
+        "spotify_id": "album1",
+        "name": "Album",
+        "release_date": "2020-01-01",
+        "spotify_url": "https://open.spotify.com/album/album1",
+        "album_type": "album",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-01-01T00:00:00+00:00",
+    }
+    album.update(album_columns)
+    return {
+        "id": str(uuid4()),
+        "spotify_track_id": "track1",
+        "track_name": "Track",
+        "spotify_url": "https://open.spotify.com/track/track1",
+        "album_id": album["id"],
+        "added_at": "2024-03-01T12:00:00+00:00",
+        "created_at": "2024-03-01T12:00:01+00:00",
+        "updated_at": "2024-03-01T12:00:01+00:00",
+        "album": album,
+        "artists": [
+            {"id": str(uuid4()), "spotify_id": "artist1", "name": "Artist",
+             "spotify_url": "https://open.spotify.com/artist/artist1"},
+        ],
+    }
+
+
+def test_decode_embeds_album_and_artists():
+    track = get_entity_plan(SavedTrack, "spotify_tracks").decode(stored_track_row())
+
+    assert track.spotify_track_id == "track1"
+    assert track.added_at == datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+    assert track.album.release_date == "2020-01-01"
+    assert [artist.spotify_id for artist in track.artists] == ["artist1"]
+
+
+def test_decode_accepts_null_album_columns():
+    row = stored_track_row(release_date=None, spotify_url=None, album_type=None)
+
+    track = get_entity_plan(SavedTrack, "spotify_tracks").decode(row)
+    page = TrackPageResponse(items=[SavedTrackResponse.from_entity(track)], next_cursor=None)
+
+    album = page.model_dump(mode="json")["items"][0]["album"]
+    assert album["release_date"] is None
+    assert album["spotify_url"] is None
+    assert album["spotify_id"] == "album1"
+
+
+def test_decode_without_album():
+    row = stored_track_row()
+    row["album"] = None
+
+    track = get_entity_plan(SavedTrack, "spotify_tracks").decode(row)
+
+    assert track.album is None
+    assert SavedTrackResponse.from_entity(track).album is None
@@ -0,0 +1,95 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.infrastructure.shared_state import SQLiteSharedState
+
+
+@pytest.fixture
+def state(tmp_path):
+    return SQLiteSharedState(str(tmp_path / "state" / "shared.db"))
+
+
+def test_token_round_trip_is_per_user(state):
+    state.put_token("me", {"access_token": "a", "expires_at": 1})
+    state.put_token("me", {"access_token": "b", "expires_at": 2})
+
+    assert state.get_token("me") == {"access_token": "b", "expires_at": 2}
+    assert state.get_token("alice") is None
+
+
+def test_state_is_shared_between_instances(state, tmp_path):
+    state.put_token("me", {"access_token": "a"})
+
+    other = SQLiteSharedState(str(tmp_path / "state" / "shared.db"))
+
+    assert other.get_token("me") == {"access_token": "a"}
+
+
+def test_watermark_only_moves_forward(state):
+    latest = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+    state.put_watermark("me", latest)
+    state.put_watermark("me", latest - timedelta(days=1))
+
+    assert state.get_watermark("me") == latest
+    assert state.get_watermark("alice") is None
+
+
+def test_ids_round_trip_beyond_the_in_chunk_size(state):
+    ids = {f"track{i}": uuid.uuid4() for i in range(1200)}
+    state.put_ids("tracks", ids)
+
+    assert state.get_ids("tracks", list(ids) + ["missing"]) == ids
+    assert state.get_ids("artists", ids) == {}
+
+
+def test_discard_and_clear_ids(state):
+    ids = {f"artist{i}": uuid.uuid4() for i in range(4)}
+    state.put_ids("artists", ids)
+    state.put_ids("albums", {"album0": uuid.uuid4()})
+
+    state.discard_ids("artists", ["artist0"])
+    state.discard_uuid("artists", ids["artist1"])
+    assert set(state.get_ids("artists", ids)) == {"artist2", "artist3"}
+
+    state.clear_ids("artists")
+    assert state.get_ids("artists", ids) == {}
+    assert set(state.get_ids("albums", ["album0"])) == {"album0"}
+
+
+def test_oauth_state_is_consumed_once(state):
+    state.put_oauth_state("abc", "alice", time.time() + 60)
+
+    assert state.pop_oauth_state("abc") == "alice"
+    assert state.pop_oauth_state("abc") is None
+    assert state.pop_oauth_state("unknown") is None
+
+
+def test_expired_oauth_state_is_rejected(state):
+    state.put_oauth_state("old", "alice", time.time() - 1)
+
+    assert state.pop_oauth_state("old") is None
+
+
+def test_connections_are_per_thread(state):
+    state.put_ids("tracks", {"track0": uuid.uuid4()})
+    found = []
+
+    thread = threading.Thread(target=lambda: found.append(state.get_ids("tracks", ["track0"])))
+    thread.start()
+    thread.join()
+
+    assert set(found[0]) == {"track0"}
+
+
+def test_session_resolves_to_its_user_until_it_expires(state):
+    state.put_session("hash-a", "alice", time.time() + 60)
+    state.put_session("hash-old", "bob", time.time() - 1)
+
+    assert state.get_session("hash-a") == "alice"
+    assert state.get_session("hash-a") == "alice"
+    assert state.get_session("hash-old") is None
+    assert state.get_session("unknown") is None
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.single_flight import SingleFlight
+
+
+class Operation:
+    """Operación que cuenta sus ejecuciones y espera a que el test la deje terminar."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    operation = Operation(result="token")
+    callers = [asyncio.create_task(flight.do("me", operation)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    operation.release.set()
+
+    assert await asyncio.gather(*callers) == ["token"] * 3
+    assert operation.calls == 1
+    assert (flight.leaders, flight.coalesced) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    operation = Operation(result="token")
+    operation.release.set()
+
+    await asyncio.gather(flight.do("me", operation), flight.do("alice", operation))
+
+    assert operation.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_error_reaches_every_caller():
+    flight = SingleFlight("test")
+    operation = Operation(error=RuntimeError("refresh failed"))
+    callers = [asyncio.create_task(flight.do("me", operation)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    operation.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_leader_cancellation_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+    operation = Operation(result="token")
+    leader = asyncio.create_task(flight.do("me", operation))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("me", operation))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    operation.release.set()
+
+    assert await follower == "token"
+    assert leader.cancelled()
+    assert operation.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_operation_finishes_when_every_caller_is_cancelled():
+    flight = SingleFlight("test")
+    operation = Operation(error=RuntimeError("nobody listening"))
+    caller = asyncio.create_task(flight.do("me", operation))
+    await asyncio.sleep(0)
+
+    caller.cancel()
+    operation.release.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert caller.cancelled()
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_key_is_released_after_completion():
+    flight = SingleFlight("test")
+    operation = Operation(result="token")
+    operation.release.set()
+
+    assert await flight.do("me", operation) == "token"
+    assert len(flight) == 0
+    assert await flight.do("me", operation) == "token"
+    assert operation.calls == 2
+    assert flight.coalesced == 0
@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.adapters.supabase.repository import SupabaseRepository
+from src.core.entities.track import Artist, SavedTrack
+
+
+def artist(index: int, name: str = "") -> Artist:
+    return Artist(
+        spotify_id=f"artist{index}",
+        name=name or f"Artist {index}",
+        spotify_url=f"https://open.spotify.com/artist/{index}",
+    )
+
+
+def track(index: int) -> SavedTrack:
+    return SavedTrack(
+        spotify_track_id=f"track{index}",
+        track_name=f"Track {index}",
+        artists=[artist(0)],
+        spotify_url=f"https://open.spotify.com/track/{index}",
+        added_at=datetime(2024, 3, 1, tzinfo=timezone.utc),
+    )
+
+
+def stored_ids(postgrest, table: str, column: str) -> dict:
+    return {row[column]: row["id"] for row in postgrest.tables[table]}
+
+
+def spotify_ids(entities: List[Artist]) -> List[str]:
+    return [entity.spotify_id for entity in entities]
+
+
+def test_upsert_returns_every_entity_in_input_order(postgrest, supabase_client):
+    repo = SupabaseRepository(supabase_client, Artist, "spotify_artists")
+    existing = repo.upsert_many([artist(2)])[0]
+
+    upserted = repo.upsert_many([artist(3), artist(1), artist(2, "Renamed"), artist(1)])
+
+    # El repetido se envía una vez; el existente se actualiza y conserva su UUID
+    assert spotify_ids(upserted) == ["artist3", "artist1", "artist2"]
+    ids = stored_ids(postgrest, "spotify_artists", "spotify_id")
+    assert [str(entity.id) for entity in upserted] == [ids["artist3"], ids["artist1"], ids["artist2"]]
+    assert upserted[2].id == existing.id
+    assert {row["name"] for row in postgrest.tables["spotify_artists"]} == {"Artist 3", "Artist 1", "Renamed"}
+
+
+def test_ignore_duplicates_returns_only_the_inserted_entities(postgrest, supabase_client):
+    repo = SupabaseRepository(supabase_client, Artist, "spotify_artists")
+    repo.upsert_many([artist(1)])
+
+    inserted = repo.upsert_many([artist(0), artist(1, "Renamed"), artist(2)], ignore_duplicates=True)
+
+    assert spotify_ids(inserted) == ["artist0", "artist2"]
+    ids = stored_ids(postgrest, "spotify_artists", "spotify_id")
+    assert [str(entity.id) for entity in inserted] == [ids["artist0"], ids["artist2"]]
+    # La fila existente queda intacta
+    assert [row["name"] for row in postgrest.tables["spotify_artists"] if row["spotify_id"] == "artist1"] == ["Artist 1"]
+
+
+def test_conflict_target_is_scoped_to_the_owner(postgrest, supabase_client):
+    tracks = SupabaseRepository(supabase_client, SavedTrack, "spotify_tracks", owner="me")
+    artists = SupabaseRepository(supabase_client, Artist, "spotify_artists")
+
+    assert tracks._conflict_target("spotify_track_id") == "owner,spotify_track_id"
+    assert tracks._conflict_target("id") == "id"
+    assert artists._conflict_target("spotify_id") == "spotify_id"
+
+
+def test_each_owner_upserts_its_own_copy_of_a_track(postgrest, supabase_client):
+    mine = SupabaseRepository(supabase_client, SavedTrack, "spotify_tracks", owner="me")
+    alices = SupabaseRepository(supabase_client, SavedTrack, "spotify_tracks", owner="alice")
+    mine.upsert_many([track(0)], ignore_duplicates=True)
+
+    inserted = alices.upsert_many([track(0), track(1)], ignore_duplicates=True)
+
+    assert [entity.spotify_track_id for entity in inserted] == ["track0", "track1"]
+    assert sorted((row["owner"], row["spotify_track_id"]) for row in postgrest.tables["spotify_tracks"]) == [
+        ("alice", "track0"), ("alice", "track1"), ("me", "track0"),
+    ]
+    # Dentro del mismo propietario el track ya existe
+    assert mine.upsert_many([track(0)], ignore_duplicates=True) == []
+    assert set(alices.get_ids_by_spotify_ids(["track0", "track2"])) == {"track0"}
+    assert alices.get_ids_by_spotify_ids(["track0"]) != mine.get_ids_by_spotify_ids(["track0"])
+
+
+@pytest.mark.asyncio
+async def test_async_upsert_matches_rows_to_entities(postgrest, async_supabase_client):
+    repo = AsyncSupabaseRepository(async_supabase_client, Artist, "spotify_artists")
+    await repo.upsert_many([artist(1)])
+
+    inserted = await repo.upsert_many([artist(2), artist(1), artist(0)], ignore_duplicates=True)
+
+    assert spotify_ids(inserted) == ["artist2", "artist0"]
+    ids = stored_ids(postgrest, "spotify_artists", "spotify_id")
+    assert [str(entity.id) for entity in inserted] == [ids["artist2"], ids["artist0"]]
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.adapters.supabase.repository import SupabaseRepository
+from src.core.entities.track import Album, Artist, SavedTrack
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+from src.core.services.supabase_sync_service import SupabaseSyncService
+
+ADDED_AT = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def artist(index: int) -> Artist:
+    return Artist(spotify_id=f"artist{index}", name=f"Artist {index}", spotify_url=f"https://open.spotify.com/artist/{index}")
+
+
+def saved_tracks(count: int) -> List[SavedTrack]:
+    album = Album(spotify_id="album0", name="Album", artists=[artist(0)])
+    return [
+        SavedTrack(
+            spotify_track_id=f"track{i}",
+            track_name=f"Track {i}",
+            artists=[artist(0), artist(i % 3 + 1)],
+            album=album,
+            spotify_url=f"https://open.spotify.com/track/{i}",
+            added_at=ADDED_AT - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def sync_service(client) -> SupabaseSyncService:
+    service = SupabaseSyncService(
+        SupabaseRepository(client, Artist, "spotify_artists"),
+        SupabaseRepository(client, Album, "spotify_albums"),
+        SupabaseRepository(client, SavedTrack, "spotify_tracks", owner="me"),
+    )
+    service.client = client
+    return service
+
+
+def async_sync_service(client) -> AsyncSupabaseSyncService:
+    return AsyncSupabaseSyncService(
+        AsyncSupabaseRepository(client, Artist, "spotify_artists"),
+        AsyncSupabaseRepository(client, Album, "spotify_albums"),
+        AsyncSupabaseRepository(client, SavedTrack, "spotify_tracks", owner="me"),
+        client,
+    )
+
+
+def linked_tracks(postgrest) -> set:
+    return {link["track_id"] for link in postgrest.tables["spotify_track_artists"]}
+
+
+def test_retry_after_a_failed_link_write_links_every_track(postgrest, supabase_client):
+    postgrest.fail_next("POST", "spotify_track_artists")
+
+    summary = sync_service(supabase_client).save_saved_tracks_batch(saved_tracks(8))
+
+    tracks = postgrest.tables["spotify_tracks"]
+    assert len(tracks) == 8
+    assert linked_tracks(postgrest) == {track["id"] for track in tracks}
+    assert len(postgrest.tables["spotify_track_artists"]) == 16
+    assert (summary.created_tracks, summary.skipped_tracks, summary.failed_tracks) == (8, 0, 0)
+
+
+def test_links_that_keep_failing_are_counted_and_written_by_the_next_sync(postgrest, supabase_client):
+    service = sync_service(supabase_client)
+    postgrest.fail_next("POST", "spotify_track_artists", times=100)
+
+    summary = service.save_saved_tracks_batch(saved_tracks(4))
+
+    assert (summary.created_tracks, summary.failed_tracks) == (0, 4)
+    assert postgrest.tables["spotify_track_artists"] == []
+
+    postgrest.failures.clear()
+    summary = service.save_saved_tracks_batch(saved_tracks(4))
+
+    assert (summary.created_tracks, summary.skipped_tracks, summary.failed_tracks) == (0, 4, 0)
+    assert linked_tracks(postgrest) == {track["id"] for track in postgrest.tables["spotify_tracks"]}
+
+
+def test_existing_tracks_are_linked_with_their_stored_uuid(postgrest, supabase_client):
+    service = sync_service(supabase_client)
+    service.save_saved_tracks_batch(saved_tracks(3))
+    postgrest.delete("spotify_track_artists", [])
+
+    summary = service.save_saved_tracks_batch(saved_tracks(5))
+
+    assert (summary.created_tracks, summary.skipped_tracks) == (2, 3)
+    assert len(postgrest.tables["spotify_tracks"]) == 5
+    assert linked_tracks(postgrest) == {track["id"] for track in postgrest.tables["spotify_tracks"]}
+
+
+@pytest.mark.asyncio
+async def test_async_retry_after_a_failed_link_write_links_every_track(postgrest, async_supabase_client):
+    postgrest.fail_next("POST", "spotify_track_artists")
+
+    summary = await async_sync_service(async_supabase_client).save_saved_tracks_batch(saved_tracks(8))
+
+    tracks = postgrest.tables["spotify_tracks"]
+    assert len(tracks) == 8
+    assert linked_tracks(postgrest) == {track["id"] for track in tracks}
+    assert (summary.created_tracks, summary.skipped_tracks, summary.failed_tracks) == (8, 0, 0)
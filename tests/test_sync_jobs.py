@@ -0,0 +1,96 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from src.core.entities.sync import SyncJobState, SyncSummary
+from src.core.services.sync_jobs import SyncJobLimitError, SyncJobManager
+
+
+class FakePipeline:
+    """Pipeline que registra cuándo empieza y espera a que el test lo deje terminar."""
+
+    def __init__(self, name: str, started: List[str]):
+        self.name = name
+        self.started = started
+        self.release = asyncio.Event()
+        self.summary = SyncSummary()
+        self.pages = 0
+        self.total = None
+        self.enrichment = None
+
+    async def run(self, token, page_size):
+        self.started.append(self.name)
+        await self.release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_turns_alternate_between_users():
+    manager = SyncJobManager(max_running=1, max_active=10, history_size=10)
+    started: List[str] = []
+    pipelines = [FakePipeline(name, started) for name in ("a1", "a2", "a3")]
+    pipelines.append(FakePipeline("b1", started))
+    jobs = [manager.start(pipeline, "token", 50, user=pipeline.name[0]) for pipeline in pipelines]
+    jobs.append(manager.start(FakePipeline("b2", started), "token", 50, user="b"))
+
+    await settle()
+    for _ in range(len(jobs)):
+        assert len(started) == len(set(started))
+        running = next(job for job in jobs if job.pipeline.name == started[-1])
+        assert running.state == SyncJobState.RUNNING
+        running.pipeline.release.set()
+        await settle()
+
+    # "a" encoló primero tres trabajos, pero "b" no espera a que terminen todos
+    assert started == ["a1", "b1", "a2", "b2", "a3"]
+    assert all(job.state == SyncJobState.COMPLETED for job in jobs)
+
+
+@pytest.mark.asyncio
+async def test_per_user_limit_leaves_slots_for_other_users():
+    manager = SyncJobManager(max_running=2, max_active=10, history_size=10, max_running_per_user=1)
+    started: List[str] = []
+    jobs = [manager.start(FakePipeline(name, started), "token", 50, user=name[0]) for name in ("a1", "a2", "b1")]
+
+    await settle()
+
+    assert started == ["a1", "b1"]
+    assert jobs[1].state == SyncJobState.PENDING
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_pending_job_gives_up_its_turn():
+    manager = SyncJobManager(max_running=1, max_active=10, history_size=10)
+    started: List[str] = []
+    first = manager.start(FakePipeline("a1", started), "token", 50, user="a")
+    pending = manager.start(FakePipeline("b1", started), "token", 50, user="b")
+    last = manager.start(FakePipeline("a2", started), "token", 50, user="a")
+    await settle()
+
+    manager.cancel(pending.id)
+    first.pipeline.release.set()
+    await settle()
+
+    assert pending.state == SyncJobState.CANCELLED
+    assert started == ["a1", "a2"]
+    last.pipeline.release.set()
+    await settle()
+    assert last.state == SyncJobState.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_rejects_jobs_beyond_max_active():
+    manager = SyncJobManager(max_running=1, max_active=2, history_size=10)
+    started: List[str] = []
+    manager.start(FakePipeline("a1", started), "token", 50, user="a")
+    manager.start(FakePipeline("b1", started), "token", 50, user="b")
+
+    with pytest.raises(SyncJobLimitError):
+        manager.start(FakePipeline("c1", started), "token", 50, user="c")
+    await manager.shutdown()
@@ -0,0 +1,83 @@
+import pytest
+
+from benchmarks.stand_ins.fake_spotify import FakeSpotifyLibrary
+from src.adapters.spotify.mapper import SpotifyRecordMapper
+from src.adapters.spotify.repository import SpotifyAPIRepository
+from src.adapters.supabase.async_repository import AsyncSupabaseRepository
+from src.core.entities.track import Album, Artist, SavedTrack
+from src.core.services.async_supabase_sync_service import AsyncSupabaseSyncService
+from src.core.services.sync_pipeline import SyncPipeline
+from src.core.services.sync_service import SyncService
+from src.infrastructure.single_flight import SingleFlight
+from src.presentation.api.v1 import tracks
+
+# Posiciones de la biblioteca sin track (retirado del catálogo) y con un archivo local (ID nulo)
+REMOVED, LOCAL = 3, 7
+
+
+class LibraryWithUnavailableTracks(FakeSpotifyLibrary):
+    def item(self, position: int) -> dict:
+        item = super().item(position)
+        if position == REMOVED:
+            item["track"] = None
+        elif position == LOCAL:
+            item["track"]["id"] = None
+        return item
+
+
+@pytest.fixture
+def spotify_library() -> FakeSpotifyLibrary:
+    return LibraryWithUnavailableTracks(library_size=45, artist_pool=7, album_pool=9)
+
+
+@pytest.fixture
+def sync_service(spotify_client, spotify_scheduler) -> SyncService:
+    return SyncService(SpotifyAPIRepository(spotify_client, spotify_scheduler, user="me"))
+
+
+@pytest.fixture
+def supabase_sync_service(async_supabase_client) -> AsyncSupabaseSyncService:
+    return AsyncSupabaseSyncService(
+        AsyncSupabaseRepository(async_supabase_client, Artist, "spotify_artists"),
+        AsyncSupabaseRepository(async_supabase_client, Album, "spotify_albums"),
+        AsyncSupabaseRepository(async_supabase_client, SavedTrack, "spotify_tracks", owner="me"),
+        async_supabase_client,
+    )
+
+
+def test_mapper_skips_items_without_track_id_or_name(spotify_library):
+    items = [spotify_library.item(position) for position in range(10)]
+    items[0]["track"]["name"] = None
+
+    records = SpotifyRecordMapper().saved_tracks(items)
+
+    expected = [items[position]["track"]["id"] for position in range(10) if position not in (0, REMOVED, LOCAL)]
+    assert [record.spotify_track_id for record in records] == expected
+
+
+@pytest.mark.asyncio
+async def test_pipeline_counts_unavailable_items_and_saves_the_rest(postgrest, sync_service, supabase_sync_service):
+    pipeline = SyncPipeline(sync_service, supabase_sync_service, SpotifyRecordMapper().saved_track)
+
+    summary = await pipeline.run("token", page_size=10)
+
+    assert (summary.unavailable_tracks, summary.tracks_processed, summary.failed_tracks) == (2, 43, 0)
+    assert len(postgrest.tables["spotify_tracks"]) == 43
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_counts_unavailable_items(postgrest, sync_service, supabase_sync_service):
+    response = await tracks.sync_incremental(sync_service, supabase_sync_service, None, None, "me", "token")
+
+    assert response.new_tracks == 45
+    assert (response.summary.unavailable_tracks, response.summary.created_tracks) == (2, 43)
+    assert len(postgrest.tables["spotify_tracks"]) == 43
+
+
+@pytest.mark.asyncio
+async def test_sync_endpoint_returns_the_page_without_unavailable_items(sync_service, supabase_sync_service):
+    response = await tracks.sync_saved_tracks(
+        0, 10, sync_service, supabase_sync_service, SingleFlight("test"), "me", "token"
+    )
+
+    assert len(response) == 8